@@ -0,0 +1,10 @@
+"""
+Bench: dựng các cảnh cố định không cửa sổ và đo thời gian update / vẽ của từng phần.
+
+    python -m bench.run                       # mọi cảnh, ghi bench/results/<commit>.json
+    python -m bench.run --scene stage3_boss --frames 1200
+    python -m bench.compare bench/results/abc1234.json bench/results/def5678.json
+
+Cảnh được định nghĩa trong bench/scenes.py; thời gian mỗi phần lấy từ các
+`timer.section(...)` trong GameSession và SessionView (xem game/frame_timer.py).
+"""
@@ -0,0 +1,79 @@
+"""
+So hai file kết quả của bench/run.py (vd. hai commit): in thay đổi của từng phần.
+
+    python -m bench.compare bench/results/abc1234.json bench/results/def5678.json --metric p95
+
+Phần chậm hơn quá `--threshold` phần trăm được đánh dấu "!"; `--fail` trả exit code 1
+nếu có (dùng trong CI).
+"""
+import argparse
+import json
+import os
+import sys
+
+# Chạy trực tiếp (python bench/compare.py) cũng import được package bench
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Bỏ qua phần nhỏ hơn ngưỡng này (ms) - dao động đo lớn hơn chính nó
+MIN_SIGNIFICANT_MS = 0.01
+
+
+def compare(base, new, metric="p50", threshold=10.0):
+    """
+    Trả về list (cảnh, phần, ms cũ, ms mới, % thay đổi, chậm đi quá ngưỡng?)
+    cho mọi phần có trong cả hai file.
+    """
+    rows = []
+    for scene, new_scene in new.get('scenes', {}).items():
+        base_scene = base.get('scenes', {}).get(scene)
+        if base_scene is None:
+            continue
+        base_sections = base_scene.get('sections', {})
+        for name, stats in new_scene.get('sections', {}).items():
+            if name not in base_sections:
+                continue
+            old_ms = base_sections[name].get(metric, 0.0)
+            new_ms = stats.get(metric, 0.0)
+            if max(old_ms, new_ms) < MIN_SIGNIFICANT_MS:
+                continue
+            change = (new_ms - old_ms) / old_ms * 100.0 if old_ms > 0 else 0.0
+            rows.append((scene, name, old_ms, new_ms, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So hai file kết quả bench")
+    parser.add_argument("base", help="kết quả cũ (JSON)")
+    parser.add_argument("new", help="kết quả mới (JSON)")
+    parser.add_argument("--metric", default="p50", choices=("mean", "p50", "p95", "p99", "max"))
+    parser.add_argument("--threshold", type=float, default=10.0, help="%% chậm đi coi là regression")
+    parser.add_argument("--fail", action="store_true", help="exit code 1 nếu có regression")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(
+        f"[BENCH] {base['meta'].get('commit')} -> {new['meta'].get('commit')} "
+        f"({args.metric}, ms, regression > {args.threshold:.0f}%)"
+    )
+    rows = compare(base, new, args.metric, args.threshold)
+    scene = None
+    for row_scene, name, old_ms, new_ms, change, regressed in rows:
+        if row_scene != scene:
+            scene = row_scene
+            print(f"\n{scene}")
+        mark = "!" if regressed else " "
+        print(f" {mark} {name:<28} {old_ms:>9.3f} {new_ms:>9.3f} {change:>+8.1f}%")
+
+    regressions = [row for row in rows if row[5]]
+    print(f"\n[BENCH] {len(regressions)} regression(s)")
+    if args.fail and regressions:
+        sys.exit(1)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Chạy các cảnh bench (bench/scenes.py) và ghi kết quả JSON để so giữa các commit.
+
+Mỗi frame giống vòng lặp của `run_game_session` nhưng với frame_dt cố định (1/FPS)
+thay vì thời gian thực: tick mô phỏng qua FixedStepClock, rồi SessionView vẽ
+world / present / HUD lên display "dummy" cỡ WIDTH x HEIGHT. Các frame khởi động
+(load asset nền, cache chữ, chunk layer) không tính.
+
+Kết quả mỗi cảnh: percentiles (ms) của "frame", "frame.update", "frame.draw" và
+từng phần "update.*" (mỗi tick một mẫu) / "draw.*" (mỗi frame một mẫu), cùng tỉ lệ
+frame vượt ngân sách `budget_ms` (mặc định 1000 / FPS).
+
+    python -m bench.run --frames 600 --out bench/results/local.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# Chạy trực tiếp (python bench/run.py) cũng import được package game / bench
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from game.config import WIDTH, HEIGHT, FPS, ZOOM, SIM_TICK_RATE
+from game.frame_timer import SectionTimer
+from game.headless import ScriptedInput, load_headless_world
+from game.session import GameSession
+from game.session_view import SessionView
+from game.sim_clock import FixedStepClock, Interpolator
+from bench.scenes import SCENES, get_scene, scene_names, empty_map_path
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULT_DECIMALS = 4
+
+
+def git_commit():
+    """Commit hiện tại (ngắn), thêm "-dirty" nếu có thay đổi chưa commit; None nếu không có git."""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, stderr=subprocess.DEVNULL
+        ).decode().strip()
+        dirty = subprocess.call(
+            ["git", "diff", "--quiet", "HEAD", "--", "."], cwd=cwd, stderr=subprocess.DEVNULL
+        )
+        return commit + ("-dirty" if dirty else "")
+    except Exception:
+        return None
+
+
+def _rounded(stats):
+    return {k: (round(v, RESULT_DECIMALS) if isinstance(v, float) else v) for k, v in stats.items()}
+
+
+class WorldCache:
+    """Giữ một WorldAssets (render) - đổi map thì bỏ map cũ trước khi load map mới."""
+
+    def __init__(self):
+        self.path = None
+        self.world = None
+
+    def get(self, map_path):
+        from game.world_assets import WorldAssets
+
+        if map_path is None:
+            map_path = empty_map_path()
+        if self.path != map_path:
+            self.world = None
+            gc.collect()
+            self.world = WorldAssets(map_path)
+            self.path = map_path
+        return self.world
+
+
+def run_scene(scene, screen, worlds, character="bluewizard", frames=600, warmup=120,
+              fps=FPS, seed=1, budget_ms=None):
+    """Dựng một cảnh, chạy `warmup` + `frames` frame; trả về dict kết quả của cảnh."""
+    world = worlds.get(scene['map'])
+    start_stage = scene.get('start_stage', 0)
+    load_headless_world(character, start_stage, world)
+    session = GameSession(character, world, start_stage=start_stage, seed=seed)
+    session.player.input_source = scripted = ScriptedInput(scene.get('script') or ())
+    scene['setup'](session)
+    frame_hook = scene.get('frame')
+    rng = random.Random(seed)
+    random.seed(seed)  # hiệu ứng chỉ để vẽ (sao, particle) cũng lặp lại được
+
+    view = SessionView(screen, world, session)
+    timer = SectionTimer()
+    timer.enabled = False
+    session.timer = view.timer = timer
+
+    sim_clock = FixedStepClock()
+    interpolator = Interpolator()
+    moving_platforms = world.moving_platform_manager.platforms
+    frame_dt = 1.0 / fps
+    if budget_ms is None:
+        budget_ms = 1000.0 / fps
+
+    for i in range(warmup + frames):
+        if i == warmup:
+            timer.enabled = True
+        # Asset nền, hook của cảnh, hồi sinh: ngoài phần đo
+        session.pump_assets()
+        if frame_hook is not None:
+            frame_hook(session, rng)
+        if not getattr(session.player, "alive", True):
+            session.respawn_player()
+
+        with timer.section("frame"):
+            with timer.section("frame.update"):
+                for _ in range(sim_clock.advance(frame_dt)):
+                    interpolator.snapshot((session.player,), session.enemies, moving_platforms)
+                    session.tick(sim_clock.step_dt)
+                    scripted.advance()
+            with timer.section("frame.draw"):
+                view.update(frame_dt)
+                alpha = sim_clock.alpha
+                with interpolator.apply(alpha):
+                    view.draw_world(lag=(1.0 - alpha) * sim_clock.step_dt)
+                view.present()
+                view.draw_hud(fps)
+                with timer.section("draw.flip"):
+                    pygame.display.flip()
+
+    sections = timer.summary()
+    frame_samples = timer.samples.get("frame", [])
+    over = sum(1 for ms in frame_samples if ms > budget_ms)
+    return {
+        'description': scene.get('description', ""),
+        'frames': frames,
+        'budget_ms': round(budget_ms, RESULT_DECIMALS),
+        'over_budget_pct': round(100.0 * over / len(frame_samples), 2) if frame_samples else 0.0,
+        'enemies': len(session.enemies),
+        'projectiles': session.projectile_system.count,
+        'sections': {name: _rounded(stats) for name, stats in sorted(sections.items())},
+    }
+
+
+def run_bench(names=None, character="bluewizard", frames=600, warmup=120, fps=FPS, seed=1, budget_ms=None):
+    """Chạy các cảnh `names` (None = tất cả, theo thứ tự trong SCENES); trả về dict kết quả."""
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    scenes = [get_scene(name) for name in names] if names else list(SCENES)
+    # Cảnh cùng map chạy liền nhau để chỉ load mỗi map một lần
+    map_order = list(dict.fromkeys(scene['map'] for scene in scenes))
+    scenes.sort(key=lambda scene: map_order.index(scene['map']))
+
+    worlds = WorldCache()
+    results = {}
+    for scene in scenes:
+        print(f"[BENCH] {scene['name']}: {scene.get('description', '')}")
+        started = time.perf_counter()
+        results[scene['name']] = run_scene(
+            scene, screen, worlds, character=character, frames=frames, warmup=warmup,
+            fps=fps, seed=seed, budget_ms=budget_ms,
+        )
+        frame = results[scene['name']]['sections'].get('frame', {})
+        print(
+            f"[BENCH] {scene['name']}: frame p50={frame.get('p50', 0):.3f}ms "
+            f"p95={frame.get('p95', 0):.3f}ms p99={frame.get('p99', 0):.3f}ms "
+            f"({time.perf_counter() - started:.1f}s)"
+        )
+
+    from game.projectile_system import ProjectileSystem
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy_projectiles': ProjectileSystem().vectorized,
+            'platform': platform.platform(),
+            'character': character,
+            'resolution': [WIDTH, HEIGHT],
+            'zoom': ZOOM,
+            'fps': fps,
+            'tick_rate': SIM_TICK_RATE,
+            'frames': frames,
+            'warmup': warmup,
+            'seed': seed,
+        },
+        'scenes': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bench các cảnh cố định, ghi thời gian từng phần ra JSON")
+    parser.add_argument("--scene", action="append", choices=scene_names(), help="chỉ chạy cảnh này (lặp lại được)")
+    parser.add_argument("--char", default="bluewizard", help="id nhân vật")
+    parser.add_argument("--frames", type=int, default=600, help="số frame đo mỗi cảnh")
+    parser.add_argument("--warmup", type=int, default=120, help="số frame khởi động không tính")
+    parser.add_argument("--fps", type=float, default=FPS, help="frame_dt = 1 / fps")
+    parser.add_argument("--seed", type=int, default=1, help="seed RNG mô phỏng và cảnh")
+    parser.add_argument("--budget-ms", type=float, default=None, help="ngân sách mỗi frame (mặc định 1000 / fps)")
+    parser.add_argument("--out", default=None, help="file JSON (mặc định bench/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    report = run_bench(
+        args.scene, character=args.char, frames=args.frames, warmup=args.warmup,
+        fps=args.fps, seed=args.seed, budget_ms=args.budget_ms,
+    )
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'local'}.json")
+    directory = os.path.dirname(out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"[BENCH] Results -> {out}")
+    pygame.quit()
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Các cảnh bench cố định.
+
+Mỗi cảnh là một dict (giống cấu hình stage trong game/session.py):
+
+- 'map': đường dẫn TMX (None = map rỗng sinh ra bởi `empty_map_path()`)
+- 'start_stage': stage của GameSession (enemy + boss spawn theo stage đó)
+- 'script': kịch bản input (xem game/headless.py), () = đứng yên
+- 'setup(session)': chỉnh session sau khi tạo (xoá enemy, gọi boss, bật VICTORY...)
+- 'frame(session, rng)': chạy trước mỗi frame, không tính giờ (giữ cảnh ổn định)
+
+Cùng seed thì cảnh giống hệt nhau giữa các lần chạy và giữa các commit.
+"""
+import os
+
+from game.config import PROJECT_ROOT
+from game.headless import DEFAULT_SCRIPT
+from game.world_assets import DEFAULT_MAP_PATH
+
+BENCH_CACHE_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", ".cache", "bench")
+TILESET_IMAGE = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", "maps", "Mossy - TileSet.png")
+
+# Map rỗng: bầu trời + một dải nền ở đáy, không object / decor / portal
+EMPTY_MAP_TILES = (24, 12)  # số tile (ngang, dọc), tile 512px như Map_test
+EMPTY_MAP_TILE = 512
+EMPTY_MAP_TOP_GID = 2  # tile mép trên của "Mossy - TileSet"
+EMPTY_MAP_FILL_GID = 9  # tile đặc
+
+PROJECTILE_COUNT = 200
+VICTORY_TIMER = 15.0  # giống lúc thắng thật (session._update_stage)
+
+
+def empty_map_path():
+    """Sinh (nếu chưa có) TMX của map rỗng trong thư mục cache, trả về đường dẫn."""
+    path = os.path.join(BENCH_CACHE_DIR, "empty_map.tmx")
+    if os.path.exists(path):
+        return path
+    os.makedirs(BENCH_CACHE_DIR, exist_ok=True)
+
+    cols, rows = EMPTY_MAP_TILES
+    tile = EMPTY_MAP_TILE
+    grid = []
+    for y in range(rows):
+        if y == rows - 2:
+            gid = EMPTY_MAP_TOP_GID
+        elif y == rows - 1:
+            gid = EMPTY_MAP_FILL_GID
+        else:
+            gid = 0
+        grid.append(",".join([str(gid)] * cols))
+    csv = ",\n".join(grid)
+    image = os.path.relpath(TILESET_IMAGE, BENCH_CACHE_DIR).replace(os.sep, "/")
+    spawn_x = cols * tile // 2
+    spawn_y = (rows - 2) * tile
+
+    tmx = f"""<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.10" orientation="orthogonal" renderorder="right-down" width="{cols}" height="{rows}" tilewidth="{tile}" tileheight="{tile}" infinite="0" nextlayerid="3" nextobjectid="2">
+ <tileset firstgid="1" name="Mossy - TileSet" tilewidth="{tile}" tileheight="{tile}" tilecount="49" columns="7">
+  <image source="{image}" width="3584" height="3584"/>
+ </tileset>
+ <layer id="1" name="nen" width="{cols}" height="{rows}">
+  <data encoding="csv">
+{csv}
+</data>
+ </layer>
+ <objectgroup id="2" name="Spawn">
+  <object id="1" name="player_spawn" x="{spawn_x}" y="{spawn_y}">
+   <point/>
+  </object>
+ </objectgroup>
+</map>
+"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(tmx)
+    return path
+
+
+# ----------------------------------------------------------------------
+# setup / frame hook
+# ----------------------------------------------------------------------
+def clear_enemies(session):
+    """Trả enemy của stage về pool; không còn enemy ban đầu nên boss cũng không spawn."""
+    if session.enemy_pool is not None:
+        for e in session.enemies:
+            session.enemy_pool.release(e)
+    session.enemies = []
+    session.initial_enemies_ids = []
+
+
+def setup_stage3_boss(session):
+    # Đưa player tới chỗ enemy của stage spawn để cả nhóm nằm trong vùng hoạt động,
+    # rồi gọi boss ngay (bình thường phải hạ hết enemy ban đầu)
+    spawn = session.stages[session.current_stage]['spawn_center']
+    session.player.rect.midbottom = spawn
+    session.spawn_pos = spawn
+    session._spawn_boss()
+
+
+def top_up_projectiles(session, rng):
+    """Giữ đúng PROJECTILE_COUNT viên bay trong camera (bắn bằng frame skill của player)."""
+    projectiles = session.projectile_system
+    missing = PROJECTILE_COUNT - projectiles.count
+    if missing <= 0:
+        return
+    player = session.player
+    skill = next(
+        (
+            s
+            for s in getattr(player, "skills", {}).values()
+            if getattr(s, "projectile_frames", None) and hasattr(s, "spawn_projectile")
+        ),
+        None,
+    )
+    frames = skill.projectile_frames if skill is not None else None
+    cx, cy = player.rect.center
+    for _ in range(missing):
+        projectiles.spawn(
+            skill,
+            player,
+            cx + rng.uniform(-session.view_w / 2, session.view_w / 2),
+            cy + rng.uniform(-session.view_h / 2, session.view_h / 2),
+            rng.uniform(-600, 600),
+            rng.uniform(-200, 200),
+            frames,
+            rng.uniform(0.5, 2.0),
+            0,
+            pierce=True,
+        )
+
+
+def setup_victory(session):
+    clear_enemies(session)
+    session.stage_notification = "VICTORY! ALL STAGES COMPLETED!"
+    session.stage_notification_type = "victory"
+    session.stage_notification_timer = VICTORY_TIMER
+    session.game_won = True
+
+
+def keep_victory(session, rng):
+    # Overlay tự tắt sau VICTORY_TIMER giây; quay vòng để đo được nhiều frame
+    if session.stage_notification_timer <= 1.0:
+        session.stage_notification_timer = VICTORY_TIMER
+
+
+SCENES = [
+    {
+        'name': 'empty_map',
+        'description': "Map rỗng (một dải nền), không enemy - chi phí cố định của mỗi frame",
+        'map': None,
+        'start_stage': 0,
+        'script': (),
+        'setup': clear_enemies,
+    },
+    {
+        'name': 'map_spawn',
+        'description': "Map_test.tmx tại điểm spawn, không enemy",
+        'map': DEFAULT_MAP_PATH,
+        'start_stage': 0,
+        'script': (),
+        'setup': clear_enemies,
+    },
+    {
+        'name': 'projectiles_200',
+        'description': f"Map_test.tmx tại điểm spawn, {PROJECTILE_COUNT} projectile trong camera",
+        'map': DEFAULT_MAP_PATH,
+        'start_stage': 0,
+        'script': (),
+        'setup': clear_enemies,
+        'frame': top_up_projectiles,
+    },
+    {
+        'name': 'victory_overlay',
+        'description': "Map_test.tmx tại điểm spawn với màn VICTORY",
+        'map': DEFAULT_MAP_PATH,
+        'start_stage': 0,
+        'script': (),
+        'setup': setup_victory,
+        'frame': keep_victory,
+    },
+    {
+        'name': 'stage3_boss',
+        'description': "Stage 3: 10 enemy + boss Troll1 quanh player, player di chuyển và bắn",
+        'map': DEFAULT_MAP_PATH,
+        'start_stage': 2,
+        'script': DEFAULT_SCRIPT,
+        'setup': setup_stage3_boss,
+    },
+]
+
+
+def scene_names():
+    return [scene['name'] for scene in SCENES]
+
+
+def get_scene(name):
+    for scene in SCENES:
+        if scene['name'] == name:
+            return scene
+    raise KeyError(f"Không có cảnh bench '{name}' (có: {', '.join(scene_names())})")
@@ -7,7 +7,7 @@ class AnimatedDecor:
     Tự động chuyển frame theo thời gian dựa trên animation data từ TMX.
     """
     
-    def __init__(self, obj_data, use_bottom_y=False, y_offset=0):
+    def __init__(self, obj_data, use_bottom_y=False, y_offset=0, zoom=1.0, pyramid=None):
         """
         Khởi tạo animated decoration từ object data.
         
@@ -15,6 +15,8 @@ class AnimatedDecor:
             obj_data: Dictionary chứa thông tin object từ map_loader
             use_bottom_y: Có dùng y coordinate là bottom của image không
             y_offset: Offset bổ sung cho Y position
+            zoom: Nếu != 1.0, frame được scale sẵn và draw() vẽ ở toạ độ đã zoom
+            pyramid: AssetPyramid dùng chung để scale frame theo gid (tuỳ chọn)
         """
         self.x = int(obj_data.get('x', 0))
         self.y = int(obj_data.get('y', 0))
@@ -27,10 +29,14 @@ class AnimatedDecor:
         self.current_frame_index = 0
         self.animation_timer = 0  # milliseconds
         
+        # Kích thước ảnh (frame đầu, toạ độ world); frame có thể chưa decode (chỉ có 'size')
+        self.image_w = self.image_h = 0
         # Align Y position
         if self.animation_frames:
-            first_frame = self.animation_frames[0]['image']
-            tw, th = first_frame.get_width(), first_frame.get_height()
+            first_frame = self.animation_frames[0]
+            image = first_frame.get('image')
+            tw, th = image.get_size() if image is not None else first_frame['size']
+            self.image_w, self.image_h = tw, th
             
             if use_bottom_y:
                 self.y_aligned = self.y - th
@@ -39,6 +45,35 @@ class AnimatedDecor:
             self.y_aligned += int(y_offset)
         else:
             self.y_aligned = self.y
+
+        # Frame đã scale sẵn theo zoom (chế độ prescaled của RenderTargets)
+        self.zoom = float(zoom)
+        self.draw_images = [frame['image'] for frame in self.animation_frames]
+        if self.zoom != 1.0 and pyramid is not None:
+            self.draw_images = [
+                pyramid.get(frame.get('gid'), frame.get('image'), self.zoom, size=frame.get('size'))
+                for frame in self.animation_frames
+            ]
+        elif self.zoom != 1.0:
+            self.draw_images = [
+                pygame.transform.smoothscale(
+                    img,
+                    (max(1, int(round(img.get_width() * self.zoom))),
+                     max(1, int(round(img.get_height() * self.zoom)))),
+                )
+                for img in self.draw_images
+            ]
+        if self.zoom != 1.0:
+            # Chỉ giữ frame đã scale và thời lượng; không giữ ảnh gốc
+            self.animation_frames = [
+                {'gid': frame.get('gid'), 'duration': frame['duration']}
+                for frame in self.animation_frames
+            ]
+    
+    def reset(self):
+        """Quay lại frame đầu tiên."""
+        self.current_frame_index = 0
+        self.animation_timer = 0
     
     def update(self, dt):
         """
@@ -80,12 +115,15 @@ class AnimatedDecor:
             return
         
         # Get current frame image
-        current_frame = self.animation_frames[self.current_frame_index]
-        image = current_frame['image']
+        image = self.draw_images[self.current_frame_index]
         
         # Calculate screen position (offset by camera)
-        screen_x = self.x - camera_x
-        screen_y = self.y_aligned - camera_y
+        if self.zoom != 1.0:
+            screen_x = int(round(self.x * self.zoom)) - int(round(camera_x * self.zoom))
+            screen_y = int(round(self.y_aligned * self.zoom)) - int(round(camera_y * self.zoom))
+        else:
+            screen_x = self.x - camera_x
+            screen_y = self.y_aligned - camera_y
         
         # Draw the image
         surface.blit(image, (screen_x, screen_y))
@@ -100,12 +138,8 @@ class AnimatedDecor:
         if not self.animation_frames:
             return False
         
-        # Get image dimensions from first frame
-        first_frame = self.animation_frames[0]['image']
-        tw, th = first_frame.get_width(), first_frame.get_height()
-        
         # Build rect in world coordinates
-        obj_rect = pygame.Rect(self.x, self.y_aligned, tw, th)
+        obj_rect = pygame.Rect(self.x, self.y_aligned, self.image_w, self.image_h)
         camera_rect = pygame.Rect(camera_x, camera_y, camera_width, camera_height)
         
         return obj_rect.colliderect(camera_rect)
@@ -116,7 +150,7 @@ class AnimatedDecorManager:
     Quản lý tất cả animated decorations trong map.
     """
     
-    def __init__(self, animated_objects, use_bottom_y=False, y_offset=0):
+    def __init__(self, animated_objects, use_bottom_y=False, y_offset=0, zoom=1.0, pyramid=None):
         """
         Khởi tạo manager với list animated objects.
         
@@ -124,14 +158,21 @@ class AnimatedDecorManager:
             animated_objects: List các object dict từ map_loader
             use_bottom_y: Có dùng y coordinate là bottom của image không
             y_offset: Offset bổ sung cho Y position
+            zoom: Scale sẵn frame theo zoom (xem AnimatedDecor)
+            pyramid: AssetPyramid dùng chung (xem AnimatedDecor)
         """
         self.decorations = []
         
         for obj_data in animated_objects:
-            decor = AnimatedDecor(obj_data, use_bottom_y, y_offset)
+            decor = AnimatedDecor(obj_data, use_bottom_y, y_offset, zoom, pyramid)
             if decor.animation_frames:  # Only add if has animation
                 self.decorations.append(decor)
     
+    def reset(self):
+        """Reset animation của tất cả decorations."""
+        for decor in self.decorations:
+            decor.reset()
+    
     def update(self, dt):
         """
         Cập nhật tất cả decorations.
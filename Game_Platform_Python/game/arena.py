@@ -2,14 +2,15 @@
 """
 Arena System - Quản lý các khu vực chiến đấu
 """
-import random
 import math
 
+from game.sim_clock import sim_random
+
 
 class Arena:
     """Khu vực chiến đấu với enemies và boss"""
     
-    def __init__(self, arena_id, config):
+    def __init__(self, arena_id, config, enemy_pool=None):
         """
         Args:
             arena_id: ID của arena
@@ -21,10 +22,13 @@ class Arena:
                     'boss': 'Troll1',
                     'spawn_center': (x, y)
                 }
+            enemy_pool: EnemyPool (optional) - nếu có, enemy/boss lấy từ pool
+                và enemy chết được trả về pool thay vì bỏ cho GC
         """
         self.arena_id = arena_id
         self.config = config
         self.name = config['name']
+        self.enemy_pool = enemy_pool
         
         # Arena state
         self.active = False
@@ -40,6 +44,16 @@ class Arena:
         self.spawn_radius_max = 150
         
         print(f"[ARENA] Created {self.name} at {self.spawn_center}")
+
+    def _spawn_enemy(self, create_enemy_func, enemy_type, x, y):
+        """Lấy enemy từ pool nếu có, không thì tạo bằng create_enemy_func như cũ"""
+        if self.enemy_pool is not None:
+            return self.enemy_pool.acquire(enemy_type, x, y)
+        return create_enemy_func(enemy_type, x, y)
+
+    def _release_enemy(self, enemy):
+        if self.enemy_pool is not None:
+            self.enemy_pool.release(enemy)
     
     def start(self, create_enemy_func, patrol_enemy_class):
         """Bắt đầu arena - spawn enemies"""
@@ -55,23 +69,24 @@ class Arena:
         print(f"[ARENA] Starting {self.name}...")
         print(f"[ARENA] Spawning {self.config['enemy_count']} enemies...")
         
-        # Spawn enemies
+        # Spawn enemies (RNG mô phỏng để replay spawn đúng chỗ cũ)
+        rng = sim_random()
         enemy_types = self.config.get('enemies', ['Golem_02', 'Golem_03'])
         enemy_count = self.config.get('enemy_count', 5)
         
         for i in range(enemy_count):
             # Random position around spawn center
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(self.spawn_radius_min, self.spawn_radius_max)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(self.spawn_radius_min, self.spawn_radius_max)
             
             ex = int(self.spawn_center[0] + math.cos(angle) * distance)
             ey = int(self.spawn_center[1] + math.sin(angle) * distance)
             
-            enemy_type = random.choice(enemy_types)
+            enemy_type = rng.choice(enemy_types)
             enemy = None
             
             try:
-                enemy = create_enemy_func(enemy_type, ex, ey)
+                enemy = self._spawn_enemy(create_enemy_func, enemy_type, ex, ey)
                 print(f"[ARENA] Spawned {enemy_type} at ({ex}, {ey})")
             except Exception as e:
                 print(f"[ARENA ERROR] Failed to spawn {enemy_type}: {e}")
@@ -88,8 +103,8 @@ class Arena:
         
         # Ensure we have enough enemies
         while len(self.enemies) < enemy_count:
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(self.spawn_radius_min, self.spawn_radius_max)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(self.spawn_radius_min, self.spawn_radius_max)
             ex = int(self.spawn_center[0] + math.cos(angle) * distance)
             ey = int(self.spawn_center[1] + math.sin(angle) * distance)
             
@@ -112,6 +127,7 @@ class Arena:
         for enemy in self.enemies[:]:
             if enemy.dead:
                 self.enemies.remove(enemy)
+                self._release_enemy(enemy)
                 continue
             enemy.update(dt, platforms, player)
         
@@ -181,7 +197,7 @@ class Arena:
         
         # Create boss
         try:
-            self.boss = create_enemy_func(boss_type, boss_x, boss_y)
+            self.boss = self._spawn_enemy(create_enemy_func, boss_type, boss_x, boss_y)
             print(f"[ARENA] Boss spawned: {boss_type} at ({boss_x}, {boss_y})")
         except Exception as e:
             print(f"[ARENA ERROR] Failed to spawn boss: {e}")
@@ -211,6 +227,10 @@ class Arena:
     def cleanup(self):
         """Clean up arena"""
         self.active = False
+        for enemy in self.enemies:
+            self._release_enemy(enemy)
         self.enemies.clear()
+        if self.boss is not None:
+            self._release_enemy(self.boss)
         self.boss = None
         print(f"[ARENA] {self.name} cleaned up")
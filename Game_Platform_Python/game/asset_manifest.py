@@ -0,0 +1,261 @@
+"""
+Manifest asset: danh sách file + kích thước + phụ thuộc cho từng character, skill và map.
+
+Quét `assets/` một lần rồi lưu JSON vào cache (ASSET_MANIFEST_PATH). Lần chạy sau
+chỉ stat lại các thư mục đã ghi (mtime đổi khi thêm/xoá/đổi tên file) để biết có
+phải quét lại không. Loading screen dùng số byte trong manifest để tính tiến độ
+thật, và chỉ load bundle mà character đã chọn + stage hiện tại cần.
+
+Tên bundle: "character:<id viết thường>", "skill:<thư mục trong skill-effect>",
+"map:<tên file tmx không đuôi>".
+"""
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from game.config import ASSET_MANIFEST_PATH
+
+ASSETS_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+MANIFEST_VERSION = 1
+
+# Skill mặc định của Player (ChargeSkill) - mọi character đều kéo theo
+DEFAULT_SKILL_DEPS = ("skill:purple_skill",)
+
+_manifest = None
+
+
+def character_bundle(char_id):
+    return "character:" + char_id.lower()
+
+
+def map_bundle(map_path):
+    return "map:" + os.path.splitext(os.path.basename(map_path))[0]
+
+
+class AssetManifest:
+    def __init__(self, assets_root=ASSETS_ROOT, path=ASSET_MANIFEST_PATH):
+        self.assets_root = assets_root
+        self.path = path
+        self.bundles = {}
+        self.dirs = {}  # thư mục đã quét (tương đối) -> mtime_ns, để kiểm tra cache
+
+    # ------------------------------------------------------------------
+    # Tra cứu
+    # ------------------------------------------------------------------
+    def get(self, name):
+        return self.bundles.get(name)
+
+    def bytes_for(self, names, with_deps=False):
+        """Tổng dung lượng (byte) các bundle, tính mỗi bundle một lần."""
+        return sum(self.bundles[name]["bytes"] for name in self._expand(names, with_deps))
+
+    def files_for(self, names, with_deps=False):
+        """Đường dẫn tuyệt đối của mọi file trong các bundle."""
+        files = []
+        for name in self._expand(names, with_deps):
+            files.extend(os.path.join(self.assets_root, rel) for rel, _ in self.bundles[name]["files"])
+        return files
+
+    def total_bytes(self, kind=None):
+        return sum(b["bytes"] for b in self.bundles.values() if kind is None or b["kind"] == kind)
+
+    def _expand(self, names, with_deps):
+        seen = []
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in seen or name not in self.bundles:
+                continue
+            seen.append(name)
+            if with_deps:
+                stack.extend(self.bundles[name]["deps"])
+        return seen
+
+    # ------------------------------------------------------------------
+    # Cache JSON
+    # ------------------------------------------------------------------
+    def load(self):
+        """Đọc manifest đã lưu; False nếu không có, sai version hoặc assets đã đổi."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != MANIFEST_VERSION:
+            return False
+        for rel, mtime in data.get("dirs", {}).items():
+            try:
+                if os.stat(os.path.join(self.assets_root, rel)).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        self.bundles = data["bundles"]
+        self.dirs = data["dirs"]
+        return True
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "dirs": self.dirs, "bundles": self.bundles}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[MANIFEST] Không ghi được manifest: {e}")
+
+    # ------------------------------------------------------------------
+    # Quét assets/
+    # ------------------------------------------------------------------
+    def scan(self):
+        self.bundles = {}
+        self.dirs = {}
+        self._scan_skills()
+        self._scan_characters()
+        self._scan_maps()
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.assets_root)
+
+    def _watch(self, folder):
+        try:
+            self.dirs[self._rel(folder)] = os.stat(folder).st_mtime_ns
+        except OSError:
+            pass
+
+    def _files_in(self, folder, recursive=False):
+        files = []
+        if not os.path.isdir(folder):
+            return files
+        self._watch(folder)
+        for name in sorted(os.listdir(folder)):
+            full = os.path.join(folder, name)
+            if os.path.isfile(full):
+                files.append([self._rel(full), os.path.getsize(full)])
+            elif recursive and os.path.isdir(full):
+                files.extend(self._files_in(full, recursive=True))
+        return files
+
+    def _add(self, name, kind, files, deps=(), **extra):
+        bundle = {
+            "kind": kind,
+            "files": files,
+            "bytes": sum(size for _, size in files),
+            "deps": list(deps),
+        }
+        bundle.update(extra)
+        self.bundles[name] = bundle
+
+    def _scan_skills(self):
+        skills_root = os.path.join(self.assets_root, "skill-effect")
+        if not os.path.isdir(skills_root):
+            return
+        self._watch(skills_root)
+        for name in sorted(os.listdir(skills_root)):
+            folder = os.path.join(skills_root, name)
+            if os.path.isdir(folder):
+                self._add("skill:" + name, "skill", self._files_in(folder, recursive=True))
+
+    def _scan_characters(self):
+        from game.characters.template import CharacterTemplate
+
+        chars_root = os.path.join(self.assets_root, "characters")
+        if not os.path.isdir(chars_root):
+            return
+        self._watch(chars_root)
+        for name in sorted(os.listdir(chars_root)):
+            char_dir = os.path.join(chars_root, name)
+            if not os.path.isdir(char_dir):
+                continue
+            self._watch(char_dir)
+            template = CharacterTemplate(name)
+            files = []
+            folders = {}
+            seen = set()
+            for state_name in sorted(template.animation_states()):
+                folder = template.state_folder(state_name)
+                if not folder:
+                    continue
+                folders[state_name] = self._rel(folder)
+                if folder not in seen:
+                    seen.add(folder)
+                    files.extend(f for f in self._files_in(folder) if f[0].lower().endswith(".png"))
+            self._add(
+                character_bundle(name),
+                "character",
+                files,
+                deps=self._skill_deps(template.skill_specs),
+                folder=self._rel(char_dir),
+                folders=folders,
+            )
+
+    def _skill_deps(self, skill_specs):
+        deps = [d for d in DEFAULT_SKILL_DEPS if d in self.bundles]
+        for spec in skill_specs:
+            params = spec.get("params", {}) if isinstance(spec, dict) else {}
+            for value in params.values():
+                if isinstance(value, str) and "skill-effect" in value:
+                    dep = "skill:" + os.path.basename(os.path.normpath(value))
+                    if dep in self.bundles and dep not in deps:
+                        deps.append(dep)
+        return deps
+
+    def _scan_maps(self):
+        maps_root = os.path.join(self.assets_root, "maps")
+        if not os.path.isdir(maps_root):
+            return
+        self._watch(maps_root)
+        for name in sorted(os.listdir(maps_root)):
+            if not name.lower().endswith(".tmx"):
+                continue
+            tmx_path = os.path.join(maps_root, name)
+            paths = [tmx_path]
+            try:
+                paths.extend(self._map_refs(tmx_path))
+            except (ET.ParseError, OSError) as e:
+                print(f"[MANIFEST] Không đọc được {name}: {e}")
+            files = []
+            for path in dict.fromkeys(paths):
+                if os.path.isfile(path):
+                    files.append([self._rel(path), os.path.getsize(path)])
+            self._add(map_bundle(name), "map", files)
+
+    def _map_refs(self, xml_path):
+        """Tileset (.tsx) và ảnh mà file TMX/TSX tham chiếu (đường dẫn tuyệt đối)."""
+        base = os.path.dirname(xml_path)
+        refs = []
+        root = ET.parse(xml_path).getroot()
+        for tileset in root.iter("tileset"):
+            source = tileset.get("source")
+            if source:
+                tsx_path = os.path.normpath(os.path.join(base, source))
+                refs.append(tsx_path)
+                if os.path.isfile(tsx_path):
+                    refs.extend(self._map_refs(tsx_path))
+        for image in root.iter("image"):
+            source = image.get("source")
+            if source:
+                refs.append(os.path.normpath(os.path.join(base, source)))
+        return refs
+
+    def stats(self):
+        kinds = {}
+        for bundle in self.bundles.values():
+            kinds[bundle["kind"]] = kinds.get(bundle["kind"], 0) + 1
+        return {
+            'bundles': len(self.bundles),
+            'kinds': kinds,
+            'total_mb': self.total_bytes() / (1024 * 1024),
+        }
+
+
+def get_manifest():
+    """Manifest dùng chung: đọc từ cache nếu còn đúng, không thì quét assets/ và lưu lại."""
+    global _manifest
+    if _manifest is None:
+        manifest = AssetManifest()
+        if not manifest.load():
+            print("[MANIFEST] Scanning assets/ ...")
+            manifest.scan()
+            manifest.save()
+        _manifest = manifest
+    return _manifest
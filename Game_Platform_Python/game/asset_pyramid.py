@@ -0,0 +1,179 @@
+"""
+Kho ảnh đã thu nhỏ theo zoom (kiểu mipmap) cho các ảnh decor lớn của Tiled.
+
+Tileset "decore" có ảnh tới ~4000x4000px; ở ZOOM = 0.4 vẽ ảnh gốc rồi thu nhỏ
+là phí cả RAM lẫn thời gian blit. AssetPyramid tạo các bậc (level) giảm một
+nửa liên tiếp: level n = 0.5 ** n so với ảnh gốc. Với một zoom cụ thể, ảnh
+cuối cùng được smoothscale từ bậc nhỏ nhất vẫn >= zoom (nhanh và đẹp hơn
+scale thẳng từ ảnh gốc), rồi cache theo khoá (gid, zoom).
+
+Tuỳ chọn `cache_dir`: lưu ảnh đã scale ra đĩa (PNG), lần chạy sau load thẳng
+thay vì scale lại. Tên file gồm `source_key` (tên map + mtime) nên map sửa
+trong Tiled sẽ tự dùng cache mới.
+
+Ảnh gốc có thể chỉ là (gid, kích thước): khi đó `loader(gid)` decode ảnh gốc
+lúc cần scale rồi bỏ ngay, cache đĩa trúng thì không decode gì. Kho chỉ giữ bản
+đã scale (và các bậc nếu `keep_levels`), không giữ ảnh gốc.
+"""
+import os
+
+import pygame
+
+from game.config import ASSET_PYRAMID_KEEP_LEVELS
+
+
+def _zoom_key(zoom):
+    """Làm tròn zoom để dùng làm khoá cache (0.4 và 0.40000001 là một)."""
+    return round(float(zoom), 4)
+
+
+def _scaled_size(size, factor):
+    return (max(1, int(round(size[0] * factor))),
+            max(1, int(round(size[1] * factor))))
+
+
+class AssetPyramid:
+    def __init__(self, cache_dir=None, source_key="", keep_levels=ASSET_PYRAMID_KEEP_LEVELS, loader=None):
+        self.cache_dir = cache_dir
+        self.source_key = source_key
+        self.keep_levels = bool(keep_levels)
+        self.loader = loader  # gid -> ảnh gốc, cho get() không kèm ảnh
+
+        self._levels = {}  # (key, n) -> surface ở bậc 0.5 ** n
+        self._scaled = {}  # (key, zoom) -> surface đã scale đúng zoom
+
+        # Bộ đếm để kiểm tra hiệu quả cache
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.decoded = 0  # số ảnh gốc phải decode qua loader
+        self.bytes_used = 0
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError:
+                self.cache_dir = None
+
+    @staticmethod
+    def level_for(zoom):
+        """Bậc n lớn nhất sao cho 0.5 ** n >= zoom (không bao giờ phóng to ảnh bậc)."""
+        n = 0
+        while zoom > 0 and 0.5 ** (n + 1) >= zoom:
+            n += 1
+        return n
+
+    @staticmethod
+    def source_key_for(path):
+        """Khoá nguồn cho cache đĩa: tên file + mtime."""
+        try:
+            mtime = int(os.path.getmtime(path))
+        except OSError:
+            mtime = 0
+        stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+        return f"{stem}_{mtime}"
+
+    def level(self, key, image, n):
+        """Ảnh ở bậc n của `image` (tạo bằng cách giảm một nửa từ bậc trên)."""
+        if n <= 0:
+            return image
+        cached = self._levels.get((key, n))
+        if cached is not None:
+            return cached
+        parent = self.level(key, image, n - 1)
+        surf = pygame.transform.smoothscale(parent, _scaled_size(parent.get_size(), 0.5))
+        if self.keep_levels:
+            self._levels[(key, n)] = surf
+            self.bytes_used += surf.get_width() * surf.get_height() * 4
+        return surf
+
+    def get(self, gid, image, zoom, size=None):
+        """
+        Ảnh `image` (có gid trong Tiled) đã scale theo `zoom`, dùng chung giữa các layer.
+
+        `image` None: ảnh gốc kích thước `size` chỉ được decode qua `loader(gid)` khi
+        cả RAM lẫn cache đĩa đều trượt.
+        gid None (ảnh không thuộc tileset) thì dùng id(image) làm khoá và không lưu đĩa.
+        """
+        if zoom == 1.0 and image is not None:
+            return image
+        key = gid if gid else ("id", id(image))
+        zkey = _zoom_key(zoom)
+        cached = self._scaled.get((key, zkey))
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        target = _scaled_size(image.get_size() if image is not None else size, zoom)
+        surf = self._load_from_disk(key, zkey, target)
+        if surf is None and image is None:
+            image = self.loader(gid) if self.loader is not None else None
+            self.decoded += 1
+        if surf is None and image is None:
+            # Không load được ảnh gốc: ảnh trong suốt đúng kích thước, không lưu đĩa
+            surf = pygame.Surface(target, pygame.SRCALPHA)
+        elif surf is None:
+            base = self.level(key, image, self.level_for(zoom))
+            if base.get_size() == target:
+                surf = base
+            else:
+                surf = pygame.transform.smoothscale(base, target)
+            try:
+                surf = surf.convert_alpha()
+            except Exception:
+                pass
+            self._save_to_disk(key, zkey, surf)
+
+        self._scaled[(key, zkey)] = surf
+        self.bytes_used += surf.get_width() * surf.get_height() * 4
+        return surf
+
+    def _disk_path(self, key, zkey):
+        if not self.cache_dir or not isinstance(key, int):
+            return None
+        return os.path.join(self.cache_dir, f"{self.source_key}_g{key}_z{zkey}.png")
+
+    def _load_from_disk(self, key, zkey, size):
+        path = self._disk_path(key, zkey)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            surf = pygame.image.load(path)
+            try:
+                surf = surf.convert_alpha()
+            except Exception:
+                pass
+        except Exception:
+            return None
+        if surf.get_size() != size:
+            return None
+        self.disk_hits += 1
+        return surf
+
+    def _save_to_disk(self, key, zkey, surf):
+        path = self._disk_path(key, zkey)
+        if path is None:
+            return
+        try:
+            pygame.image.save(surf, path)
+        except Exception:
+            pass
+
+    def clear(self):
+        """Bỏ toàn bộ ảnh đã scale trong RAM (cache đĩa giữ nguyên)."""
+        self._levels.clear()
+        self._scaled.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """Các bộ đếm hit/miss/RAM của kho ảnh."""
+        return {
+            'scaled': len(self._scaled),
+            'levels': len(self._levels),
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'decoded': self.decoded,
+            'memory_mb': self.bytes_used / (1024 * 1024),
+        }
@@ -0,0 +1,242 @@
+"""
+Load sprite frame của character ở nền (worker thread) thay vì chặn main thread.
+
+`preload_enemies` trước đây load tuần tự mọi loại enemy trước frame đầu tiên, còn
+loại nào chưa preload thì decode PNG ngay giữa trận. AssetStreamer chia việc:
+
+- worker thread: đọc + decode PNG, scale theo scale của character, tính bottom_trim
+  rồi trả về buffer RGBA thô (không đụng tới display surface);
+- main thread (`pump()` mỗi frame, giới hạn ms): dựng surface từ buffer,
+  `convert_alpha` và đưa vào SpriteFrameStore đúng khoá `load_scaled_frames` dùng.
+
+Mỗi yêu cầu trả về một StreamTask (future: `progress`, `done`) để menu / character
+select hiển thị tiến độ. Job được xếp theo độ ưu tiên nên asset của stage hiện
+tại / stage kế tiếp trong STAGES được xử lý trước các stage sau.
+"""
+import itertools
+import os
+import queue
+import threading
+import time
+
+import pygame
+
+from game.config import (
+    ASSET_STREAM_ENABLED,
+    ASSET_STREAM_WORKERS,
+    ASSET_STREAM_PUMP_BUDGET_MS,
+)
+from game.sprite_frames import SpriteFrameStore, bottom_trim, load_scaled_frames, scaled_frames_key
+
+# Số nhỏ hơn được xử lý trước
+PRIORITY_NOW = 0         # cần ngay (character đã chọn, stage đang chơi)
+PRIORITY_NEXT = 1        # stage kế tiếp
+PRIORITY_BACKGROUND = 2  # các stage sau
+
+# pygame >= 2.1.3 đổi tên tostring -> tobytes
+_to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+
+
+class StreamTask:
+    """Future cho một nhóm asset (vd. mọi animation của một character)."""
+
+    def __init__(self, name, total):
+        self.name = name
+        self.total = total
+        self.completed = 0
+        self.errors = 0
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def done(self):
+        return self.completed >= self.total
+
+
+class _Job:
+    def __init__(self, key, folder, scale, priority):
+        self.key = key
+        self.folder = folder
+        self.scale = scale
+        self.priority = priority
+        self.tasks = []
+        self.claimed = False
+
+
+def _decode_folder(folder, scale):
+    """Chạy trên worker: [(RGBA bytes, (w, h), trim)] của các PNG trong thư mục."""
+    frames = []
+    if not os.path.isdir(folder):
+        return frames
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".png"):
+            path = os.path.join(folder, filename)
+            img = pygame.image.load(path)
+            original_w, original_h = img.get_size()
+            img = pygame.transform.scale(img, (int(original_w * scale), int(original_h * scale)))
+            frames.append((_to_bytes(img, "RGBA"), img.get_size(), bottom_trim(img, path)))
+    return frames
+
+
+class AssetStreamer:
+    _instance = None
+
+    def __new__(cls):
+        # Singleton - một pool worker cho cả game
+        if cls._instance is None:
+            cls._instance = super(AssetStreamer, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.store = SpriteFrameStore()
+        self.enabled = ASSET_STREAM_ENABLED
+        self._jobs = {}  # khoá SpriteFrameStore -> _Job đang chờ/đang decode
+        self._queue = queue.PriorityQueue()
+        self._done = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self.finished = 0
+        self._workers = []
+        if self.enabled:
+            for i in range(max(1, ASSET_STREAM_WORKERS)):
+                worker = threading.Thread(target=self._worker_loop, name=f"asset-streamer-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        self._initialized = True
+
+    # ------------------------------------------------------------------
+    # API cho main thread
+    # ------------------------------------------------------------------
+    def request_character(self, char_id, priority=PRIORITY_BACKGROUND):
+        """Stream mọi animation của `char_id`; trả về StreamTask theo dõi tiến độ."""
+        from game.characters.template import get_template
+
+        template = get_template(char_id)
+        folders = []
+        for state_name in template.animation_states():
+            folder = template.state_folder(state_name)
+            if folder:
+                folders.append(folder)
+        task = StreamTask(char_id, len(folders))
+
+        if not self.enabled:
+            # Không có worker: load đồng bộ như trước
+            template.animations
+            task.completed = task.total
+            return task
+
+        with self._lock:
+            for folder in folders:
+                key = scaled_frames_key(folder, template.scale)
+                if key in self.store:
+                    task.completed += 1
+                    continue
+                job = self._jobs.get(key)
+                if job is None:
+                    job = self._jobs[key] = _Job(key, folder, template.scale, priority)
+                    self._queue.put((priority, next(self._seq), job))
+                elif priority < job.priority and not job.claimed:
+                    # Xếp lại với độ ưu tiên cao hơn; worker bỏ qua bản trùng đã claim
+                    job.priority = priority
+                    self._queue.put((priority, next(self._seq), job))
+                job.tasks.append(task)
+        return task
+
+    def request_characters(self, char_ids, priority=PRIORITY_BACKGROUND):
+        return [self.request_character(char_id, priority) for char_id in char_ids]
+
+    def pump(self, budget_ms=ASSET_STREAM_PUMP_BUDGET_MS):
+        """Hoàn tất (convert_alpha + đưa vào SpriteFrameStore) các job xong, tối đa `budget_ms` (None = hết)."""
+        if not self.enabled:
+            return 0
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+        count = 0
+        while True:
+            try:
+                item = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._finalize(*item)
+            count += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return count
+
+    def wait(self, tasks):
+        """Chặn (vẫn pump) tới khi mọi task xong - dùng khi asset bắt buộc phải có ngay."""
+        tasks = list(tasks)
+        while self.enabled and not all(task.done for task in tasks):
+            try:
+                item = self._done.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._finalize(*item)
+
+    @staticmethod
+    def progress_of(tasks):
+        """Tiến độ chung (0..1) của nhiều task, tính theo số thư mục animation."""
+        total = sum(task.total for task in tasks)
+        if not total:
+            return 1.0
+        return sum(min(task.completed, task.total) for task in tasks) / total
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._jobs)
+        return {
+            'workers': len(self._workers),
+            'pending': pending,
+            'ready': self._done.qsize(),
+            'finished': self.finished,
+        }
+
+    # ------------------------------------------------------------------
+    # Nội bộ
+    # ------------------------------------------------------------------
+    def _worker_loop(self):
+        disk_cache = self.store.disk_cache
+        while True:
+            _, _, job = self._queue.get()
+            with self._lock:
+                if job.claimed:
+                    continue
+                job.claimed = True
+            try:
+                if disk_cache is not None and disk_cache.has_bundle(job.folder, job.key):
+                    # Đã có bundle trên đĩa: main thread đọc qua mmap còn nhanh hơn
+                    payload = None
+                else:
+                    payload = _decode_folder(job.folder, job.scale)
+                self._done.put((job, payload, None))
+            except Exception as e:
+                self._done.put((job, None, e))
+
+    def _finalize(self, job, payload, error):
+        if error is not None:
+            print(f"[ASSET_STREAM] Lỗi decode {job.folder}: {error}")
+        elif payload is None:
+            load_scaled_frames(job.folder, job.scale)
+        else:
+            frames = []
+            for raw, size, trim in payload:
+                surf = pygame.image.frombuffer(raw, size, "RGBA")
+                try:
+                    surf = surf.convert_alpha()
+                except pygame.error:
+                    surf = surf.copy()
+                frames.append((surf, trim))
+            self.store.get(job.key, lambda: frames, folder=job.folder)
+
+        with self._lock:
+            self._jobs.pop(job.key, None)
+            tasks = job.tasks
+        for task in tasks:
+            task.completed += 1
+            if error is not None:
+                task.errors += 1
+        self.finished += 1
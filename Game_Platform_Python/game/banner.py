@@ -0,0 +1,217 @@
+"""
+Banner thông báo stage / VICTORY được dựng sẵn thành một surface.
+
+Trước đây mỗi frame thông báo stage và màn VICTORY render lại cùng một chuỗi tới
+~120 lần (viền tròn bán kính 6 theo dx/dy, 10 lớp glow, 8 lớp shadow) và tạo
+`SysFont` mới với size nhịp đập. BannerRenderer:
+
+- ghép viền, glow, shadow và chữ chính vào một surface cho mỗi biến thể
+  (chuỗi, size, màu) - render đúng một lần;
+- hiệu ứng nhịp đập dựng banner ở size lớn nhất rồi thu nhỏ surface đã cache,
+  tỉ lệ làm tròn theo BANNER_SCALE_STEP nên mỗi bậc cũng chỉ scale một lần.
+"""
+import pygame
+
+from game.config import BANNER_SCALE_STEP
+from game.hud import get_font
+
+# Viền dày quanh chữ
+OUTLINE_RING_8 = ((-2, 0), (2, 0), (0, -2), (0, 2), (-1, -1), (1, 1), (-1, 1), (1, -1))
+OUTLINE_RING_8_WIDE = ((-3, 0), (3, 0), (0, -3), (0, 3), (-2, -2), (2, 2), (-2, 2), (2, -2))
+
+# Biên độ nhịp đập của màn VICTORY (size gốc * (1 ± biên độ))
+VICTORY_PULSE = 0.15
+VICTORY_SUBTITLE_PULSE = 0.1
+
+
+def circle_offsets(radius):
+    """Mọi (dx, dy) khác (0, 0) trong hình tròn bán kính `radius`."""
+    return tuple(
+        (dx, dy)
+        for dx in range(-radius, radius + 1)
+        for dy in range(-radius, radius + 1)
+        if dx * dx + dy * dy <= radius * radius and (dx != 0 or dy != 0)
+    )
+
+
+class Banner:
+    """Surface đã ghép + vị trí chữ chính trong surface đó."""
+
+    def __init__(self, surface, origin, text_size):
+        self.surface = surface
+        self.origin = origin  # góc trên trái của chữ chính trong surface
+        self.text_size = text_size
+        self._scaled = {}  # tỉ lệ đã làm tròn -> (surface, origin, text_size)
+
+    def scaled(self, scale):
+        step = BANNER_SCALE_STEP
+        scale = round(scale / step) * step
+        if abs(scale - 1.0) < 1e-6:
+            return self.surface, self.origin, self.text_size
+        cached = self._scaled.get(scale)
+        if cached is None:
+            w, h = self.surface.get_size()
+            surf = pygame.transform.smoothscale(
+                self.surface, (max(1, int(w * scale)), max(1, int(h * scale)))
+            )
+            cached = self._scaled[scale] = (
+                surf,
+                (self.origin[0] * scale, self.origin[1] * scale),
+                (self.text_size[0] * scale, self.text_size[1] * scale),
+            )
+        return cached
+
+
+def compose(font, layers):
+    """
+    Ghép các lớp chữ thành một Banner.
+
+    `layers`: list (text, color, offsets, alpha) vẽ theo thứ tự; offset tính từ góc
+    trên trái của chữ chính (lớp cuối cùng, thường offsets=((0, 0),)).
+    """
+    rendered = []
+    left = top = 0
+    right = bottom = 0
+    for text, color, offsets, alpha in layers:
+        surf = font.render(text, True, color)
+        if alpha is not None:
+            surf.set_alpha(alpha)
+        w, h = surf.get_size()
+        for dx, dy in offsets:
+            left, top = min(left, dx), min(top, dy)
+            right, bottom = max(right, dx + w), max(bottom, dy + h)
+        rendered.append((surf, offsets))
+    main = rendered[-1][0]
+    canvas = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+    for surf, offsets in rendered:
+        for dx, dy in offsets:
+            canvas.blit(surf, (dx - left, dy - top))
+    return Banner(canvas, (-left, -top), main.get_size())
+
+
+class BannerRenderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self._banners = {}
+        self._panels = {}
+
+    def get(self, key, build):
+        banner = self._banners.get(key)
+        if banner is None:
+            banner = self._banners[key] = build()
+        return banner
+
+    def draw(self, banner, center, scale=1.0):
+        """Vẽ banner sao cho chữ chính nằm giữa `center`; trả về rect của chữ chính."""
+        surf, origin, text_size = banner.scaled(scale)
+        x = center[0] - text_size[0] / 2
+        y = center[1] - text_size[1] / 2
+        self.screen.blit(surf, (int(x - origin[0]), int(y - origin[1])))
+        return pygame.Rect(int(x), int(y), int(text_size[0]), int(text_size[1]))
+
+    def panel(self, rect, color, alpha):
+        """Nền chữ nhật trong suốt (surface cache theo kích thước)."""
+        key = (rect.size, color, alpha)
+        surf = self._panels.get(key)
+        if surf is None:
+            surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+            surf.fill((*color, alpha))
+            self._panels[key] = surf
+        self.screen.blit(surf, rect)
+
+    # ------------------------------------------------------------------
+    # Màn VICTORY
+    # ------------------------------------------------------------------
+    def victory_title(self, color):
+        """Chữ VICTORY (glow + shadow + viền vàng kim), dựng ở size lớn nhất của nhịp đập."""
+        size = int(100 * (1 + VICTORY_PULSE))
+
+        def build():
+            return compose(
+                get_font(size, bold=True),
+                [
+                    # Glow vàng nhạt mờ dần
+                    *(("VICTORY!", (255, 255, 100), ((-i, -i),), int(100 / i)) for i in range(10, 0, -1)),
+                    # Shadow đen dày
+                    (" VICTORY! ", (0, 0, 0), tuple((o, o) for o in range(8, 0, -1)), None),
+                    # Outline vàng kim cực dày
+                    (" VICTORY! ", (255, 223, 0), circle_offsets(6), None),
+                    (" VICTORY !", color, ((0, 0),), None),
+                ],
+            )
+
+        return self.get(("victory_title", color), build), 1 + VICTORY_PULSE
+
+    def victory_subtitle(self):
+        size = int(48 * (1 + VICTORY_SUBTITLE_PULSE))
+        text = "ALL STAGES COMPLETED!"
+
+        def build():
+            return compose(
+                get_font(size, bold=True),
+                [
+                    (text, (0, 0, 0), ((4, 4), (3, 3), (2, 2)), None),
+                    (text, (50, 50, 50), OUTLINE_RING_8_WIDE, None),
+                    (text, (255, 255, 255), ((0, 0),), None),
+                ],
+            )
+
+        return self.get("victory_subtitle", build), 1 + VICTORY_SUBTITLE_PULSE
+
+    def victory_hint(self):
+        text = "Press R to Play Again or Q to Quit"
+
+        def build():
+            return compose(
+                get_font(32, bold=True),
+                [
+                    (text, (0, 0, 0), ((3, 3), (2, 2), (1, 1)), None),
+                    (text, (100, 100, 100), OUTLINE_RING_8, None),
+                    (text, (255, 255, 255), ((0, 0),), None),
+                ],
+            )
+
+        return self.get("victory_hint", build)
+
+    def prewarm_victory(self):
+        """Dựng sẵn mọi banner của màn VICTORY (gọi lúc vào session, tránh giật khi thắng)."""
+        for color in ((255, 215, 0), (255, 140, 0)):
+            self.victory_title(color)
+        self.victory_subtitle()
+        self.victory_hint()
+
+    # ------------------------------------------------------------------
+    # Thông báo stage
+    # ------------------------------------------------------------------
+    def stage_title(self, text, color, outline_color):
+        def build():
+            return compose(
+                get_font(72, bold=True),
+                [
+                    (text, (0, 0, 0), ((4, 4),), None),
+                    (text, outline_color, circle_offsets(4), None),
+                    (text, color, ((0, 0),), None),
+                ],
+            )
+
+        return self.get(("stage_title", text, color, outline_color), build)
+
+    def stage_subtitle(self, text, color):
+        def build():
+            return compose(
+                get_font(36, bold=True),
+                [
+                    (text, (0, 0, 0), ((2, 2),), None),
+                    (text, (0, 0, 0), OUTLINE_RING_8, None),
+                    (text, color, ((0, 0),), None),
+                ],
+            )
+
+        return self.get(("stage_subtitle", text, color), build)
+
+    def stats(self):
+        return {
+            'banners': len(self._banners),
+            'scaled': sum(len(b._scaled) for b in self._banners.values()),
+            'panels': len(self._panels),
+        }
@@ -2,6 +2,7 @@ import pygame
 import os
 import math
 from game.menu import MenuItem
+from game.asset_streamer import AssetStreamer
 
 
 class CharacterSelectMenu:
@@ -271,6 +272,9 @@ class CharacterSelectMenu:
     def run(self):
         running = True
         while running:
+            # Sprite enemy đang load nền: hoàn tất phần đã decode xong
+            AssetStreamer().pump()
+
             # Màu nền tối
             self.screen.fill((15, 15, 30))
 
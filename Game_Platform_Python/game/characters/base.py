@@ -1,7 +1,9 @@
 import pygame
 import os
 
-from game.config import PLAYER_SCALE, GRAVITY
+from game.config import PLAYER_SCALE, GRAVITY, SIM_DT
+from game.sprite_frames import SpriteFrameStore, frame_for
+from game.sim_clock import tick_scale, fall
 
 
 class Character:
@@ -29,9 +31,16 @@ class Character:
         self.sprite_path = sprite_path
 
     def load_frames(self, folder, size):
-        frames = []
         if not folder:
-            return frames
+            return []
+        return SpriteFrameStore().get(
+            ("character", os.path.normpath(folder), tuple(size)),
+            lambda: self._load_frames_from_disk(folder, size),
+            folder=folder,
+        )
+
+    def _load_frames_from_disk(self, folder, size):
+        frames = []
         if not os.path.isdir(folder):
             return frames
         for filename in sorted(os.listdir(folder)):
@@ -44,15 +53,14 @@ class Character:
     def draw(self, surface, camera_x=0, camera_y=0):
         if self.state not in self.animations or not self.animations[self.state]:
             return
-        frame_surf, bottom_trim = self.animations[self.state][self.current_frame]
-        if not self.facing_right:
-            frame_surf = pygame.transform.flip(frame_surf, True, False)
+        frame_surf, bottom_trim = frame_for(self.animations[self.state], self.current_frame,
+                                            self.facing_right)
         sprite_rect = frame_surf.get_rect(midbottom=(self.rect.centerx - camera_x,
                                                      self.rect.bottom - camera_y + bottom_trim))
         surface.blit(frame_surf, sprite_rect)
 
     # --- Minimal Player-like API so Character can be a safe fallback ---
-    def handle_input(self):
+    def handle_input(self, dt=SIM_DT):
         # Default fallback does not handle input; subclasses or Player handle it.
         return
 
@@ -99,18 +107,19 @@ class Character:
                         s['active'] = False
                         self.vel_x = 0
 
-    def move(self, platforms):
+    def move(self, platforms, dt=SIM_DT):
         # Simple movement + gravity and collision resolution similar to Player.move
+        ticks = tick_scale(dt)
         if getattr(self, 'vel_x', 0) != 0:
-            self.rect.x += int(self.vel_x)
+            self.rect.x += int(self.vel_x * ticks)
             for _, plat in platforms:
                 if self.rect.colliderect(plat):
                     if self.vel_x > 0:
                         self.rect.right = plat.left
                     elif self.vel_x < 0:
                         self.rect.left = plat.right
-        self.vel_y += GRAVITY
-        self.rect.y += int(self.vel_y)
+        dy, self.vel_y = fall(self.vel_y, GRAVITY, ticks)
+        self.rect.y += int(dy)
         self.on_ground = False
         for _, plat in platforms:
             if self.rect.colliderect(plat):
@@ -122,11 +131,11 @@ class Character:
                     self.rect.top = plat.bottom
                     self.vel_y = 0
 
-    def update_animation(self):
+    def update_animation(self, dt=SIM_DT):
         frames = self.animations.get(self.state, [])
         if not frames:
             return
-        self.animation_timer += self.animation_speed
+        self.animation_timer += self.animation_speed * tick_scale(dt)
         if self.state == 'jump':
             if self.current_frame < len(frames) - 1:
                 if self.animation_timer >= 1:
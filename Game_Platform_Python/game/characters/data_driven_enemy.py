@@ -1,17 +1,25 @@
 # game/characters/data_driven_enemy.py
 import pygame
 from game.config import PLAYER_SCALE, GRAVITY
+from game.map_loader import platforms_near
+from game.sprite_frames import frame_for
+from game.projectile_system import TEAM_ENEMY
+from game.render_targets import mark_drawn
+from game.sim_clock import tick_scale, fall
 
 
 class DataDrivenEnemy:
-    """Enemy generic: visual loaded by char_id via factory; behavior is simple patrol/chase.
+    """Enemy generic: visual loaded by char_id via CharacterTemplate; behavior is simple patrol/chase.
 
     Implementation notes:
-    - Import the characters.factory.create_player lazily inside __init__ to avoid
+    - Import game.characters.template lazily inside __init__ to avoid
       import-time circular dependencies that previously caused registration to fail.
     - If loading visuals fails, fall back to empty animations so the enemy can still be used.
     """
 
+    # Projectile do enemy bắn chỉ va chạm với player (xem ProjectileSystem)
+    projectile_team = TEAM_ENEMY
+
     def __init__(self, x, y, char_id="bluewizard", patrol_range=200, speed=80):
         # Initialize sound manager
         try:
@@ -23,29 +31,47 @@ class DataDrivenEnemy:
             self.sound_manager = None
 
         # Lazy import to avoid circular import problems during module import
+        template = None
+        try:
+            from game.characters.template import get_template
+
+            template = get_template(char_id)
+        except Exception:
+            pass
+
+        # Animation dùng chung từ template (dict riêng, FrameSequence chung)
+        try:
+            self.animations = dict(template.animations) if template else {}
+        except Exception:
+            self.animations = {}
+        # Hitbox cùng kích thước Player của character này
+        self.rect = template.hitbox(x, y) if template else pygame.Rect(x, y, int(120 * 1.0), int(240 * 1.0))
+        self.rect.midbottom = (x, y)
+        # Skill instance riêng cho enemy (mặc định của Player + metadata)
         try:
-            from game.characters.factory import create_player as create_visual
+            self.skills = template.create_skills(self) if template else {}
         except Exception:
-            create_visual = None
-
-        visual = None
-        if create_visual:
-            try:
-                visual = create_visual(char_id, x, y)
-            except Exception:
-                pass
-
-        # copy animations (factory returns Character-like with .animations)
-        self.animations = getattr(visual, 'animations', {}) or {}
-        # Copy skills from visual (loaded by factory from metadata)
-        self.skills = getattr(visual, 'skills', {}) or {}
-        # ensure frames are tuples (surface, trim). factory.load_frames returns (surface, 0) if implemented that way
-        # We'll accept either (surface) or (surface, trim)
-        # Hitbox: create a rect similar to Character default or reuse visual.rect
-        self.rect = getattr(
-            visual, "rect", pygame.Rect(x, y, int(120 * 1.0), int(240 * 1.0))
-        ).copy()
+            self.skills = {}
+        self.char_id = char_id
+        self.patrol_range = patrol_range
+        self.base_move_speed = speed
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """
+        Đưa enemy về trạng thái vừa spawn tại (x, y) mà không load lại gì.
+
+        EnemyPool gọi hàm này khi tái sử dụng instance; subclass override để
+        reset thêm state riêng (nhớ gọi super().reset(x, y) trước).
+        """
         self.rect.midbottom = (x, y)
+        for skill in self.skills.values():
+            if hasattr(skill, "reset"):
+                skill.reset()
+            elif isinstance(skill, dict):
+                # legacy dict skill (dash)
+                skill["last_used"] = -999.0
+                skill["active"] = False
         self.state = "idle"
         self.current_frame = 0
         self.anim_timer = 0.0
@@ -53,9 +79,9 @@ class DataDrivenEnemy:
         self.attack_anim_speed = 0.11  # Animation tấn công nhanh
         self.hurt_anim_speed = 0.08  # Animation bị đánh
         self.dying_anim_speed = 0.05  # Animation chết
-        self.patrol_min = x - patrol_range
-        self.patrol_max = x + patrol_range
-        self.speed = speed
+        self.patrol_min = x - self.patrol_range
+        self.patrol_max = x + self.patrol_range
+        self.speed = self.base_move_speed
         self.direction = -1
         # physics
         self.vel_y = 0
@@ -63,13 +89,13 @@ class DataDrivenEnemy:
         # attack / damage
         self.detection_range = 400
         self.attack_range = 120
-        self.attack_damage = getattr(visual, "attack_damage", 10)
+        self.attack_damage = 10
         self.attack_cooldown = (
             1.5  # Cooldown giữa các lần mất máu (tăng = mất máu chậm hơn)
         )
         self._attack_cooldown_timer = 0.0
         self._attack_hit_frame = False  # Đánh dấu đã gây damage trong đợt attack này
-        self.max_hp = getattr(visual, "max_hp", 100)  # Tăng HP lên 100
+        self.max_hp = 100  # Tăng HP lên 100
         self.hp = self.max_hp
         self.dead = False
         self.dying = False  # Đang trong trạng thái chết
@@ -103,13 +129,12 @@ class DataDrivenEnemy:
             if self.hurt_timer <= 0.0:
                 self.state = "idle"  # Quay lại idle sau hurt
 
-        # gravity
-        self.vel_y += GRAVITY
-        # apply vertical velocity (follow PatrolEnemy behavior: vel_y already in px/frame)
-        self.rect.y += int(self.vel_y)
-        # check collision with platforms (vertical)
+        # gravity (follow PatrolEnemy behavior: vel_y in px per reference tick)
+        dy, self.vel_y = fall(self.vel_y, GRAVITY, tick_scale(dt))
+        self.rect.y += int(dy)
+        # check collision with platforms (vertical), neighbourhood only via grid
         self.on_ground = False
-        for _, platform_rect in platforms:
+        for _, platform_rect in platforms_near(platforms, self.rect, abs(int(dy))):
             if self.rect.colliderect(platform_rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform_rect.top
@@ -222,7 +247,7 @@ class DataDrivenEnemy:
             return
         frames = self.animations.get(self.state) or []
         if not frames:
-            pygame.draw.rect(
+            mark_drawn(surface, pygame.draw.rect(
                 surface,
                 (150, 50, 50),
                 (
@@ -231,25 +256,16 @@ class DataDrivenEnemy:
                     self.rect.width,
                     self.rect.height,
                 ),
-            )
+            ))
             return
-        # accept frames item either (surf) or (surf, trim)
-        entry = frames[self.current_frame]
-        if isinstance(entry, tuple) and len(entry) >= 1:
-            frame = entry[0]
-            trim = entry[1] if len(entry) > 1 else 0
-        else:
-            frame = entry
-            trim = 0
-        img = (
-            frame if self.direction >= 0 else pygame.transform.flip(frame, True, False)
-        )
+        # accept frames item either (surf) or (surf, trim); hướng trái dùng frame lật sẵn
+        img, trim = frame_for(frames, self.current_frame, self.direction >= 0)
         img_rect = img.get_rect(
             midbottom=(self.rect.centerx - camera_x, self.rect.bottom - camera_y + trim)
         )
         surface.blit(img, img_rect)
         if show_hitbox:
-            pygame.draw.rect(
+            mark_drawn(surface, pygame.draw.rect(
                 surface,
                 (255, 0, 0),
                 (
@@ -259,7 +275,7 @@ class DataDrivenEnemy:
                     self.rect.height,
                 ),
                 2,
-            )
+            ))
 
         # Vẽ thanh máu phía trên đầu quái (chỉ khi chưa chết)
         if not self.dying and not self.dead and self.hp < self.max_hp:
@@ -272,11 +288,11 @@ class DataDrivenEnemy:
             )  # Khoảng cách từ đỉnh đầu quái (tăng lên để xa hơn)
 
             # Background (thanh đen)
-            pygame.draw.rect(
+            mark_drawn(surface, pygame.draw.rect(
                 surface,
                 (0, 0, 0),
                 (bar_x - 1, bar_y - 1, bar_width + 2, bar_height + 2),
-            )
+            ))
 
             # HP bar (thanh đỏ)
             hp_ratio = max(0, self.hp / self.max_hp)
@@ -291,9 +307,9 @@ class DataDrivenEnemy:
                 bar_color = (255, 0, 0)  # Đỏ
 
             if current_bar_width > 0:
-                pygame.draw.rect(
+                mark_drawn(surface, pygame.draw.rect(
                     surface, bar_color, (bar_x, bar_y, current_bar_width, bar_height)
-                )
+                ))
 
     def take_damage(self, amount):
         if self.dying or self.dead:
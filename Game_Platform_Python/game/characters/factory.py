@@ -1,28 +1,41 @@
 import os
-import json
-from typing import List
+from typing import Dict, List, Optional
 
 from game.characters.base import Character
-from game.characters.registry import get_skill
+from game.characters.template import get_template
+from game.sprite_frames import SpriteFrameStore
 
-# Animation cache để tránh load lại sprite nhiều lần
-_animation_cache = {}
+# Frame animation được cache (kèm bản lật) trong SpriteFrameStore, dùng chung mọi instance
 _preloaded_enemies = {}  # Cache cho enemy instances đã tạo sẵn
 
 
-def preload_enemies(enemy_types: List[str]):
-    """Preload tất cả enemy types để tránh lag khi spawn"""
+def preload_enemies(enemy_types: List[str], prewarm: Optional[Dict[str, int]] = None):
+    """Preload tất cả enemy types để tránh lag khi spawn.
+
+    `prewarm` (enemy id -> số lượng) tạo sẵn instance trong EnemyPool để chuyển
+    stage không phải cấp phát enemy mới. Frame được decode qua AssetStreamer.
+    """
     print(f"[PRELOAD] Loading {len(enemy_types)} enemy types...")
+    # Decode song song trên worker; job đã xếp hàng từ menu chỉ được nâng ưu tiên
+    from game.asset_streamer import AssetStreamer, PRIORITY_NOW
+
+    streamer = AssetStreamer()
+    streamer.wait(streamer.request_characters(enemy_types, PRIORITY_NOW))
     for enemy_type in enemy_types:
         if enemy_type not in _preloaded_enemies:
             try:
-                # Tạo 1 instance để force load animations vào cache
-                temp_enemy = create_player(enemy_type, 0, 0)
-                print(f"[PRELOAD] ✓ {enemy_type} cached")
-                # Không lưu instance, chỉ cần animations đã vào cache
+                # Parse metadata + load animation dùng chung, không cần dựng Player
+                get_template(enemy_type).animations
+                if prewarm and prewarm.get(enemy_type):
+                    from game.enemy_pool import EnemyPool
+
+                    pooled = EnemyPool().prewarm(enemy_type, prewarm[enemy_type])
+                    print(f"[PRELOAD] ✓ {enemy_type} cached, +{pooled} pooled")
+                else:
+                    print(f"[PRELOAD] ✓ {enemy_type} cached")
             except Exception as e:
                 print(f"[PRELOAD] ✗ {enemy_type} failed: {e}")
-    print(f"[PRELOAD] Complete! Cache size: {len(_animation_cache)}")
+    print(f"[PRELOAD] Complete! Cache size: {len(SpriteFrameStore())}")
 
 
 def _list_character_dirs(base_path: str) -> List[str]:
@@ -48,52 +61,11 @@ def create_player(char_id: str, x: int, y: int) -> Character:
     This factory is intentionally conservative: if metadata or sprite folders
     are missing it will still return a basic Character to avoid breaking the game.
     """
-    # try to read metadata
-    # repo_root = parent of 'game' directory (project root)
-    repo_root = os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), '..'))
-    
-    # Find character folder case-insensitively (Windows: Golem_02 vs golem_02)
-    chars_root = os.path.join(repo_root, 'assets', 'characters')
-    actual_char_folder = char_id
-    if os.path.isdir(chars_root):
-        for folder_name in os.listdir(chars_root):
-            if folder_name.lower() == char_id.lower() and os.path.isdir(os.path.join(chars_root, folder_name)):
-                actual_char_folder = folder_name
-                break
-    
-    assets_chars = os.path.join(repo_root, 'assets', 'characters', actual_char_folder)
-    meta_path = os.path.join(assets_chars, 'metadata.json')
-
-    meta = {}
-    if os.path.isfile(meta_path):
-        try:
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                meta = json.load(f)
-        except Exception:
-            meta = {}
-
-    sprite_path = meta.get('sprite_path') or assets_chars
-    # If sprite_path is relative, make it relative to repo root
-    if sprite_path and not os.path.isabs(sprite_path):
-        sprite_path = os.path.normpath(os.path.join(repo_root, sprite_path))
-    scale = meta.get('scale', 1.0)
-    frames_map = meta.get('frames', {}) if isinstance(meta.get('frames', {}), dict) else {}
-    
-    # Resolve frames_map paths to absolute paths before passing to Player
-    resolved_frames = {}
-    for state_name, folder in frames_map.items():
-        if folder:
-            candidates = [
-                folder,  # if absolute
-                os.path.join(repo_root, folder),  # relative to repo root
-                os.path.join(assets_chars, folder),  # relative to assets_chars
-                os.path.join(sprite_path or assets_chars, folder),  # relative to sprite_path
-            ]
-            for cand in candidates:
-                cand = os.path.normpath(cand)
-                if os.path.isdir(cand):
-                    resolved_frames[state_name] = cand
-                    break
+    # metadata + đường dẫn đã resolve được parse một lần cho mỗi char_id
+    template = get_template(char_id)
+    sprite_path = template.sprite_path
+    scale = template.scale
+    resolved_frames = template.resolved_frames
 
     # Tạo instance Player (nếu có) để giữ nguyên logic input/move/animation.
     # Import Player lazily to avoid circular import at module import time.
@@ -118,67 +90,12 @@ def create_player(char_id: str, x: int, y: int) -> Character:
     # Attach skills from metadata (data-driven). Each skill entry in metadata
     # should be an object like {"id": "dash", "params": {...}}.
     # Don't clobber existing skills (Player may have defaults); merge instead.
-    existing_skills = getattr(c, 'skills', {}) or {}
-    for s in meta.get('skills', []):
-        sid = s.get('id') if isinstance(s, dict) else s
-        params = s.get('params', {}) if isinstance(s, dict) else {}
-        cls = get_skill(sid)
-        if cls:
-            try:
-                existing_skills[sid] = cls(**params)
-            except Exception:
-                # If instantiation fails, skip to keep factory robust
-                pass
-        else:
-            # If not a registered Skill class, keep raw dict params if provided
-            if isinstance(s, dict):
-                existing_skills[sid] = params
-
-    c.skills = existing_skills
+    c.skills = template.create_skills(c, getattr(c, 'skills', {}) or {})
     # Attempt to load animations. Prefer explicit folders in metadata['frames']
     sprite_size = (int(512 * scale), int(512 * scale))
-    frames_map = meta.get('frames', {}) if isinstance(meta.get('frames', {}), dict) else {}
-
-    def _load_state(state_name):
-        # Try several resolutions for folder paths (absolute, relative to repo, under sprite_path)
-        folder = frames_map.get(state_name)
-        candidates = []
-        if folder:
-            # if absolute, try directly
-            candidates.append(folder)
-            # try relative to repo root
-            candidates.append(os.path.join(repo_root, folder))
-            # try relative to assets_chars
-            candidates.append(os.path.join(assets_chars, folder))
-            # try relative to sprite_path
-            candidates.append(os.path.join(sprite_path or assets_chars, folder))
-        # also try default sprite_path/<state_name>
-        candidates.append(os.path.join(sprite_path or assets_chars, state_name))
-
-        for cand in candidates:
-            cand = os.path.normpath(cand)
-            if os.path.isdir(cand):
-                # Check cache first
-                cache_key = (cand, sprite_size[0], sprite_size[1])
-                if cache_key in _animation_cache:
-                    return _animation_cache[cache_key]
-                # Load and cache
-                frames = c.load_frames(cand, sprite_size)
-                _animation_cache[cache_key] = frames
-                return frames
-
-        # If nothing found, return empty
-        return []
-
-    # Load all states defined in metadata frames, plus common defaults
-    states_to_load = set(['idle', 'walk', 'jump', 'dash', 'attack', 'hurt', 'dying'])
-    
-    # Add any additional states from metadata
-    if frames_map:
-        states_to_load.update(frames_map.keys())
-    
-    # Load all states
-    for state_name in states_to_load:
-        c.animations[state_name] = _load_state(state_name)
+    for state_name in template.animation_states():
+        folder = template.state_folder(state_name)
+        # load_frames tra SpriteFrameStore trước, chỉ đọc đĩa lần đầu
+        c.animations[state_name] = c.load_frames(folder, sprite_size) if folder else []
 
     return c
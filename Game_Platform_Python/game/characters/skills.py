@@ -10,6 +10,10 @@ import pygame
 
 from game.characters import registry
 from game.config import SPEED
+from game.projectile_system import ProjectileSystem
+from game.enemy_grid import enemies_in_radius, enemies_in_rect
+from game.sim_clock import game_time
+from game.render_targets import mark_drawn
 
 
 class SkillBase:
@@ -18,6 +22,9 @@ class SkillBase:
     Subclasses should override `use` and `update` as necessary.
     """
 
+    # Skill bắn projectile: viên đạn nằm trong ProjectileSystem, không ở skill
+    uses_projectiles = False
+
     def __init__(self, **params):
         self.params = params
         self.cooldown = params.get("cooldown", 0.0)
@@ -39,6 +46,28 @@ class SkillBase:
         """Update skill timers/effects. Override in subclasses."""
         pass
 
+    def reset(self) -> None:
+        """Back to the just-created state (owner reused from an EnemyPool).
+
+        Clears cooldown plus the common charge/projectile state; subclasses
+        with extra timers extend this.
+        """
+        self.last_used = -999.0
+        self.active = False
+        if self.uses_projectiles:
+            ProjectileSystem().clear_source(self)
+        if hasattr(self, "charging"):
+            self.charging = False
+
+    def spawn_projectile(self, owner, x, y, vx, vy, damage, **kwargs):
+        """Thêm projectile của skill này vào ProjectileSystem (frames đã scale sẵn)."""
+        ProjectileSystem().spawn(
+            self, owner, x, y, vx, vy, self.projectile_frames, self.lifetime, damage, **kwargs
+        )
+
+    def projectile_count(self) -> int:
+        return ProjectileSystem().count_for(self)
+
 
 class DashSkill(SkillBase):
     def __init__(
@@ -71,40 +100,28 @@ class DashSkill(SkillBase):
 
     def load_effect_frames(self):
         """Load visual effect frames from the specified path."""
-        import pygame
-        import os
-
         if not self.frames_path:
             return
 
         try:
             # Convert relative path to absolute
             if not os.path.isabs(self.frames_path):
-                repo_root = os.path.normpath(
-                    os.path.join(os.path.dirname(os.path.dirname(__file__)), "..")
-                )
-                full_path = os.path.join(repo_root, self.frames_path)
+                full_path = os.path.join(_REPO_ROOT, self.frames_path)
             else:
                 full_path = self.frames_path
 
             if os.path.exists(full_path):
-                files = sorted([f for f in os.listdir(full_path) if f.endswith(".png")])
-                for filename in files:
-                    img_path = os.path.join(full_path, filename)
-                    img = pygame.image.load(img_path)
-                    try:
-                        img = img.convert_alpha()
-                    except pygame.error:
-                        try:
-                            img = img.convert()
-                        except pygame.error:
-                            pass
-                    # Scale the effect
-                    img = pygame.transform.scale(img, (128, 128))
-                    self.effect_frames.append(img)
+                # Scale the effect (cache dùng chung giữa các instance)
+                self.effect_frames = list(effect_frames(full_path, size=(128, 128)))
         except Exception as e:
             print(f"Failed to load dash effect frames: {e}")
 
+    def reset(self) -> None:
+        super().reset()
+        self.time_left = 0.0
+        self.effect_frame_index = 0
+        self.effect_timer = 0.0
+
     def use(self, now: float, owner) -> bool:
         if not super().use(now, owner):
             return False
@@ -191,87 +208,111 @@ _REPO_ROOT = os.path.normpath(
     os.path.join(os.path.dirname(os.path.dirname(__file__)), "..")
 )
 
+# Frame hiệu ứng skill dùng chung giữa mọi skill instance (player + mọi enemy):
+# (thư mục, scale, size, file, trim) -> list frame. Đọc đĩa + scale đúng một lần.
+_effect_frame_cache = {}
 
-class Projectile:
-    def __init__(
-        self, x, y, vx, vy, frames, lifetime=1.5, damage=25, owner=None, scale=1.0
-    ):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.raw_frames = frames or []
-        self.scale = float(scale) if scale is not None else 1.0
-        # prepare scaled frames (surface, trim)
-        self.frames = []
-        for item in self.raw_frames:
+
+def _convert(img):
+    # Try convert_alpha, fallback to convert if display not set
+    try:
+        return img.convert_alpha()
+    except pygame.error:
+        try:
+            return img.convert()
+        except pygame.error:
+            return img  # Use original if conversion fails
+
+
+def _first_dir(candidates):
+    """Thư mục đầu tiên tồn tại trong các candidate (đã normpath), hoặc None."""
+    for cand in candidates:
+        cand = os.path.normpath(cand)
+        if os.path.isdir(cand):
+            return cand
+    return None
+
+
+def effect_frames(folder, scale=1.0, size=None, files=None, with_trim=False):
+    """Frame PNG của `folder` (scale theo tỉ lệ hoặc `size` cố định), cache theo (folder, scale).
+
+    `files` giới hạn danh sách file (theo thứ tự); mặc định mọi .png đã sort.
+    `with_trim=True` trả về (surface, 0) như projectile dùng. List trả về là
+    dùng chung - không sửa trực tiếp.
+    """
+    if not folder:
+        return []
+    key = (os.path.normpath(folder), float(scale), size, tuple(files) if files else None, with_trim)
+    frames = _effect_frame_cache.get(key)
+    if frames is not None:
+        return frames
+    frames = []
+    if os.path.isdir(folder):
+        names = files or sorted(f for f in os.listdir(folder) if f.lower().endswith(".png"))
+        for name in names:
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path):
+                continue
             try:
-                surf, trim = item
-            except Exception:
-                surf = item
-                trim = 0
-            if self.scale != 1.0 and surf is not None:
-                w, h = surf.get_size()
-                sw = max(1, int(w * self.scale))
-                sh = max(1, int(h * self.scale))
-                try:
-                    scaled = pygame.transform.scale(surf, (sw, sh))
-                except Exception:
-                    scaled = surf
-                self.frames.append((scaled, trim))
-            else:
-                self.frames.append((surf, trim))
+                img = _convert(pygame.image.load(path))
+            except Exception as e:
+                print(f"Error loading effect frame {path}: {e}")
+                continue
+            if size is not None:
+                img = pygame.transform.scale(img, size)
+            elif scale != 1.0:
+                w, h = img.get_size()
+                img = pygame.transform.scale(img, (max(1, int(w * scale)), max(1, int(h * scale))))
+            frames.append((img, 0) if with_trim else img)
+    _effect_frame_cache[key] = frames
+    return frames
 
-        self.current = 0
-        self.timer = 0.0
-        self.frame_time = 0.06
-        self.lifetime = lifetime
-        self.age = 0.0
-        # compute bounding rect from first frame if available
-        if self.frames and self.frames[0][0] is not None:
-            surf, _ = self.frames[0]
-            self.rect = surf.get_rect(center=(int(self.x), int(self.y)))
-        else:
-            self.rect = pygame.Rect(
-                int(self.x),
-                int(self.y),
-                max(8, int(8 * self.scale)),
-                max(8, int(8 * self.scale)),
-            )
-        self.damage = damage
-        self.owner = owner
-        # for piercing projectiles we track which enemies we've already hit
-        self.hit_targets = set()
 
-    def update(self, dt):
-        self.age += dt
-        if self.age > self.lifetime:
-            return False
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        self.timer += dt
-        if self.timer >= self.frame_time and self.frames:
-            self.current = (self.current + 1) % len(self.frames)
-            self.timer = 0.0
-        if self.frames:
-            surf, trim = self.frames[self.current]
-            self.rect = surf.get_rect(center=(int(self.x), int(self.y)))
-        else:
-            self.rect.topleft = (int(self.x), int(self.y))
-        return True
+# (id(frames), scale) -> (frames, frames đã scale). Giữ tham chiếu `frames` để id không bị tái sử dụng
+_scaled_frame_sets = {}
 
-    def draw(self, surface, camera_x=0, camera_y=0):
-        if not self.frames:
-            pygame.draw.circle(
-                surface,
-                (128, 0, 255),
-                (int(self.x - camera_x), int(self.y - camera_y)),
-                6,
-            )
-            return
-        surf, trim = self.frames[self.current]
-        dst = surf.get_rect(center=(int(self.x - camera_x), int(self.y - camera_y)))
-        surface.blit(surf, dst)
+
+def scaled_frame_set(frames, scale):
+    """Bộ frame (surface, trim) đã scale sẵn theo `scale`, tạo một lần cho mỗi (bộ frame, scale).
+
+    Skill gọi lúc khởi tạo để giữ sẵn bộ frame cho projectile; ProjectileSystem chỉ
+    giữ tham chiếu (không scale surface mỗi lần bắn).
+    """
+    if not frames or scale == 1.0:
+        return frames
+    key = (id(frames), float(scale))
+    entry = _scaled_frame_sets.get(key)
+    if entry is not None and entry[0] is frames:
+        return entry[1]
+    scaled = []
+    for item in frames:
+        try:
+            surf, trim = item
+        except Exception:
+            surf = item
+            trim = 0
+        if surf is not None:
+            w, h = surf.get_size()
+            try:
+                surf = pygame.transform.scale(surf, (max(1, int(w * scale)), max(1, int(h * scale))))
+            except Exception:
+                pass
+        scaled.append((surf, trim))
+    _scaled_frame_sets[key] = (frames, scaled)
+    return scaled
+
+
+def effect_image(path, size=None):
+    """Một ảnh hiệu ứng (vd. cloud.png), scale theo `size` nếu có; cache như effect_frames."""
+    key = (os.path.normpath(path), size)
+    img = _effect_frame_cache.get(key)
+    if img is None:
+        if size is not None:
+            img = pygame.transform.scale(effect_image(path), size)
+        else:
+            img = _convert(pygame.image.load(path))
+        _effect_frame_cache[key] = img
+    return img
 
 
 class ProjectileSkill(SkillBase):
@@ -284,6 +325,8 @@ class ProjectileSkill(SkillBase):
       - cooldown
     """
 
+    uses_projectiles = True
+
     def __init__(
         self,
         frames_path=None,
@@ -300,11 +343,9 @@ class ProjectileSkill(SkillBase):
         self.frames_path = frames_path
         self.speed = speed
         self.lifetime = lifetime
-        self.projectiles = []
         self.damage = damage
 
         # load frames (try absolute or repo-relative)
-        frames = []
         candidates = []
         if frames_path:
             candidates.append(frames_path)
@@ -314,24 +355,9 @@ class ProjectileSkill(SkillBase):
             os.path.join(_REPO_ROOT, "assets", "skill-effect", "purple_skill")
         )
 
-        for cand in candidates:
-            cand = os.path.normpath(cand)
-            if os.path.isdir(cand):
-                for fn in sorted(os.listdir(cand)):
-                    if fn.lower().endswith(".png"):
-                        img = pygame.image.load(os.path.join(cand, fn))
-                        # Try convert_alpha, fallback to convert if display not set
-                        try:
-                            img = img.convert_alpha()
-                        except pygame.error:
-                            try:
-                                img = img.convert()
-                            except pygame.error:
-                                pass  # Use original if conversion fails
-                        frames.append((img, 0))
-                break
-
-        self.frames = frames
+        self.frames = effect_frames(_first_dir(candidates), with_trim=True)
+        # Bộ frame đã scale sẵn cho projectile (ProjectileSystem chỉ tham chiếu, không scale lại)
+        self.projectile_frames = scaled_frame_set(self.frames, self.scale)
 
     def use(self, now: float, owner) -> bool:
         if not super().use(now, owner):
@@ -365,55 +391,17 @@ class ProjectileSkill(SkillBase):
         spawn_x = ox + dir_x * spawn_offset
         spawn_y = oy + dir_y * spawn_offset
 
-        proj = Projectile(
-            spawn_x,
-            spawn_y,
-            vx,
-            vy,
-            self.frames,
-            lifetime=self.lifetime,
-            damage=self.damage,
-            owner=owner,
-            scale=self.scale,
-        )
-        self.projectiles.append(proj)
+        # Huỷ ở enemy đầu tiên trúng (ProjectileSystem.resolve_hits)
+        self.spawn_projectile(owner, spawn_x, spawn_y, vx, vy, self.damage)
         self.active = True
         self.last_used = now
         return True
 
     def update(self, dt: float, owner) -> None:
-        alive = []
-        for p in self.projectiles:
-            if p.update(dt):
-                alive.append(p)
-        self.projectiles = alive
-        # keep active flag while any projectile exists
-        if not self.projectiles:
+        # ProjectileSystem tích phân + va chạm; skill chỉ giữ active khi còn viên bay
+        if not self.projectile_count():
             self.active = False
 
-    def draw(self, surface, camera_x=0, camera_y=0):
-        for p in self.projectiles:
-            p.draw(surface, camera_x, camera_y)
-
-    def handle_collisions(self, enemies: list):
-        # Check projectiles against enemies; apply damage and remove projectile on hit
-        alive = []
-        for p in self.projectiles:
-            hit = False
-            for e in enemies:
-                try:
-                    if e.rect.colliderect(p.rect):
-                        # apply damage
-                        if hasattr(e, "take_damage"):
-                            e.take_damage(p.damage)
-                        hit = True
-                        break
-                except Exception:
-                    continue
-            if not hit:
-                alive.append(p)
-        self.projectiles = alive
-
 
 registry.register_skill("blast", ProjectileSkill)
 
@@ -426,6 +414,8 @@ class ChargeSkill(SkillBase):
       - release(now, owner, held_time) -> fire projectile with power based on held_time
     """
 
+    uses_projectiles = True
+
     def __init__(
         self,
         frames_path=None,
@@ -469,12 +459,10 @@ class ChargeSkill(SkillBase):
         self.base_damage = base_damage
         self.max_charge = float(max_charge)
         self.lifetime = lifetime
-        self.projectiles = []
         self.charging = False
         self.charge_start = 0.0
 
         # load frames from candidates: explicit frames_path, repo-relative, default assets/skill-effect
-        frames = []
         candidates = []
         if frames_path:
             candidates.append(frames_path)
@@ -486,22 +474,9 @@ class ChargeSkill(SkillBase):
         )
         candidates.append(os.path.join(_REPO_ROOT, "assets", "skill-effect"))
 
-        for cand in candidates:
-            cand = os.path.normpath(cand)
-            if os.path.isdir(cand):
-                for fn in sorted(os.listdir(cand)):
-                    if fn.lower().endswith(".png"):
-                        try:
-                            img = pygame.image.load(
-                                os.path.join(cand, fn)
-                            ).convert_alpha()
-
-                        except Exception:
-                            continue
-                        frames.append((img, 0))
-                break
-
-        self.frames = frames
+        self.frames = effect_frames(_first_dir(candidates), with_trim=True)
+        # Bộ frame đã scale sẵn cho projectile (ProjectileSystem chỉ tham chiếu, không scale lại)
+        self.projectile_frames = scaled_frame_set(self.frames, self.scale)
 
     def begin(self, now: float, owner) -> bool:
         if not self.can_use(now):
@@ -545,61 +520,17 @@ class ChargeSkill(SkillBase):
         spawn_x = ox + dir_x * spawn_offset
         spawn_y = oy + dir_y * spawn_offset
 
-        proj = Projectile(
-            spawn_x,
-            spawn_y,
-            vx,
-            vy,
-            self.frames,
-            lifetime=self.lifetime,
-            damage=damage,
-            owner=owner,
-            scale=self.scale,
-        )
-
-        self.projectiles.append(proj)
+        # Piercing: xuyên qua enemy, mỗi enemy chỉ nhận damage một lần
+        self.spawn_projectile(owner, spawn_x, spawn_y, vx, vy, damage, pierce=True)
         self.active = True
         self.last_used = now
         self.charging = False
         return True
 
     def update(self, dt: float, owner) -> None:
-        alive = []
-        for p in self.projectiles:
-            if p.update(dt):
-                alive.append(p)
-        self.projectiles = alive
-        if not self.projectiles:
+        if not self.projectile_count():
             self.active = False
 
-    def draw(self, surface, camera_x=0, camera_y=0):
-        for p in self.projectiles:
-            p.draw(surface, camera_x, camera_y)
-
-    def handle_collisions(self, enemies: list):
-        # Piercing behavior: charged projectiles should pass through enemies.
-        # Apply damage once per enemy per projectile by tracking hit targets
-        for p in list(self.projectiles):
-            for e in enemies:
-                try:
-                    if e.rect.colliderect(p.rect):
-                        eid = id(e)
-                        if eid in getattr(p, "hit_targets", set()):
-                            # already damaged this enemy with this projectile
-                            continue
-                        if hasattr(e, "take_damage"):
-
-                            e.take_damage(p.damage)
-                        # record that this projectile has hit this enemy
-                        try:
-                            p.hit_targets.add(eid)
-                        except Exception:
-                            p.hit_targets = getattr(p, "hit_targets", set())
-
-                            p.hit_targets.add(eid)
-                except Exception:
-                    continue
-
 
 registry.register_skill("charge", ChargeSkill)
 
@@ -615,8 +546,8 @@ class CloudSkill(SkillBase):
         self.frozen_pos = None  # Store position when skill activates
         # Load cloud effect
         try:
-            cloud_path = os.path.join(_REPO_ROOT, "assets", "icon_skills", "cloud.png")
-            self.cloud_image = pygame.image.load(cloud_path).convert_alpha()
+            self.cloud_path = os.path.join(_REPO_ROOT, "assets", "icon_skills", "cloud.png")
+            self.cloud_image = effect_image(self.cloud_path)
             # Will scale the cloud image when owner is set
             self.cloud_image_original = self.cloud_image
         except Exception as e:
@@ -631,8 +562,8 @@ class CloudSkill(SkillBase):
             # Make cloud much larger - about 2x player width and 0.75x player height
             cloud_width = owner.rect.width * 2.0
             cloud_height = owner.rect.height * 0.75
-            self.cloud_image = pygame.transform.scale(
-                self.cloud_image_original, (int(cloud_width), int(cloud_height))
+            self.cloud_image = effect_image(
+                self.cloud_path, (int(cloud_width), int(cloud_height))
             )
 
     def can_use(self, now: float) -> bool:
@@ -677,6 +608,12 @@ class CloudSkill(SkillBase):
             owner.vel_x = 0
             owner.vel_y = 0
 
+    def reset(self) -> None:
+        super().reset()
+        self.hovering = False
+        self.hover_time = 0
+        self.frozen_pos = None
+
     def draw(self, surface, camera_x=0, camera_y=0):
         # Draw cloud effect under the player if hovering
         if self.hovering and hasattr(self, "owner") and self.cloud_image is not None:
@@ -699,6 +636,8 @@ class SlowSkill(SkillBase):
     - Duration dựa trên charge level
     """
 
+    uses_projectiles = True
+
     def __init__(
         self,
         frames_path=None,
@@ -727,12 +666,10 @@ class SlowSkill(SkillBase):
         self.base_slow_duration = base_slow_duration  # Slow kéo dài bao lâu
         self.max_charge = float(max_charge)
         self.lifetime = lifetime
-        self.projectiles = []
         self.charging = False
         self.charge_start = 0.0
 
         # Load frames
-        frames = []
         candidates = []
         if frames_path:
             candidates.append(frames_path)
@@ -741,21 +678,9 @@ class SlowSkill(SkillBase):
             os.path.join(_REPO_ROOT, "assets", "skill-effect", "purple_skill")
         )
 
-        for cand in candidates:
-            cand = os.path.normpath(cand)
-            if os.path.isdir(cand):
-                for fn in sorted(os.listdir(cand)):
-                    if fn.lower().endswith(".png"):
-                        try:
-                            img = pygame.image.load(
-                                os.path.join(cand, fn)
-                            ).convert_alpha()
-                        except Exception:
-                            continue
-                        frames.append((img, 0))
-                break
-
-        self.frames = frames
+        self.frames = effect_frames(_first_dir(candidates), with_trim=True)
+        # Bộ frame đã scale sẵn cho projectile (ProjectileSystem chỉ tham chiếu, không scale lại)
+        self.projectile_frames = scaled_frame_set(self.frames, self.scale)
 
     def begin(self, now: float, owner) -> bool:
         if not self.can_use(now):
@@ -782,46 +707,36 @@ class SlowSkill(SkillBase):
         spawn_x = ox + dir_x * (owner.rect.width // 2 + 8)
         spawn_y = oy
 
-        # Tạo projectile với metadata về slow effect
-        proj = Projectile(
+        # Projectile kèm metadata slow; owner (ControllerEnemy) áp dụng khi trúng player.
+        # Xuyên qua target, không gây damage cho enemy khi player dùng.
+        self.spawn_projectile(
+            owner,
             spawn_x,
             spawn_y,
             vx,
             vy,
-            self.frames,
-            lifetime=self.lifetime,
-            damage=damage,
-            owner=owner,
-            scale=self.scale,
+            damage,
+            pierce=True,
+            hits_enemies=False,
+            meta={"slow_percent": self.slow_percent, "slow_duration": slow_duration},
         )
-        # Thêm thông tin slow vào projectile
-        proj.slow_percent = self.slow_percent
-        proj.slow_duration = slow_duration
-        proj.is_slow_projectile = True
-
-        self.projectiles.append(proj)
         self.active = True
         self.last_used = now
         self.charging = False
         return True
 
     def update(self, dt: float, owner) -> None:
-        alive = []
-        for p in self.projectiles:
-            if p.update(dt):
-                alive.append(p)
-        self.projectiles = alive
-        if not self.projectiles:
+        if not self.projectile_count():
             self.active = False
 
-    def draw(self, surface, camera_x=0, camera_y=0):
-        for p in self.projectiles:
-            p.draw(surface, camera_x, camera_y)
-
 
 class FireSkill(SkillBase):
     """Fire skill that shoots fire projectiles."""
 
+    uses_projectiles = True
+    # Projectile bay ra ngoài vùng này thì bị huỷ (min_x, max_x, min_y, max_y)
+    projectile_bounds = (-100, 4000, -100, 1000)
+
     def __init__(
         self,
         cooldown=1.0,
@@ -836,8 +751,9 @@ class FireSkill(SkillBase):
         self.speed = speed
         self.lifetime = lifetime
         self.frames_path = frames_path
-        self.projectiles = []  # Store active fire projectiles
         self.frames = []  # Frames for projectiles
+        self.projectile_scale = 1.5  # Larger projectile scale
+        self.projectile_frames = []
 
         # Load fire effect frames
         self.load_fire_frames()
@@ -845,32 +761,12 @@ class FireSkill(SkillBase):
     def load_fire_frames(self):
         """Load fire effect animation frames for projectiles."""
         try:
-            import pygame
-            import os
-
             base_path = self.frames_path
             if os.path.exists(base_path):
-                # Get all png files and sort them
-                files = [f for f in os.listdir(base_path) if f.endswith(".png")]
-                files.sort()
-
-                for file in files:
-                    file_path = os.path.join(base_path, file)
-                    try:
-                        frame = pygame.image.load(file_path).convert_alpha()
-                        # Scale fire effect - larger size
-                        scaled_frame = pygame.transform.scale(
-                            frame,
-                            (
-                                int(frame.get_width() * 1.2),
-                                int(frame.get_height() * 1.2),
-                            ),
-                        )
-                        # Store as (frame, bottom_trim) tuple like other skills
-                        self.frames.append((scaled_frame, 0))
-                    except Exception as e:
-                        print(f"Error loading fire frame {file}: {e}")
-
+                # Scale fire effect - larger size
+                # Store as (frame, bottom_trim) tuple like other skills
+                self.frames = effect_frames(base_path, scale=1.2, with_trim=True)
+                self.projectile_frames = scaled_frame_set(self.frames, self.projectile_scale)
                 print(f"Loaded {len(self.frames)} fire projectile frames")
             else:
                 print(f"Fire effect path not found: {base_path}")
@@ -922,20 +818,18 @@ class FireSkill(SkillBase):
             f"Creating fire projectile at ({spawn_x}, {spawn_y}) with speed ({vx}, {vy})"
         )  # Debug
         if self.frames:
-            proj = Projectile(
+            self.spawn_projectile(
+                owner,
                 spawn_x,
                 spawn_y,
                 vx,
                 vy,
-                self.frames,
-                lifetime=self.lifetime,
-                damage=self.damage,
-                owner=owner,
-                scale=1.5,  # Larger projectile scale
+                self.damage,
+                hits_enemies=False,
+                bounds=self.projectile_bounds,
             )
-            self.projectiles.append(proj)
             print(
-                f"Fire projectile created! Total projectiles: {len(self.projectiles)}"
+                f"Fire projectile created! Total projectiles: {self.projectile_count()}"
             )  # Debug
         else:
             print("No frames loaded for fire skill!")  # Debug
@@ -950,34 +844,12 @@ class FireSkill(SkillBase):
         return True
 
     def update(self, dt: float, owner) -> None:
-        # Update all fire projectiles
-        projectiles_to_remove = []
-
-        for i, proj in enumerate(self.projectiles):
-            proj.update(dt)
-
-            # Remove expired projectiles or projectiles that moved off screen
-            if (
-                proj.lifetime <= 0
-                or proj.x < -100
-                or proj.x > 4000
-                or proj.y < -100
-                or proj.y > 1000
-            ):
-                projectiles_to_remove.append(i)
-
-        # Remove expired projectiles (reverse order to maintain indices)
-        for i in reversed(projectiles_to_remove):
-            self.projectiles.pop(i)
+        # Projectile do ProjectileSystem update (huỷ khi hết lifetime hoặc ra khỏi bounds)
+        count = self.projectile_count()
 
         # Debug: print number of active projectiles
-        if len(self.projectiles) > 0:
-            print(f"Active fire projectiles: {len(self.projectiles)}")
-
-    def draw(self, screen, camera_x, camera_y):
-        """Draw active fire projectiles."""
-        for proj in self.projectiles:
-            proj.draw(screen, camera_x, camera_y)
+        if count > 0:
+            print(f"Active fire projectiles: {count}")
 
 
 registry.register_skill("slow", SlowSkill)
@@ -1019,22 +891,9 @@ class FireExplosionSkill(SkillBase):
     def load_fire_frames(self):
         """Load fire effect animation frames for explosion."""
         try:
-            import pygame
-            import os
-
             base_path = self.frames_path
             if os.path.exists(base_path):
-                files = [f for f in os.listdir(base_path) if f.endswith(".png")]
-                files.sort()
-
-                for file in files:
-                    file_path = os.path.join(base_path, file)
-                    try:
-                        frame = pygame.image.load(file_path).convert_alpha()
-                        self.frames.append(frame)
-                    except Exception as e:
-                        print(f"Error loading explosion frame {file}: {e}")
-
+                self.frames = effect_frames(base_path)
                 if self.frames:
                     print(f"Loaded {len(self.frames)} explosion frames")
             else:
@@ -1123,7 +982,7 @@ class FireExplosionSkill(SkillBase):
                 surface.blit(scaled_frame, (draw_x, draw_y))
             except Exception as e:
                 # Fallback: draw a circle
-                pygame.draw.circle(
+                mark_drawn(surface, pygame.draw.circle(
                     surface,
                     (255, 100, 0),
                     (
@@ -1132,38 +991,28 @@ class FireExplosionSkill(SkillBase):
                     ),
                     int(self.explosion_radius * self.explosion_scale / self.max_scale),
                     5,
-                )
+                ))
 
-    def handle_collisions(self, enemies: list):
-        """Check explosion damage against enemies."""
+    def handle_collisions(self, enemies):
+        """Check explosion damage against enemies (EnemyGrid hoặc list)."""
         if not self.explosion_active:
             return
 
-        explosion_rect = pygame.Rect(
-            self.explosion_center[0] - self.explosion_radius,
-            self.explosion_center[1] - self.explosion_radius,
-            self.explosion_radius * 2,
-            self.explosion_radius * 2,
-        )
-
-        for enemy in enemies:
+        # Chỉ enemy có tâm trong bán kính nổ (tra qua grid, không quét cả list)
+        for enemy in enemies_in_radius(enemies, self.explosion_center, self.explosion_radius):
             try:
-                if enemy.rect.colliderect(explosion_rect):
-                    # Calculate distance for damage falloff
-                    enemy_center = enemy.rect.center
-                    dx = enemy_center[0] - self.explosion_center[0]
-                    dy = enemy_center[1] - self.explosion_center[1]
-                    distance = (dx * dx + dy * dy) ** 0.5
-
-                    if distance <= self.explosion_radius:
-                        # Damage decreases with distance
-                        damage_multiplier = max(
-                            0.3, 1.0 - distance / self.explosion_radius
-                        )
-                        final_damage = int(self.damage * damage_multiplier)
+                # Calculate distance for damage falloff
+                enemy_center = enemy.rect.center
+                dx = enemy_center[0] - self.explosion_center[0]
+                dy = enemy_center[1] - self.explosion_center[1]
+                distance = (dx * dx + dy * dy) ** 0.5
+
+                # Damage decreases with distance
+                damage_multiplier = max(0.3, 1.0 - distance / self.explosion_radius)
+                final_damage = int(self.damage * damage_multiplier)
 
-                        if hasattr(enemy, "take_damage"):
-                            enemy.take_damage(final_damage)
+                if hasattr(enemy, "take_damage"):
+                    enemy.take_damage(final_damage)
             except Exception as e:
                 print(f"Error in explosion collision: {e}")
 
@@ -1196,6 +1045,7 @@ class MeleeAttackSkill(SkillBase):
 
         self.last_used = now
         self.attack_active = True
+        self.active = True
         self.attack_timer = self.animation_duration
 
         # Save owner position for collision detection
@@ -1223,6 +1073,7 @@ class MeleeAttackSkill(SkillBase):
 
             if self.attack_timer <= 0:
                 self.attack_active = False
+                self.active = False
 
     def _deal_damage(self, owner):
         """Deal damage to enemies in attack range."""
@@ -1239,10 +1090,9 @@ class MeleeAttackSkill(SkillBase):
 
         # Check collision with enemies (if available in owner's context)
         if hasattr(owner, "_nearby_enemies"):
-            for enemy in owner._nearby_enemies:
-                if hasattr(enemy, "rect") and hasattr(enemy, "take_damage"):
-                    if attack_rect.colliderect(enemy.rect):
-                        enemy.take_damage(self.damage)
+            for enemy in enemies_in_rect(owner._nearby_enemies, attack_rect):
+                if hasattr(enemy, "take_damage"):
+                    enemy.take_damage(self.damage)
 
     def draw(self, surface, camera_x, camera_y):
         """Draw visual effects for melee attack (optional)."""
@@ -1254,20 +1104,20 @@ class MeleeAttackSkill(SkillBase):
         if not self.attack_active:
             return
 
-        # Deal damage to enemies in range during attack
-        for enemy in enemies:
-            if hasattr(enemy, "rect") and hasattr(enemy, "take_damage"):
-                # Create attack hitbox around player
-                if hasattr(self, "_last_owner_pos"):
-                    attack_rect = pygame.Rect(
-                        self._last_owner_pos[0] - self.attack_range // 2,
-                        self._last_owner_pos[1] - self.attack_range // 2,
-                        self.attack_range,
-                        self.attack_range,
-                    )
+        # Create attack hitbox around player
+        if not hasattr(self, "_last_owner_pos"):
+            return
+        attack_rect = pygame.Rect(
+            self._last_owner_pos[0] - self.attack_range // 2,
+            self._last_owner_pos[1] - self.attack_range // 2,
+            self.attack_range,
+            self.attack_range,
+        )
 
-                    if attack_rect.colliderect(enemy.rect):
-                        enemy.take_damage(self.damage)
+        # Deal damage to enemies in range during attack
+        for enemy in enemies_in_rect(enemies, attack_rect):
+            if hasattr(enemy, "take_damage"):
+                enemy.take_damage(self.damage)
 
 
 registry.register_skill("melee_attack", MeleeAttackSkill)
@@ -1415,9 +1265,7 @@ class BuffSkill(SkillBase):
         self.is_charging = False
         self.is_buffed = True
         self.buff_timer = self.buff_duration
-        self.last_used = (
-            pygame.time.get_ticks() / 1000.0
-        )  # Set last_used here for cooldown
+        self.last_used = game_time()  # Set last_used here for cooldown
 
         # Calculate multipliers based on charge power
         speed_mult = (
@@ -1525,9 +1373,9 @@ class BuffSkill(SkillBase):
                     )
 
                 # Inner solid circle
-                pygame.draw.circle(
+                mark_drawn(surface, pygame.draw.circle(
                     surface, charge_color, (center_x, center_y), pulse_radius, 3
-                )
+                ))
 
                 # Energy particles around the circle
                 particle_count = int(8 + charge_percent * 12)  # 8 to 20 particles
@@ -1539,7 +1387,7 @@ class BuffSkill(SkillBase):
 
                     # Particle size based on charge
                     particle_size = int(2 + charge_percent * 4)
-                    pygame.draw.circle(surface, charge_color, (px, py), particle_size)
+                    mark_drawn(surface, pygame.draw.circle(surface, charge_color, (px, py), particle_size))
 
                 # Charge percentage text
                 if charge_percent > 0.1:  # Only show after some charging
@@ -1552,7 +1400,7 @@ class BuffSkill(SkillBase):
 
                     # Text background for better visibility
                     bg_rect = text_rect.inflate(10, 4)
-                    pygame.draw.rect(surface, (0, 0, 0, 150), bg_rect, border_radius=5)
+                    mark_drawn(surface, pygame.draw.rect(surface, (0, 0, 0, 150), bg_rect, border_radius=5))
                     surface.blit(text_surface, text_rect)
 
             elif self.is_buffed:
@@ -1598,18 +1446,18 @@ class BuffSkill(SkillBase):
                 # Central power indicator
                 power_color = (255, 150, 50)
                 power_radius = int(8 + self.charge_power * 12)
-                pygame.draw.circle(
+                mark_drawn(surface, pygame.draw.circle(
                     surface, power_color, (center_x, center_y), power_radius
-                )
-                pygame.draw.circle(
+                ))
+                mark_drawn(surface, pygame.draw.circle(
                     surface, (255, 255, 255), (center_x, center_y), power_radius, 2
-                )
+                ))
 
         except Exception as e:
             # Simple fallback
             color = (255, 200, 0) if self.is_charging else (255, 100, 0)
             radius = 25 if self.is_charging else 15
-            pygame.draw.circle(surface, color, (center_x, center_y), radius, 3)
+            mark_drawn(surface, pygame.draw.circle(surface, color, (center_x, center_y), radius, 3))
 
 
 registry.register_skill("buff", BuffSkill)
@@ -1683,19 +1531,15 @@ class EarthSlamSkill(SkillBase):
                     print(f"✅ Found path: {test_path}")
 
                     # Load specific earth impact frames
-                    for i in range(
-                        16, 21
-                    ):  # Earth-Impact_16.png to Earth-Impact_20.png
-                        frame_path = os.path.join(test_path, f"Earth-Impact_{i}.png")
-                        print(f"      Checking frame: {frame_path}")
-                        if os.path.exists(frame_path):
-                            frame = pygame.image.load(frame_path).convert_alpha()
-                            # Scale frame for better visibility - made much larger
-                            scaled_frame = pygame.transform.scale(frame, (500, 500))
-                            self.frames.append(scaled_frame)
-                            print(f"      ✅ Loaded frame {i}")
-                        else:
-                            print(f"      ❌ Frame not found: {frame_path}")
+                    # Earth-Impact_16.png to Earth-Impact_20.png
+                    # Scale frame for better visibility - made much larger
+                    self.frames = list(
+                        effect_frames(
+                            test_path,
+                            size=(500, 500),
+                            files=[f"Earth-Impact_{i}.png" for i in range(16, 21)],
+                        )
+                    )
                     break
                 else:
                     print(f"   ❌ Path not found: {test_path}")
@@ -1744,6 +1588,7 @@ class EarthSlamSkill(SkillBase):
             owner.sound_manager.play_sound("attack")
 
         self.last_used = now
+        self.active = True
         print("🔥 SKELETON PERFORMS EARTH SLAM! 🔥")
         return True
 
@@ -1851,6 +1696,7 @@ class EarthSlamSkill(SkillBase):
             if self.explosion_timer >= self.animation_duration:
                 self.is_exploding = False
                 self.explosion_timer = 0.0
+                self.active = False
 
                 # Restore normal physics
                 if hasattr(owner, "on_ground"):
@@ -1890,21 +1736,20 @@ class EarthSlamSkill(SkillBase):
             return
 
         damage_dealt = 0
-        for enemy in enemies:
-            if hasattr(enemy, "rect") and hasattr(enemy, "take_damage"):
+        for enemy in enemies_in_radius(enemies, player_center, self.explosion_radius):
+            if hasattr(enemy, "take_damage"):
                 enemy_center = enemy.rect.center
                 distance = (
                     (player_center[0] - enemy_center[0]) ** 2
                     + (player_center[1] - enemy_center[1]) ** 2
                 ) ** 0.5
 
-                if distance <= self.explosion_radius:
-                    # Deal massive damage to enemy
-                    enemy.take_damage(self.damage)
-                    damage_dealt += 1
-                    print(
-                        f"💥 EARTH SLAM HIT! Enemy at {enemy_center} (distance: {distance:.1f}) took {self.damage} damage!"
-                    )
+                # Deal massive damage to enemy
+                enemy.take_damage(self.damage)
+                damage_dealt += 1
+                print(
+                    f"💥 EARTH SLAM HIT! Enemy at {enemy_center} (distance: {distance:.1f}) took {self.damage} damage!"
+                )
 
         if damage_dealt == 0:
             print(f"💨 No enemies in explosion range (checked {len(enemies)} enemies)")
@@ -1923,20 +1768,19 @@ class EarthSlamSkill(SkillBase):
                 return
 
             damage_dealt = 0
-            for enemy in enemies:
-                if hasattr(enemy, "rect") and hasattr(enemy, "take_damage"):
+            for enemy in enemies_in_radius(enemies, player_pos, self.explosion_radius):
+                if hasattr(enemy, "take_damage"):
                     enemy_center = enemy.rect.center
                     distance = (
                         (player_pos[0] - enemy_center[0]) ** 2
                         + (player_pos[1] - enemy_center[1]) ** 2
                     ) ** 0.5
 
-                    if distance <= self.explosion_radius:
-                        enemy.take_damage(self.damage)
-                        damage_dealt += 1
-                        print(
-                            f"🔥 EARTH EXPLOSION damaged enemy at distance {distance:.1f}!"
-                        )
+                    enemy.take_damage(self.damage)
+                    damage_dealt += 1
+                    print(
+                        f"🔥 EARTH EXPLOSION damaged enemy at distance {distance:.1f}!"
+                    )
 
             if damage_dealt > 0:
                 print(f"💥 Earth slam explosion hit {damage_dealt} enemies!")
@@ -1967,10 +1811,10 @@ class EarthSlamSkill(SkillBase):
             if self.is_jumping or self.is_slamming:
                 # Draw indicator above character during jump/slam
                 indicator_y = screen_y - 50
-                pygame.draw.circle(
+                mark_drawn(surface, pygame.draw.circle(
                     surface, (255, 255, 0), (screen_x, indicator_y), 20, 3
-                )
-                pygame.draw.circle(surface, (255, 0, 0), (screen_x, indicator_y), 15, 2)
+                ))
+                mark_drawn(surface, pygame.draw.circle(surface, (255, 0, 0), (screen_x, indicator_y), 15, 2))
 
             # Draw explosion effects
             if self.is_exploding:
@@ -1982,9 +1826,9 @@ class EarthSlamSkill(SkillBase):
                 progress = self.explosion_timer / self.animation_duration
                 base_radius = int(self.explosion_radius * progress)
                 explosion_color = (255, 100, 0)  # Orange
-                pygame.draw.circle(
+                mark_drawn(surface, pygame.draw.circle(
                     surface, explosion_color, (screen_x, screen_y), base_radius, 8
-                )
+                ))
                 print(f"   Drew base explosion circle: radius {base_radius}")
 
                 # Draw explosion animation frames if available
@@ -1997,13 +1841,13 @@ class EarthSlamSkill(SkillBase):
                     )
                 else:
                     # Large explosion circle as fallback
-                    pygame.draw.circle(
+                    mark_drawn(surface, pygame.draw.circle(
                         surface,
                         (255, 150, 0),
                         (screen_x, screen_y),
                         base_radius + 20,
                         5,
-                    )
+                    ))
                     print(f"   Drew fallback explosion circle")
 
             # Draw shockwave effect
@@ -2044,7 +1888,7 @@ class EarthSlamSkill(SkillBase):
                 progress = self.explosion_timer / self.animation_duration
                 radius = int(self.explosion_radius * progress)
                 color = (139, 69, 19)  # Brown
-                pygame.draw.circle(surface, color, (screen_x, screen_y), radius, 5)
+                mark_drawn(surface, pygame.draw.circle(surface, color, (screen_x, screen_y), radius, 5))
 
 
 registry.register_skill("earth_slam", EarthSlamSkill)
@@ -9,6 +9,11 @@ import pygame
 from typing import Optional
 from game.characters.data_driven_enemy import DataDrivenEnemy
 from game.characters.registry import get_skill
+from game.map_loader import platforms_near
+from game.sprite_frames import frame_for
+from game.config import GRAVITY
+from game.sim_clock import game_time, sim_random, tick_scale, fall
+from game.render_targets import mark_drawn
 
 
 class CasterEnemy(DataDrivenEnemy):
@@ -24,7 +29,11 @@ class CasterEnemy(DataDrivenEnemy):
     
     def __init__(self, x, y, char_id='Wraith_01', patrol_range=150, speed=60):
         super().__init__(x, y, char_id=char_id, patrol_range=patrol_range, speed=speed)
-        
+
+    def reset(self, x, y):
+        """Reset state riêng của caster (cast timer, tầm bắn, tốc độ animation)."""
+        super().reset(x, y)
+
         # Caster-specific stats
         self.max_hp = 80  # Ít máu hơn melee enemies
         self.hp = self.max_hp
@@ -163,8 +172,7 @@ class CasterEnemy(DataDrivenEnemy):
             blast_skill = self.skills.get('blast')
             if blast_skill and hasattr(blast_skill, 'use'):
                 # Sử dụng current time (giả lập)
-                import time
-                current_time = time.time()
+                current_time = game_time()
                 blast_skill.use(current_time, self)
         except Exception as e:
             # Fallback: gây damage trực tiếp nếu projectile system không hoạt động
@@ -177,12 +185,12 @@ class CasterEnemy(DataDrivenEnemy):
     
     def _update_physics(self, dt, platforms):
         """Physics update - gravity và collision"""
-        self.vel_y += 2  # GRAVITY
-        self.rect.y += int(self.vel_y)
+        dy, self.vel_y = fall(self.vel_y, GRAVITY, tick_scale(dt))
+        self.rect.y += int(dy)
         
         # Platform collision
         self.on_ground = False
-        for _, platform_rect in platforms:
+        for _, platform_rect in platforms_near(platforms, self.rect, abs(int(dy))):
             if self.rect.colliderect(platform_rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform_rect.top
@@ -239,20 +247,7 @@ class CasterEnemy(DataDrivenEnemy):
                     except Exception:
                         pass
             
-            # Handle projectile collisions with player
-            if hasattr(skill, 'projectiles') and hasattr(player, 'rect'):
-                for proj in list(skill.projectiles):
-                    if hasattr(proj, 'rect') and proj.rect.colliderect(player.rect):
-                        # Hit player
-                        try:
-                            player.take_damage(proj.damage)
-                        except Exception:
-                            pass
-                        # Remove projectile after hit
-                        try:
-                            skill.projectiles.remove(proj)
-                        except Exception:
-                            pass
+        # Va chạm projectile -> player do ProjectileSystem.resolve_hits xử lý theo lô
     
     def draw_skills(self, surface, camera_x, camera_y):
         """Draw skill effects (projectiles)"""
@@ -281,7 +276,11 @@ class ControllerEnemy(DataDrivenEnemy):
     
     def __init__(self, x, y, char_id='Wraith_03', patrol_range=180, speed=70):
         super().__init__(x, y, char_id=char_id, patrol_range=patrol_range, speed=speed)
-        
+
+    def reset(self, x, y):
+        """Reset state riêng của controller (charge, teleport, ability timer)."""
+        super().reset(x, y)
+
         # Controller-specific stats  
         self.max_hp = 120  # Nhiều máu hơn caster nhưng ít hơn tank
         self.hp = self.max_hp
@@ -345,7 +344,7 @@ class ControllerEnemy(DataDrivenEnemy):
             if self.charging:
                 # Đang charge attack
                 self.state = 'cast'
-                charge_time = pygame.time.get_ticks() / 1000.0 - self.charge_start_time
+                charge_time = game_time() - self.charge_start_time
                 
                 if charge_time >= self.max_charge_time:
                     # Release charged attack
@@ -363,7 +362,7 @@ class ControllerEnemy(DataDrivenEnemy):
                 if distance <= self.max_ability_range:  # Sử dụng tầm ability mới
                     # Bắt đầu charge attack - quay mặt về player
                     self.charging = True
-                    self.charge_start_time = pygame.time.get_ticks() / 1000.0
+                    self.charge_start_time = game_time()
                     self.state = 'cast'
                     self.direction = 1 if dx > 0 else -1
                     self.facing_right = dx > 0  # Cập nhật facing_right
@@ -444,16 +443,14 @@ class ControllerEnemy(DataDrivenEnemy):
             slow_skill = self.skills.get('slow')
             if slow_skill and hasattr(slow_skill, 'release'):
                 held_time = self.max_charge_time
-                import time
-                current_time = time.time()
+                current_time = game_time()
                 slow_skill.release(current_time, self, held_time)
             else:
                 # Fallback: charge skill (cho các controller khác)
                 charge_skill = self.skills.get('charge')
                 if charge_skill and hasattr(charge_skill, 'release'):
                     held_time = self.max_charge_time
-                    import time
-                    current_time = time.time()
+                    current_time = game_time()
                     charge_skill.release(current_time, self, held_time)
         except Exception:
             # Fallback damage
@@ -535,62 +532,39 @@ class ControllerEnemy(DataDrivenEnemy):
                     except Exception:
                         pass
             
-            # Handle projectile collisions with player
-            if hasattr(skill, 'projectiles') and hasattr(player, 'rect'):
-                for proj in list(skill.projectiles):
-                    if hasattr(proj, 'rect') and proj.rect.colliderect(player.rect):
-                        # Track nếu đã hit player để không áp dụng effect nhiều lần
-                        player_id = id(player)
-                        if not hasattr(proj, 'hit_players'):
-                            proj.hit_players = set()
-                        
-                        # Nếu projectile đã hit player này rồi thì skip
-                        if player_id in proj.hit_players:
-                            continue
-                        
-                        # Đánh dấu đã hit player
-                        proj.hit_players.add(player_id)
-                        
-                        # Check if this is a slow projectile
-                        if getattr(proj, 'is_slow_projectile', False):
-                            # Apply slow effect instead of high damage
-                            try:
-                                # Gây ít damage
-                                player.take_damage(proj.damage)
-                                
-                                # Áp dụng slow effect
-                                slow_percent = getattr(proj, 'slow_percent', 50)
-                                slow_duration = getattr(proj, 'slow_duration', 2.0)
-                                
-                                # Lưu tốc độ gốc nếu chưa có
-                                if not hasattr(player, '_original_speed'):
-                                    player._original_speed = getattr(player, 'speed', 200)
-                                
-                                # Áp dụng slow
-                                player.speed = int(player._original_speed * (100 - slow_percent) / 100)
-                                
-                                # Lưu thời gian slow để có thể restore sau
-                                import time
-                                player.slowed_until = time.time() + slow_duration
-                                player.is_slowed = True
-                                
-                                # Log để debug - RÕ RÀNG HƠN
-                                print("=" * 60)
-                                print(f"🐌 SLOW EFFECT APPLIED! 🐌")
-                                print(f"   Speed: {player._original_speed} -> {player.speed} ({slow_percent}% slower!)")
-                                print(f"   Duration: {slow_duration:.1f} seconds")
-                                print(f"   You can barely move now!")
-                                print("=" * 60)
-                                
-                            except Exception as e:
-                                print(f"Error applying slow: {e}")
-                        else:
-                            # Normal damage projectile
-                            try:
-                                player.take_damage(proj.damage)
-                            except Exception:
-                                pass
-                        # Projectiles can pierce but only hit each target once
+        # Va chạm projectile -> player do ProjectileSystem.resolve_hits xử lý theo lô
+        # (xuyên qua, mỗi target một lần), hiệu ứng slow ở on_projectile_hit
+    
+    def on_projectile_hit(self, player, damage, meta):
+        """ProjectileSystem gọi khi projectile của enemy này trúng player"""
+        # Gây ít damage
+        player.take_damage(damage)
+        if not meta or 'slow_duration' not in meta:
+            # Normal damage projectile
+            return
+        
+        # Áp dụng slow effect
+        slow_percent = meta.get('slow_percent', 50)
+        slow_duration = meta.get('slow_duration', 2.0)
+        
+        # Lưu tốc độ gốc nếu chưa có
+        if not hasattr(player, '_original_speed'):
+            player._original_speed = getattr(player, 'speed', 200)
+        
+        # Áp dụng slow
+        player.speed = int(player._original_speed * (100 - slow_percent) / 100)
+        
+        # Lưu thời gian slow để có thể restore sau
+        player.slowed_until = game_time() + slow_duration
+        player.is_slowed = True
+        
+        # Log để debug - RÕ RÀNG HƠN
+        print("=" * 60)
+        print(f"🐌 SLOW EFFECT APPLIED! 🐌")
+        print(f"   Speed: {player._original_speed} -> {player.speed} ({slow_percent}% slower!)")
+        print(f"   Duration: {slow_duration:.1f} seconds")
+        print(f"   You can barely move now!")
+        print("=" * 60)
     
     def draw_skills(self, surface, camera_x, camera_y):
         """Draw skill effects (projectiles)"""
@@ -600,11 +574,11 @@ class ControllerEnemy(DataDrivenEnemy):
     
     def _update_physics(self, dt, platforms):
         """Physics update"""
-        self.vel_y += 2  # GRAVITY
-        self.rect.y += int(self.vel_y)
+        dy, self.vel_y = fall(self.vel_y, GRAVITY, tick_scale(dt))
+        self.rect.y += int(dy)
         
         self.on_ground = False
-        for _, platform_rect in platforms:
+        for _, platform_rect in platforms_near(platforms, self.rect, abs(int(dy))):
             if self.rect.colliderect(platform_rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform_rect.top
@@ -675,10 +649,14 @@ class ExploderEnemy(DataDrivenEnemy):
     
     def __init__(self, x, y, char_id='minotaur_01', patrol_range=200, speed=40):
         super().__init__(x, y, char_id=char_id, patrol_range=patrol_range, speed=speed)
-        
+
         # Store character ID for debugging/logging
         self.character_id = char_id
-        
+
+    def reset(self, x, y):
+        """Reset state riêng của exploder (explosion + hiệu ứng)."""
+        super().reset(x, y)
+
         # Exploder-specific stats
         self.max_hp = 150  # Tank - nhiều máu
         self.hp = self.max_hp
@@ -1014,7 +992,7 @@ class ExploderEnemy(DataDrivenEnemy):
                     # Sparks lớn hơn và sáng hơn
                     spark_size = random.randint(3, 6)
                     spark_color = (255, random.randint(150, 255), random.randint(0, 50))
-                    pygame.draw.circle(surface, spark_color, (spark_x, spark_y), spark_size)
+                    mark_drawn(surface, pygame.draw.circle(surface, spark_color, (spark_x, spark_y), spark_size))
                     
                     # Thêm glow cho sparks
                     if hasattr(pygame, 'SRCALPHA'):
@@ -1080,7 +1058,7 @@ class ExploderEnemy(DataDrivenEnemy):
                             pygame.draw.circle(particle_surf, color, (int(size * 1.5), int(size * 1.5)), size)
                             surface.blit(particle_surf, (px - int(size * 1.5), py - int(size * 1.5)))
                         else:
-                            pygame.draw.circle(surface, particle['color'][:3], (px, py), size)
+                            mark_drawn(surface, pygame.draw.circle(surface, particle['color'][:3], (px, py), size))
                 
                 # 2.5 Vẽ smoke particles (khói)
                 for smoke in self.smoke_particles:
@@ -1145,12 +1123,16 @@ class BossEnemy(DataDrivenEnemy):
     
     def __init__(self, x, y, char_id='Troll1', patrol_range=400, speed=200):
         super().__init__(x, y, char_id=char_id, patrol_range=patrol_range, speed=speed)
-        
+
+    def reset(self, x, y):
+        """Reset state riêng của boss (rage, bất tử, ground slam, teleport)."""
+        super().reset(x, y)
+
         # Boss stats
         self.max_hp = 1000
         self.hp = self.max_hp
         self.base_damage = 20
-        self.base_speed = speed * 1.1  # TĂNG SPEED lên 30%
+        self.base_speed = self.base_move_speed * 1.1  # TĂNG SPEED lên 30%
         
         # Physics
         self.gravity = 980  # Gravity constant
@@ -1454,8 +1436,7 @@ class BossEnemy(DataDrivenEnemy):
         
         # Trigger invincibility ngẫu nhiên khi HP thấp
         if self.hp < self.max_hp * 0.7 and not self.is_invincible:
-            import random
-            if random.random() < 0.001:  # 0.1% mỗi frame
+            if sim_random().random() < 0.001:  # 0.1% mỗi frame
                 self._trigger_invincibility()
         
         # Reset animation khi đổi state
@@ -1541,6 +1522,9 @@ class BossEnemy(DataDrivenEnemy):
         """Xử lý collision với platforms (đứng trên nền)"""
         on_ground = False
         
+        # Chỉ xét platform quanh Boss (truy vấn grid), vel_y tính theo px/giây
+        platforms = platforms_near(platforms, self.rect, 64)
+        
         # Debug: Log số lượng platforms (chỉ log 1 lần)
         if not hasattr(self, '_platform_logged'):
             print(f"[BOSS] Checking collision with {len(platforms)} platforms")
@@ -1614,14 +1598,10 @@ class BossEnemy(DataDrivenEnemy):
                     self.attack_has_hit = False
                     print(f"[BOSS] Attack animation finished, resetting attack_has_hit")
         
-        # Update image
+        # Update image (frame lật sẵn trong SpriteFrameStore, không cấp phát mới)
         if self.current_frame < len(frames):
             try:
-                img = frames[self.current_frame]
-                if self.facing_right:
-                    self.image = img
-                else:
-                    self.image = pygame.transform.flip(img, True, False)
+                self.image = frame_for(frames, self.current_frame, self.facing_right)[0]
             except Exception:
                 pass
     
@@ -1637,7 +1617,7 @@ class BossEnemy(DataDrivenEnemy):
                 try:
                     screen_x = int(particle['x'] - camera_x)
                     screen_y = int(particle['y'] - camera_y)
-                    pygame.draw.circle(surface, color[:3], (screen_x, screen_y), 3)
+                    mark_drawn(surface, pygame.draw.circle(surface, color[:3], (screen_x, screen_y), 3))
                 except Exception:
                     pass
         
@@ -1660,24 +1640,15 @@ class BossEnemy(DataDrivenEnemy):
         if not self.dead:
             frames = self.animations.get(self.state) or []
             if frames:
-                # Get current frame
-                entry = frames[self.current_frame]
-                if isinstance(entry, tuple) and len(entry) >= 1:
-                    frame = entry[0]
-                    trim = entry[1] if len(entry) > 1 else 0
-                else:
-                    frame = entry
-                    trim = 0
-                
-                # Flip sprite based on direction
-                img = frame if self.facing_right else pygame.transform.flip(frame, True, False)
+                # Get current frame (đã lật sẵn theo hướng)
+                img, trim = frame_for(frames, self.current_frame, self.facing_right)
                 img_rect = img.get_rect(midbottom=(self.rect.centerx - camera_x, self.rect.bottom - camera_y + trim))
                 surface.blit(img, img_rect)
             else:
                 # Fallback: vẽ rect nếu không có animation
-                pygame.draw.rect(surface, (150, 50, 50), 
+                mark_drawn(surface, pygame.draw.rect(surface, (150, 50, 50), 
                                (self.rect.x - camera_x, self.rect.y - camera_y, 
-                                self.rect.width, self.rect.height))
+                                self.rect.width, self.rect.height)))
         
         # Draw HP bar (always visible for boss)
         self._draw_boss_hp_bar(surface, camera_x, camera_y)
@@ -1693,7 +1664,7 @@ class BossEnemy(DataDrivenEnemy):
             screen_y = int(self.rect.top - camera_y - 30)
             
             # Background
-            pygame.draw.rect(surface, (50, 50, 50), (screen_x, screen_y, bar_width, bar_height))
+            mark_drawn(surface, pygame.draw.rect(surface, (50, 50, 50), (screen_x, screen_y, bar_width, bar_height)))
             
             # HP bar
             hp_ratio = max(0, self.hp / self.max_hp)
@@ -1706,10 +1677,10 @@ class BossEnemy(DataDrivenEnemy):
                 hp_color = (50, 255, 50)  # Green
             
             if hp_width > 0:
-                pygame.draw.rect(surface, hp_color, (screen_x, screen_y, hp_width, bar_height))
+                mark_drawn(surface, pygame.draw.rect(surface, hp_color, (screen_x, screen_y, hp_width, bar_height)))
             
             # Border
-            pygame.draw.rect(surface, (255, 255, 255), (screen_x, screen_y, bar_width, bar_height), 2)
+            mark_drawn(surface, pygame.draw.rect(surface, (255, 255, 255), (screen_x, screen_y, bar_width, bar_height), 2))
             
             # Boss name
             font = pygame.font.Font(None, 20)
@@ -0,0 +1,146 @@
+"""CharacterTemplate: dữ liệu bất biến của một character id, parse một lần và dùng chung.
+
+Trước đây mỗi enemy gọi `create_player(char_id)` để lấy `.animations`/`.skills`,
+tức là đọc lại metadata.json, `os.listdir` thư mục characters và dựng nguyên
+một Player. Template giữ metadata, đường dẫn đã resolve và các FrameSequence
+dùng chung; enemy chỉ còn copy dict animation và tạo skill mới cho riêng mình.
+"""
+import os
+import json
+from typing import Dict
+
+import pygame
+
+from game.characters.registry import get_skill
+from game.sprite_frames import load_scaled_frames
+
+_REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), '..'))
+
+# Các state luôn thử load, cộng thêm các state khai báo trong metadata['frames']
+DEFAULT_STATES = ('idle', 'walk', 'jump', 'dash', 'attack', 'hurt', 'dying')
+
+_templates: Dict[str, "CharacterTemplate"] = {}
+
+
+def _resolve_char_folder(char_id: str) -> str:
+    """Find character folder case-insensitively (Windows: Golem_02 vs golem_02)."""
+    chars_root = os.path.join(_REPO_ROOT, 'assets', 'characters')
+    if os.path.isdir(chars_root):
+        for folder_name in os.listdir(chars_root):
+            if folder_name.lower() == char_id.lower() and os.path.isdir(os.path.join(chars_root, folder_name)):
+                return os.path.join(chars_root, folder_name)
+    return os.path.join(chars_root, char_id)
+
+
+class CharacterTemplate:
+    def __init__(self, char_id: str):
+        self.char_id = char_id
+        self.assets_dir = _resolve_char_folder(char_id)
+
+        meta = {}
+        meta_path = os.path.join(self.assets_dir, 'metadata.json')
+        if os.path.isfile(meta_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except Exception:
+                meta = {}
+        self.meta = meta
+
+        sprite_path = meta.get('sprite_path') or self.assets_dir
+        # If sprite_path is relative, make it relative to repo root
+        if sprite_path and not os.path.isabs(sprite_path):
+            sprite_path = os.path.normpath(os.path.join(_REPO_ROOT, sprite_path))
+        self.sprite_path = sprite_path
+        self.scale = meta.get('scale', 1.0)
+        self.frames_map = meta.get('frames', {}) if isinstance(meta.get('frames', {}), dict) else {}
+        self.skill_specs = meta.get('skills', [])
+
+        # Resolve frames_map paths to absolute paths (dùng cho Player ctor)
+        self.resolved_frames = {}
+        for state_name, folder in self.frames_map.items():
+            # turret_01 ghi số frame thay cho thư mục: bỏ qua giá trị không phải path
+            if folder and isinstance(folder, str):
+                for cand in self._candidates(folder):
+                    if os.path.isdir(cand):
+                        self.resolved_frames[state_name] = cand
+                        break
+
+        self._animations = None
+
+    def _candidates(self, folder):
+        # Try several resolutions for folder paths (absolute, relative to repo, under sprite_path)
+        return [
+            os.path.normpath(c) for c in (
+                folder,  # if absolute
+                os.path.join(_REPO_ROOT, folder),  # relative to repo root
+                os.path.join(self.assets_dir, folder),  # relative to assets_chars
+                os.path.join(self.sprite_path or self.assets_dir, folder),  # relative to sprite_path
+            )
+        ]
+
+    def state_folder(self, state_name):
+        """Thư mục frame của state (theo metadata, rồi mặc định sprite_path/<state>), hoặc None."""
+        folder = self.frames_map.get(state_name)
+        candidates = self._candidates(folder) if folder and isinstance(folder, str) else []
+        # also try default sprite_path/<state_name>
+        candidates.append(os.path.normpath(os.path.join(self.sprite_path or self.assets_dir, state_name)))
+        for cand in candidates:
+            if os.path.isdir(cand):
+                return cand
+        return None
+
+    def animation_states(self):
+        """Các state mặc định cộng thêm state khai báo trong metadata['frames']."""
+        states = set(DEFAULT_STATES)
+        states.update(self.frames_map.keys())
+        return states
+
+    @property
+    def animations(self):
+        """state -> FrameSequence dùng chung (load lười lần đầu). Không sửa trực tiếp."""
+        if self._animations is None:
+            animations = {}
+            for state_name in self.animation_states():
+                folder = self.state_folder(state_name)
+                animations[state_name] = load_scaled_frames(folder, self.scale) if folder else []
+            self._animations = animations
+        return self._animations
+
+    def hitbox(self, x, y):
+        """Hitbox giống Player với scale của template."""
+        return pygame.Rect(x, y, int(120 * self.scale), int(240 * self.scale))
+
+    def create_skills(self, owner, existing=None):
+        """
+        Skill instance mới cho `owner`: `existing` (mặc định là bộ skill của Player)
+        gộp thêm các skill khai báo trong metadata.
+        """
+        if existing is None:
+            # Import lazily: game.player kéo theo nhiều module, tránh vòng import
+            from game.player import default_skills
+            existing = default_skills(owner)
+        skills = existing
+        for s in self.skill_specs:
+            sid = s.get('id') if isinstance(s, dict) else s
+            params = s.get('params', {}) if isinstance(s, dict) else {}
+            cls = get_skill(sid)
+            if cls:
+                try:
+                    skills[sid] = cls(**params)
+                except Exception:
+                    # If instantiation fails, skip to keep factory robust
+                    pass
+            else:
+                # If not a registered Skill class, keep raw dict params if provided
+                if isinstance(s, dict):
+                    skills[sid] = params
+        return skills
+
+
+def get_template(char_id: str) -> CharacterTemplate:
+    """Template cho char_id (parse metadata lần đầu, các lần sau lấy từ registry)."""
+    template = _templates.get(char_id)
+    if template is None:
+        template = _templates[char_id] = CharacterTemplate(char_id)
+    return template
@@ -40,3 +40,93 @@ OBJECT_TILE_Y_OFFSET = 0  # tinh chỉnh thêm (px), dương = đẩy ảnh xu
 BG_TINT_ENABLED = True
 BG_TINT_COLOR = (0x65, 0xBE, 0xC4)  # #65BEC4
 BG_TINT_ALPHA = int(255 * 0.2)  # ~20% opacity
+
+# Cache pre-render cho tile layer "nen" (xem game/layer_cache.py)
+# - LAYER_CACHE_CHUNK_SIZE: cạnh mỗi chunk (px), nên là bội số của kích thước tile
+# - LAYER_CACHE_MAX_CHUNKS: số chunk tối đa giữ trong RAM (LRU) khi bake lười
+#   (mỗi chunk 1024px RGBA ~4MB)
+# - LAYER_CACHE_EAGER: True = bake toàn bộ khi load map, False = bake khi cần
+LAYER_CACHE_CHUNK_SIZE = 1024
+LAYER_CACHE_MAX_CHUNKS = 32
+LAYER_CACHE_EAGER = False
+
+# Grid culling cho object layer tĩnh (xem PERFORMANCE_OPTIMIZATION.md, game/object_layer_index.py)
+OBJECT_GRID_SIZE = 2048  # Kích thước mỗi ô lưới (px)
+OBJECT_CULLING_MARGIN = 200  # Mở rộng vùng tra ô quanh camera (px)
+
+# Render target (xem game/render_targets.py)
+# True: scale sẵn các layer tĩnh theo ZOOM khi load và vẽ thẳng ở độ phân giải màn hình,
+# lớp nhân vật/hiệu ứng chỉ xoá + scale các ô ACTOR_DIRTY_CELL có vẽ trong frame.
+# False: vẽ mọi thứ ở toạ độ world rồi scale cả khung nhìn mỗi frame (cách cũ, để so sánh)
+RENDER_PRESCALED = True
+ACTOR_DIRTY_CELL = 200  # Cạnh ô lưới của lớp actor (px world, làm tròn theo mẫu số của ZOOM)
+
+# Kho ảnh thu nhỏ theo zoom cho decor lớn (xem game/asset_pyramid.py), dùng khi RENDER_PRESCALED
+# - ASSET_PYRAMID_DISK_CACHE: lưu ảnh đã scale ra đĩa, lần chạy sau không phải decode + scale ảnh gốc
+# - ASSET_PYRAMID_KEEP_LEVELS: giữ các bậc trung gian (0.5, 0.25...) trong RAM
+#   để đổi zoom lúc chơi không phải scale lại từ ảnh gốc
+ASSET_PYRAMID_DISK_CACHE = False
+ASSET_PYRAMID_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", ".cache", "pyramid")
+ASSET_PYRAMID_KEEP_LEVELS = False
+
+# Map baked dạng nhị phân (xem game/map_bake.py)
+# - MAP_BAKE_ENABLED: load_map đọc file baked (mmap) thay vì parse TMX bằng pytmx
+# - MAP_BAKE_AUTO: chưa có/cũ thì tự bake lại từ TMX (lần đầu chậm hơn một chút)
+MAP_BAKE_ENABLED = True
+MAP_BAKE_AUTO = True
+MAP_BAKE_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", ".cache", "maps")
+
+# Cache frame sprite đã scale trên đĩa (xem game/sprite_disk_cache.py)
+# Lần chạy sau đọc pixel RGBA thô qua mmap thay vì decode PNG + scale + tính trim
+SPRITE_DISK_CACHE_ENABLED = True
+SPRITE_DISK_CACHE_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", ".cache", "sprites")
+
+# Load asset nền (xem game/asset_streamer.py)
+# Worker thread decode + scale PNG, main thread chỉ convert_alpha trong giới hạn ms mỗi frame
+ASSET_STREAM_ENABLED = True
+ASSET_STREAM_WORKERS = 2
+ASSET_STREAM_PUMP_BUDGET_MS = 4
+
+# Manifest asset (xem game/asset_manifest.py): file + dung lượng + phụ thuộc của
+# character/skill/map, dùng cho loading screen và để chỉ load phần cần thiết
+ASSET_MANIFEST_PATH = os.path.join(os.path.dirname(PROJECT_ROOT), "assets", ".cache", "manifest.json")
+
+# Projectile dạng struct-of-arrays (xem game/projectile_system.py)
+# Có NumPy thì update + va chạm vector hoá cho mọi projectile một lần mỗi frame
+PROJECTILE_INITIAL_CAPACITY = 256  # Số hàng cấp sẵn, tự gấp đôi khi đầy
+PROJECTILE_FRAME_TIME = 0.06  # Giây mỗi frame animation của projectile
+
+# Spatial hash enemy dựng lại mỗi frame (xem game/enemy_grid.py)
+# Skill / projectile chỉ test va chạm với enemy trong các ô lân cận
+ENEMY_GRID_CELL_SIZE = 256  # Kích thước mỗi ô (px), cỡ hitbox một enemy
+
+# Banner stage / VICTORY dựng sẵn (xem game/banner.py)
+BANNER_SCALE_STEP = 0.02  # Tỉ lệ nhịp đập làm tròn theo bậc này, mỗi bậc chỉ scale một lần
+
+# Mô phỏng bước cố định (xem game/sim_clock.py)
+# Logic chạy SIM_TICK_RATE tick/giây bất kể FPS vẽ. GRAVITY, SPEED, JUMP_POWER là
+# đơn vị mỗi tick tham chiếu PHYSICS_TICK_RATE (bằng FPS cũ); mỗi tick dài dt được
+# tính bằng dt * PHYSICS_TICK_RATE tick tham chiếu nên đổi SIM_TICK_RATE không đổi tốc độ game
+PHYSICS_TICK_RATE = 120
+SIM_TICK_RATE = 120
+SIM_DT = 1.0 / SIM_TICK_RATE
+SIM_MAX_STEPS_PER_FRAME = 5  # Quá số tick này trong một frame thì bỏ bớt thời gian (game chậm lại thay vì đứng)
+SIM_SNAP_DISTANCE = 256  # Dịch chuyển quá xa trong một tick (teleport) thì không nội suy
+# Mỗi enemy được update bấy nhiêu lần mỗi tick (cùng dt). Vòng lặp gốc gọi e.update
+# hai lần mỗi frame và tốc độ / gravity / nhịp animation của enemy đã được chỉnh theo
+# đó; giữ 2 để gameplay không đổi, muốn 1 thì phải chỉnh lại tốc độ enemy
+ENEMY_UPDATES_PER_TICK = 2
+
+# Ghi / phát lại input (xem game/replay.py)
+# Bật thì mỗi lần chơi ghi phím theo tick + seed + dt ra REPLAY_DIR để chạy lại
+# đúng session đó (python -m game.replay <file>) và so thời gian tick giữa các bản build
+REPLAY_RECORD_ENABLED = False
+REPLAY_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "replays")
+REPLAY_CHECKPOINT_TICKS = 120  # Ghi checksum trạng thái mỗi bấy nhiêu tick để tìm chỗ lệch khi replay
+
+# Profiler theo frame trong cửa sổ game (xem game/profiler.py)
+# F3 bật/tắt overlay ms mỗi phần, F4 bắt đầu/dừng capture ra CSV + Chrome trace
+PROFILER_WINDOW = 120  # Số frame của trung bình trượt trên overlay (1 giây ở 120 FPS)
+PROFILER_OVERLAY_REFRESH = 15  # Dựng lại bảng overlay mỗi bấy nhiêu frame, giữa chừng chỉ blit
+PROFILER_CAPTURE_MAX_FRAMES = 3600  # Capture tự dừng và xuất file sau bấy nhiêu frame
+PROFILER_EXPORT_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "profiles")
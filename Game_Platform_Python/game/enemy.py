@@ -1,30 +1,32 @@
 import pygame
 import os
 from game.config import PLAYER_SCALE, GRAVITY
+from game.map_loader import platforms_near
+from game.sprite_frames import SpriteFrameStore, bottom_trim, frame_for
+from game.render_targets import mark_drawn
+from game.sim_clock import tick_scale, fall
 
 
 def load_frames_simple(folder, size):
-    """Tải các khung hình giống player: trả về danh sách (surface, bottom_trim)."""
+    """Tải các khung hình giống player: trả về danh sách (surface, bottom_trim) dùng chung."""
+    return SpriteFrameStore().get(
+        ("simple", os.path.normpath(folder), tuple(size)),
+        lambda: _load_frames_simple_from_disk(folder, size),
+        folder=folder,
+    )
+
+
+def _load_frames_simple_from_disk(folder, size):
     frames = []
     if not os.path.isdir(folder):
         return frames
     for filename in sorted(os.listdir(folder)):
         if filename.lower().endswith(".png"):
-            img = pygame.image.load(os.path.join(folder, filename)).convert_alpha()
+            path = os.path.join(folder, filename)
+            img = pygame.image.load(path).convert_alpha()
             img = pygame.transform.scale(img, size)
             # tính phần trong suốt ở đáy ảnh (bottom transparent trim)
-            h = img.get_height()
-            bottom_trim = 0
-            for y in range(h - 1, -1, -1):
-                row_has_pixel = False
-                for x in range(img.get_width()):
-                    if img.get_at((x, y))[3] != 0:
-                        row_has_pixel = True
-                        break
-                if row_has_pixel:
-                    bottom_trim = h - 1 - y
-                    break
-            frames.append((img, bottom_trim))
+            frames.append((img, bottom_trim(img, path)))
     return frames
 
 
@@ -102,16 +104,16 @@ class PatrolEnemy:
         if self.dead:
             return
 
-        # gravity (dùng hệ số GRAVITY=2 giống player)
-        self.vel_y += GRAVITY  # không nhân với dt ở đây
-        self.rect.y += self.vel_y  # không nhân với dt ở đây nữa
+        # gravity (dùng hệ số GRAVITY=2 mỗi tick tham chiếu giống player)
+        dy, self.vel_y = fall(self.vel_y, GRAVITY, tick_scale(dt))
+        self.rect.y += int(round(dy))
 
-        # kiểm tra va chạm với platform
+        # kiểm tra va chạm với platform (chỉ các platform lân cận qua grid)
         self.on_ground = False
         for (
             _,
             platform_rect,
-        ) in platforms:  # platforms là list các tuple (tile_img, rect)
+        ) in platforms_near(platforms, self.rect, abs(int(round(dy)))):  # (tile_img, rect)
             if self.rect.colliderect(platform_rect):
                 # va chạm từ trên xuống
                 if self.vel_y > 0:
@@ -189,7 +191,7 @@ class PatrolEnemy:
 
         frames = self.animations.get(self.state) or []
         if not frames:
-            pygame.draw.rect(
+            mark_drawn(surface, pygame.draw.rect(
                 surface,
                 (150, 50, 50),
                 (
@@ -198,9 +200,9 @@ class PatrolEnemy:
                     self.rect.width,
                     self.rect.height,
                 ),
-            )
+            ))
             if show_hitbox:
-                pygame.draw.rect(
+                mark_drawn(surface, pygame.draw.rect(
                     surface,
                     (255, 0, 0),
                     (
@@ -210,19 +212,16 @@ class PatrolEnemy:
                         self.rect.height,
                     ),
                     2,
-                )
+                ))
             return
-        frame, trim = frames[self.current_frame]
-        img = (
-            frame if self.direction >= 0 else pygame.transform.flip(frame, True, False)
-        )
+        img, trim = frame_for(frames, self.current_frame, self.direction >= 0)
         img_rect = img.get_rect(
             midbottom=(self.rect.centerx - camera_x, self.rect.bottom - camera_y + trim)
         )
         surface.blit(img, img_rect)
         # Vẽ hitbox nếu bật
         if show_hitbox:
-            pygame.draw.rect(
+            mark_drawn(surface, pygame.draw.rect(
                 surface,
                 (255, 0, 0),
                 (
@@ -232,7 +231,7 @@ class PatrolEnemy:
                     self.rect.height,
                 ),
                 2,
-            )
+            ))
 
         # Draw a small HP bar above the enemy when damaged
         try:
@@ -249,7 +248,7 @@ class PatrolEnemy:
                     bx = int(self.rect.centerx - bar_w // 2 - camera_x)
                     by = int(self.rect.top - 10 - camera_y)
                     # Background
-                    pygame.draw.rect(surface, (50, 50, 50), (bx, by, bar_w, bar_h))
+                    mark_drawn(surface, pygame.draw.rect(surface, (50, 50, 50), (bx, by, bar_w, bar_h)))
                     # Filled portion
                     pct = max(0.0, min(1.0, float(self.hp) / float(self.max_hp)))
                     filled_w = int(bar_w * pct)
@@ -261,9 +260,9 @@ class PatrolEnemy:
                             col = (255, 200, 0)
                         else:
                             col = (220, 30, 30)
-                        pygame.draw.rect(surface, col, (bx, by, filled_w, bar_h))
+                        mark_drawn(surface, pygame.draw.rect(surface, col, (bx, by, filled_w, bar_h)))
                     # Border
-                    pygame.draw.rect(surface, (0, 0, 0), (bx, by, bar_w, bar_h), 1)
+                    mark_drawn(surface, pygame.draw.rect(surface, (0, 0, 0), (bx, by, bar_w, bar_h), 1))
         except Exception:
             # Don't let HP drawing crash the game
             pass
@@ -0,0 +1,129 @@
+"""
+Spatial hash động cho enemy, dựng lại một lần mỗi frame.
+
+Trước đây mỗi skill (melee, fire explosion, earth slam) và projectile quét toàn bộ
+list `enemies` để tìm enemy bị trúng. EnemyGrid chia world thành các ô vuông
+ENEMY_GRID_CELL_SIZE, `rebuild()` đăng ký mỗi enemy vào các ô mà rect chạm tới;
+truy vấn chỉ xét enemy trong các ô giao với vùng hỏi (giống PlatformGrid nhưng
+cho đối tượng di chuyển).
+
+Kết quả truy vấn giữ thứ tự của list gốc, nên hành vi (vd. projectile trúng enemy
+đầu tiên) giống hệt lúc quét list.
+"""
+from game.config import ENEMY_GRID_CELL_SIZE
+
+
+class EnemyGrid:
+    def __init__(self, cell_size=ENEMY_GRID_CELL_SIZE):
+        self.cell_size = max(1, int(cell_size))
+        self.cells = {}  # (cx, cy) -> [index, ...]
+        self.enemies = []
+        self.queries = 0
+
+    def __iter__(self):
+        return iter(self.enemies)
+
+    def __len__(self):
+        return len(self.enemies)
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (
+            int(left // size),
+            int((right - 1) // size),
+            int(top // size),
+            int((bottom - 1) // size),
+        )
+
+    def rebuild(self, enemies):
+        """Đăng ký lại toàn bộ enemy (gọi một lần mỗi frame, sau khi enemy di chuyển)."""
+        self.cells.clear()
+        self.enemies = list(enemies)
+        cells = self.cells
+        for index, enemy in enumerate(self.enemies):
+            rect = getattr(enemy, "rect", None)
+            if rect is None:
+                continue
+            cx0, cx1, cy0, cy1 = self._cell_range(rect.left, rect.top, rect.right, rect.bottom)
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [index]
+                    else:
+                        bucket.append(index)
+
+    def _candidates(self, left, top, right, bottom):
+        """Index (đã sắp xếp, không trùng) của enemy trong các ô giao với vùng."""
+        self.queries += 1
+        cx0, cx1, cy0, cy1 = self._cell_range(left, top, right, bottom)
+        cells = self.cells
+        found = []
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Vùng hỏi rộng hơn số ô có enemy: duyệt ô có dữ liệu thay vì từng ô
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.extend(bucket)
+        else:
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        found.extend(bucket)
+        if len(found) > 1:
+            found = sorted(set(found))
+        return found
+
+    def in_rect(self, rect):
+        """Enemy có rect giao với `rect`."""
+        enemies = self.enemies
+        return [
+            enemies[i]
+            for i in self._candidates(rect.left, rect.top, rect.right, rect.bottom)
+            if enemies[i].rect.colliderect(rect)
+        ]
+
+    def near_rect(self, left, top, right, bottom):
+        """Ứng viên (chưa test chính xác) trong vùng - dùng cho test theo lô như ProjectileSystem."""
+        enemies = self.enemies
+        return [enemies[i] for i in self._candidates(left, top, right, bottom)]
+
+    def in_radius(self, center, radius):
+        """Enemy có tâm rect cách `center` không quá `radius`."""
+        x, y = center
+        enemies = self.enemies
+        found = []
+        radius_sq = radius * radius
+        for i in self._candidates(x - radius, y - radius, x + radius + 1, y + radius + 1):
+            ex, ey = enemies[i].rect.center
+            if (ex - x) * (ex - x) + (ey - y) * (ey - y) <= radius_sq:
+                found.append(enemies[i])
+        return found
+
+    def stats(self):
+        return {
+            'enemies': len(self.enemies),
+            'cells': len(self.cells),
+            'queries': self.queries,
+        }
+
+
+def enemies_in_radius(enemies, center, radius):
+    """`in_radius` cho cả EnemyGrid lẫn list thường (quét toàn bộ như cũ)."""
+    if isinstance(enemies, EnemyGrid):
+        return enemies.in_radius(center, radius)
+    x, y = center
+    found = []
+    for enemy in enemies:
+        if hasattr(enemy, "rect"):
+            ex, ey = enemy.rect.center
+            if ((ex - x) ** 2 + (ey - y) ** 2) ** 0.5 <= radius:
+                found.append(enemy)
+    return found
+
+
+def enemies_in_rect(enemies, rect):
+    """`in_rect` cho cả EnemyGrid lẫn list thường."""
+    if isinstance(enemies, EnemyGrid):
+        return enemies.in_rect(rect)
+    return [e for e in enemies if hasattr(e, "rect") and e.rect.colliderect(rect)]
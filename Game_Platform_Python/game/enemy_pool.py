@@ -0,0 +1,99 @@
+"""
+Pool tái sử dụng enemy theo từng loại (enemy id).
+
+Trước đây mỗi stage / boss spawn gọi `create_enemy()` tạo instance mới, còn enemy
+chết thì bị bỏ qua list comprehension cho GC dọn. EnemyPool giữ danh sách instance
+rảnh cho từng enemy id: `acquire()` lấy một instance rảnh và gọi `reset(x, y)`,
+`release()` trả instance đã chết về pool. `prewarm()` (gọi từ `preload_enemies`)
+tạo sẵn đủ instance trước khi vào game nên chuyển stage không phải cấp phát.
+
+Chỉ instance có `reset(x, y)` (DataDrivenEnemy và các subclass) mới được pool;
+fallback như PatrolEnemy vẫn tạo mới như cũ.
+"""
+from game.enemy_registry import create_enemy
+
+
+class EnemyPool:
+    _instance = None
+
+    def __new__(cls):
+        # Singleton - pool dùng chung giữa các session (play again)
+        if cls._instance is None:
+            cls._instance = super(EnemyPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._free = {}  # enemy_id -> [instance rảnh]
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    def _create(self, enemy_id, x, y):
+        inst = create_enemy(enemy_id, x, y)
+        if hasattr(inst, "reset"):
+            # Đánh dấu loại để release() biết trả về pool nào
+            inst._pool_id = enemy_id
+        return inst
+
+    def acquire(self, enemy_id, x, y):
+        """Enemy `enemy_id` ở (x, y): lấy từ pool nếu có, không thì tạo mới."""
+        free = self._free.get(enemy_id)
+        if free:
+            inst = free.pop()
+            inst.reset(x, y)
+            self.hits += 1
+            return inst
+        self.misses += 1
+        return self._create(enemy_id, x, y)
+
+    def release(self, inst):
+        """Trả instance về pool (bỏ qua instance không do pool quản lý)."""
+        enemy_id = getattr(inst, "_pool_id", None)
+        if enemy_id is None:
+            return
+        free = self._free.setdefault(enemy_id, [])
+        # Tránh release hai lần cùng một instance
+        if inst not in free:
+            free.append(inst)
+
+    def release_dead(self, enemies):
+        """Trả các enemy đã chết về pool, trả về list enemy còn sống (thay cho list comprehension)."""
+        alive = []
+        for inst in enemies:
+            if getattr(inst, "dead", False):
+                self.release(inst)
+            else:
+                alive.append(inst)
+        return alive
+
+    def prewarm(self, enemy_id, count, limit=None):
+        """
+        Tạo sẵn để pool của `enemy_id` có ít nhất `count` instance rảnh.
+
+        `limit` giới hạn số instance tạo trong lần gọi này (để rải việc ra nhiều
+        frame khi đang chơi). Trả về số instance đã tạo (0 = đủ hoặc không pool được).
+        """
+        free = self._free.setdefault(enemy_id, [])
+        created = 0
+        while len(free) < count and (limit is None or created < limit):
+            inst = self._create(enemy_id, 0, 0)
+            if not hasattr(inst, "reset"):
+                # Loại này không pool được (fallback), không cần tạo thêm
+                break
+            free.append(inst)
+            created += 1
+        return created
+
+    def clear(self):
+        self._free.clear()
+
+    def stats(self):
+        """Số instance rảnh theo loại và hit/miss khi acquire."""
+        return {
+            'free': {enemy_id: len(free) for enemy_id, free in self._free.items()},
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,77 @@
+"""
+Đo thời gian từng phần (subsystem) của một frame.
+
+GameSession và SessionView bọc từng bước update / vẽ trong `timer.section(tên)`.
+Mặc định dùng NULL_TIMER (không đo gì, gần như không tốn chi phí); bench (xem
+bench/run.py) gán một SectionTimer để lấy mẫu ms của từng phần qua nhiều frame:
+
+    timer = SectionTimer()
+    session.timer = view.timer = timer
+    ...
+    timer.summary()  # {"update.enemies": {"mean": ..., "p95": ...}, ...}
+
+Tên phần dùng tiền tố "update." cho logic theo tick và "draw." cho phần vẽ.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def percentiles(samples):
+    """mean / p50 / p95 / p99 / max của một list số (ms)."""
+    if not samples:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': ordered[int(last * 0.50)],
+        'p95': ordered[int(last * 0.95)],
+        'p99': ordered[int(last * 0.99)],
+        'max': ordered[last],
+    }
+
+
+class SectionTimer:
+    def __init__(self):
+        self.samples = {}  # tên -> list ms, mỗi lần vào section một mẫu
+        self.enabled = True
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = []
+            samples.append(elapsed)
+
+    def reset(self):
+        self.samples = {}
+
+    def summary(self):
+        """Thống kê theo tên: percentiles + số lần đo + tổng ms."""
+        result = {}
+        for name, samples in self.samples.items():
+            stats = percentiles(samples)
+            stats['count'] = len(samples)
+            stats['total'] = sum(samples)
+            result[name] = stats
+        return result
+
+
+class _NullTimer:
+    """Timer không đo gì - mặc định của session / view khi không chạy bench."""
+
+    _context = nullcontext()
+
+    def section(self, name):
+        return self._context
+
+
+NULL_TIMER = _NullTimer()
@@ -0,0 +1,318 @@
+"""
+Chạy GameSession không cửa sổ, không vẽ - để soak test stage, đo AI và chạy CI.
+
+Dùng driver video/âm thanh "dummy" của SDL (vẫn cần một display surface 1x1 để
+`convert_alpha` khi load map và sprite), bỏ hẳn phần vẽ: mỗi vòng lặp chỉ là
+`session.tick(dt)` với dt cố định. Player đọc phím từ ScriptedInput thay vì
+`pygame.key.get_pressed()` (xem `Player.input_source`).
+
+    python -m game.headless --char bluewizard --ticks 20000 --stage 2
+    python -m game.headless --check-tick-rates   # rơi / chạy / nhảy như nhau ở 60 và 120 tick/s
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Chạy trực tiếp (python game/headless.py) cũng import được package game
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from game.config import SIM_TICK_RATE, PHYSICS_TICK_RATE
+from game.asset_streamer import AssetStreamer, PRIORITY_NOW
+from game.session import GameSession, build_stages
+
+# Tên phím dùng trong kịch bản input -> mã phím pygame mà Player.handle_input đọc
+KEY_NAMES = {
+    "left": pygame.K_a,
+    "right": pygame.K_d,
+    "up": pygame.K_w,
+    "down": pygame.K_s,
+    "jump": pygame.K_SPACE,
+    "attack": pygame.K_j,
+    "dash": pygame.K_k,
+    "cloud": pygame.K_i,
+    "ultimate": pygame.K_l,
+}
+
+# Kịch bản mặc định (lặp lại): bước qua lại quanh chỗ đứng (SPEED tính theo tick
+# nên vài chục tick đã là cả nghìn px), nhảy, bắn và dùng ultimate
+# Mỗi đoạn là (số tick, tên các phím đang giữ)
+DEFAULT_SCRIPT = (
+    (20, ("right",)),
+    (120, ("attack",)),
+    (10, ("right", "jump")),
+    (30, ()),
+    (20, ("left",)),
+    (120, ("attack", "ultimate")),
+    (10, ("left", "jump")),
+    (30, ()),
+)
+
+
+# Kiểm tra tốc độ game theo tần số mô phỏng: player (trên một nền phẳng) chạy cùng
+# kịch bản tính theo giây ở mỗi tần số, vị trí ở cuối mỗi đoạn phải trùng nhau.
+# Mỗi đoạn là (số giây, tên các phím đang giữ)
+TICK_RATE_CHECK_RATES = (60, PHYSICS_TICK_RATE)
+TICK_RATE_CHECK_SCRIPT = (
+    (0.5, ()),                  # rơi từ trên cao xuống nền
+    (0.25, ("right",)),         # chạy
+    (0.25, ("right", "jump")),  # nhảy khi đang chạy (đang bay lên)
+    (0.25, ("right",)),         # gần đỉnh
+    (0.5, ()),                  # rơi lại xuống nền
+    (0.25, ("jump",)),          # nhảy tại chỗ
+    (0.25, ()),
+)
+TICK_RATE_CHECK_DROP = 600  # player bắt đầu cao hơn nền bấy nhiêu px
+TICK_RATE_CHECK_TOLERANCE = 1  # px lệch tối đa cho phép (làm tròn vị trí mỗi tick)
+
+
+class KeyState:
+    """Trạng thái phím tra theo mã phím như kết quả của `pygame.key.get_pressed()`."""
+
+    __slots__ = ("pressed",)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class ScriptedInput:
+    """
+    Nguồn input theo kịch bản, gán vào `player.input_source`.
+
+    `script`: list (số tick, tên phím hoặc mã phím) chạy tuần tự, hết thì lặp lại
+    nếu `loop`, không thì thả hết phím. Gọi `advance()` sau mỗi tick.
+    """
+
+    def __init__(self, script=DEFAULT_SCRIPT, loop=True):
+        self.segments = [
+            (max(1, int(ticks)), KeyState(KEY_NAMES.get(k, k) for k in keys))
+            for ticks, keys in script
+        ]
+        self.loop = loop
+        self.tick = 0
+        self._index = 0
+        self._left = self.segments[0][0] if self.segments else 0
+        self._idle = KeyState()
+
+    def __call__(self):
+        if self._index >= len(self.segments):
+            return self._idle
+        return self.segments[self._index][1]
+
+    def advance(self):
+        self.tick += 1
+        if self._index >= len(self.segments):
+            return
+        self._left -= 1
+        if self._left <= 0:
+            self._index += 1
+            if self._index >= len(self.segments) and self.loop:
+                self._index = 0
+            if self._index < len(self.segments):
+                self._left = self.segments[self._index][0]
+
+
+def init_headless():
+    """Khởi tạo pygame với driver dummy (không cửa sổ, không âm thanh)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def load_headless_world(selected_char, start_stage=0, world=None):
+    """
+    Load map không kèm tài nguyên vẽ (nếu chưa có) + sprite của nhân vật và enemy/boss
+    của stage bắt đầu, không loading screen.
+    """
+    from game.world_assets import WorldAssets
+
+    if world is None:
+        world = WorldAssets(render=False)
+    else:
+        world.reset()
+    # Kẹp chỉ số stage giống GameSession
+    stages = build_stages()
+    stage = stages[max(0, min(int(start_stage), len(stages) - 1))]
+    char_ids = [selected_char] + list(stage.get("enemy_types", []))
+    if stage.get("boss"):
+        char_ids.append(stage["boss"])
+    streamer = AssetStreamer()
+    streamer.wait(streamer.request_characters(list(dict.fromkeys(char_ids)), PRIORITY_NOW))
+    return world
+
+
+def run_headless(selected_char, ticks, script=DEFAULT_SCRIPT, start_stage=0, seed=None,
+                 tick_rate=SIM_TICK_RATE, respawn=True, stop_on_victory=True, world=None,
+                 report_every=0, record_path=None):
+    """
+    Chạy `ticks` tick mô phỏng của một session; trả về dict báo cáo (tick/giây, trạng thái session).
+
+    `seed`: seed RNG mô phỏng của session (None = ngẫu nhiên, xem trong báo cáo).
+    `respawn`: player chết thì hồi sinh ngay để soak test chạy tiếp.
+    `report_every`: > 0 thì in tiến độ mỗi bấy nhiêu tick.
+    `record_path`: ghi lại input ra file replay (xem game/replay.py).
+    """
+    init_headless()
+    if seed is not None:
+        random.seed(seed)
+    world = load_headless_world(selected_char, start_stage, world)
+    session = GameSession(selected_char, world, start_stage=start_stage, seed=seed)
+    scripted = ScriptedInput(script)
+    session.player.input_source = scripted
+    recorder = None
+    if record_path is not None:
+        from game.replay import InputRecorder, EVENT_RESPAWN
+
+        recorder = InputRecorder(session, source=scripted)
+    dt = 1.0 / float(tick_rate)
+
+    start = time.perf_counter()
+    for _ in range(int(ticks)):
+        session.pump_assets()
+        if recorder is not None:
+            recorder.tick(dt)
+        else:
+            session.tick(dt)
+        scripted.advance()
+        if respawn and not getattr(session.player, "alive", True):
+            session.respawn_player()
+            if recorder is not None:
+                recorder.mark_event(EVENT_RESPAWN)
+        if stop_on_victory and session.game_won:
+            break
+        if report_every and session.ticks % report_every == 0:
+            elapsed = time.perf_counter() - start
+            print(
+                f"[HEADLESS] tick {session.ticks}: {session.ticks / max(elapsed, 1e-9):.0f} tick/s, "
+                f"stage={session.current_stage + 1} enemies={len(session.enemies)}"
+            )
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'character': selected_char,
+        'tick_rate': float(tick_rate),
+        'ticks': session.ticks,
+        'sim_seconds': session.ticks * dt,
+        'wall_seconds': elapsed,
+        'ticks_per_second': session.ticks / elapsed if elapsed > 0 else 0.0,
+        'realtime_factor': session.ticks * dt / elapsed if elapsed > 0 else 0.0,
+        'session': session.stats(),
+        'projectiles': session.projectile_system.stats(),
+        'enemy_grid': session.enemy_grid.stats(),
+    }
+    if recorder is not None:
+        report['replay'] = recorder.save(record_path)
+    return report
+
+
+def _trace_player_physics(selected_char, tick_rate, script):
+    """Vị trí (x, y) của player ở cuối mỗi đoạn `script` (giây) khi mô phỏng ở `tick_rate`."""
+    from game.characters.factory import create_player
+
+    ground = pygame.Rect(-100000, 0, 200000, 1000)
+    player = create_player(selected_char, 0, 0)
+    player.rect.bottom = ground.top - TICK_RATE_CHECK_DROP
+    platforms = [(None, ground)]
+    dt = 1.0 / float(tick_rate)
+    samples = []
+    for seconds, keys in script:
+        player.input_source = ScriptedInput(((1, keys),), loop=True)
+        for _ in range(int(round(seconds * tick_rate))):
+            player.handle_input(dt)
+            player.move(platforms, dt)
+        samples.append((player.rect.x, player.rect.bottom - ground.top))
+    return samples
+
+
+def check_tick_rates(selected_char="bluewizard", rates=TICK_RATE_CHECK_RATES,
+                     script=TICK_RATE_CHECK_SCRIPT, tolerance=TICK_RATE_CHECK_TOLERANCE):
+    """
+    So quỹ đạo rơi / chạy / nhảy của player giữa các tần số mô phỏng.
+
+    Trả về dict: vị trí cuối mỗi đoạn theo từng tần số, độ lệch lớn nhất (px) so với
+    tần số đầu tiên và `ok` (lệch không quá `tolerance`).
+    """
+    init_headless()
+    traces = {float(rate): _trace_player_physics(selected_char, rate, script) for rate in rates}
+    reference = traces[float(rates[0])]
+    max_dx = max_dy = 0
+    for samples in traces.values():
+        for (x0, y0), (x, y) in zip(reference, samples):
+            max_dx = max(max_dx, abs(x - x0))
+            max_dy = max(max_dy, abs(y - y0))
+    return {
+        'character': selected_char,
+        'rates': [float(rate) for rate in rates],
+        'times': [round(sum(seconds for seconds, _ in script[:i + 1]), 6) for i in range(len(script))],
+        'positions': {str(rate): samples for rate, samples in traces.items()},
+        'max_dx': max_dx,
+        'max_dy': max_dy,
+        'ok': max_dx <= tolerance and max_dy <= tolerance,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chạy game không cửa sổ và đo tick/giây")
+    parser.add_argument("--char", default="bluewizard", help="id nhân vật (thư mục trong assets/characters)")
+    parser.add_argument("--ticks", type=int, default=SIM_TICK_RATE * 60, help="số tick mô phỏng")
+    stage_count = len(build_stages())
+    parser.add_argument("--stage", type=int, default=1, choices=range(1, stage_count + 1),
+                        metavar=f"1..{stage_count}", help="stage bắt đầu")
+    parser.add_argument("--seed", type=int, default=None, help="seed cho random (spawn enemy)")
+    parser.add_argument("--record", default=None, help="ghi input ra file replay (xem game/replay.py)")
+    parser.add_argument("--tick-rate", type=float, default=SIM_TICK_RATE, help="tick mô phỏng mỗi giây")
+    parser.add_argument("--report-every", type=int, default=0, help="in tiến độ mỗi N tick")
+    parser.add_argument("--json", action="store_true", help="in báo cáo dạng JSON")
+    parser.add_argument("--check-tick-rates", action="store_true",
+                        help="chỉ kiểm tra nhảy / rơi / chạy đi cùng quãng đường ở 60 và 120 tick/s")
+    args = parser.parse_args(argv)
+
+    if args.check_tick_rates:
+        report = check_tick_rates(args.char)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            for rate, samples in report['positions'].items():
+                print(f"[HEADLESS] {float(rate):g} tick/s: (x, độ cao trên nền) = {samples}")
+            print(
+                f"[HEADLESS] tick rate check {'OK' if report['ok'] else 'FAILED'}: "
+                f"lệch tối đa x={report['max_dx']}px y={report['max_dy']}px"
+            )
+        pygame.quit()
+        if not report['ok']:
+            sys.exit(1)
+        return report
+
+    report = run_headless(
+        args.char,
+        args.ticks,
+        start_stage=max(0, args.stage - 1),
+        seed=args.seed,
+        tick_rate=args.tick_rate,
+        report_every=args.report_every,
+        record_path=args.record,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"[HEADLESS] {report['ticks']} ticks ({report['sim_seconds']:.1f}s game) in "
+            f"{report['wall_seconds']:.2f}s: {report['ticks_per_second']:.0f} tick/s "
+            f"(x{report['realtime_factor']:.1f} realtime)"
+        )
+        print(f"[HEADLESS] session: {report['session']}")
+    pygame.quit()
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+HUD vẽ bằng surface cache thay vì render lại mỗi frame.
+
+Trước đây phần HUD trong `run_game_session` gọi `pygame.font.SysFont(...)` nhiều lần
+mỗi frame (enemy info, boss, HP, energy), `font.render` lại FPS / hint / HP / energy
+và render cùng một chữ 4-8 lần để giả viền. HudRenderer:
+
+- cache font theo (tên, size, bold) - dùng chung cho mọi session (`get_font`);
+- bake chữ có viền thành một surface duy nhất (`bake_text`);
+- giữ mỗi widget (theo tên) cùng khoá giá trị lần vẽ trước, chỉ dựng lại khi
+  giá trị đổi (dirty flag) - còn lại mỗi frame chỉ là vài lần blit.
+"""
+import pygame
+
+DEFAULT_FONT = "Arial"
+
+# Độ lệch các lần vẽ viền quanh chữ
+OUTLINE_4 = ((-1, 0), (1, 0), (0, -1), (0, 1))
+OUTLINE_4_WIDE = ((-2, 0), (2, 0), (0, -2), (0, 2))
+OUTLINE_8 = ((-2, 0), (2, 0), (0, -2), (0, 2), (-1, -1), (1, 1), (-1, 1), (1, -1))
+
+_fonts = {}
+
+
+def get_font(size, bold=False, name=DEFAULT_FONT):
+    """SysFont dùng chung, tạo một lần cho mỗi (tên, size, bold)."""
+    key = (name, int(size), bool(bold))
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, int(size), bold=bold)
+    return font
+
+
+def bake_text(font, text, color, outline=None, offsets=OUTLINE_4):
+    """
+    Render `text` (kèm viền màu `outline` nếu có) thành một surface.
+
+    Trả về (surface, pad): chữ chính nằm tại (pad, pad) trong surface, nên vẽ
+    ở toạ độ của chữ trừ đi pad.
+    """
+    surf = font.render(text, True, color)
+    if outline is None or not offsets:
+        return surf, 0
+    pad = max(max(abs(dx), abs(dy)) for dx, dy in offsets)
+    w, h = surf.get_size()
+    baked = pygame.Surface((w + pad * 2, h + pad * 2), pygame.SRCALPHA)
+    edge = font.render(text, True, outline)
+    for dx, dy in offsets:
+        baked.blit(edge, (pad + dx, pad + dy))
+    baked.blit(surf, (pad, pad))
+    return baked, pad
+
+
+class HudRenderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self._widgets = {}  # tên widget -> (khoá giá trị, surface, pad)
+        self._overlays = {}  # (size, màu, alpha) -> surface phủ màn hình
+        self.rebuilds = 0
+
+    def widget(self, name, key, build):
+        """
+        Surface của widget `name`; chỉ gọi `build()` khi `key` khác lần trước.
+
+        `build()` trả về surface hoặc (surface, pad). Trả về (surface, pad).
+        """
+        cached = self._widgets.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+        result = build()
+        surf, pad = result if isinstance(result, tuple) else (result, 0)
+        self._widgets[name] = (key, surf, pad)
+        self.rebuilds += 1
+        return surf, pad
+
+    def text(self, name, text, size, color, pos=None, center=None, bold=False,
+             outline=None, offsets=OUTLINE_4):
+        """Vẽ chữ (có viền nếu `outline`) tại `pos` (góc trên trái) hoặc `center`; trả về rect của chữ."""
+        key = (text, size, bold, color, outline, offsets)
+        surf, pad = self.widget(
+            name, key, lambda: bake_text(get_font(size, bold), text, color, outline, offsets)
+        )
+        rect = pygame.Rect(0, 0, surf.get_width() - pad * 2, surf.get_height() - pad * 2)
+        if center is not None:
+            rect.center = center
+        else:
+            rect.topleft = pos or (0, 0)
+        self.screen.blit(surf, (rect.x - pad, rect.y - pad))
+        return rect
+
+    def bar(self, name, x, y, w, h, pct, fill_color, bg_color, label, label_size, padding=4):
+        """Thanh (HP/energy) có nền đen, viền trắng và chữ ở giữa; chỉ vẽ lại khi độ dài/nhãn đổi."""
+        fill_w = int(w * max(0.0, min(1.0, pct)))
+
+        def build():
+            surf = pygame.Surface((w + padding * 2, h + padding * 2))
+            surf.fill((0, 0, 0))
+            inner = pygame.Rect(padding, padding, w, h)
+            pygame.draw.rect(surf, bg_color, inner)
+            if fill_w > 0:
+                pygame.draw.rect(surf, fill_color, (padding, padding, fill_w, h))
+            pygame.draw.rect(surf, (255, 255, 255), inner, 2)
+            # Chữ trắng vẽ lệch 1px bốn phía cho đậm (như HUD cũ)
+            text, _ = bake_text(get_font(label_size), label, (255, 255, 255), (255, 255, 255))
+            surf.blit(text, text.get_rect(center=inner.center))
+            return surf
+
+        key = (w, h, fill_w, fill_color, bg_color, label, label_size)
+        surf, _ = self.widget(name, key, build)
+        self.screen.blit(surf, (x - padding, y - padding))
+
+    def overlay(self, color, alpha):
+        """Phủ màu trong suốt lên toàn màn hình (surface tạo một lần)."""
+        size = self.screen.get_size()
+        key = (size, color, alpha)
+        surf = self._overlays.get(key)
+        if surf is None:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            surf.fill((*color, alpha))
+            self._overlays[key] = surf
+        self.screen.blit(surf, (0, 0))
+
+    def stats(self):
+        return {
+            'widgets': len(self._widgets),
+            'fonts': len(_fonts),
+            'rebuilds': self.rebuilds,
+        }
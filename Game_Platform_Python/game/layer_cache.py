@@ -0,0 +1,177 @@
+"""
+Cache pre-render cho các tile layer tĩnh (ví dụ layer "nen").
+
+Thay vì blit từng tile 512px mỗi frame, layer được "nướng" (bake) thành các
+chunk surface kích thước cố định. Khi vẽ chỉ cần blit vài chunk giao với camera.
+
+Hai chế độ:
+- eager=True: bake toàn bộ chunk có tile ngay khi load (tốn RAM, không giật khi chơi)
+- eager=False (mặc định): bake lười khi chunk lần đầu xuất hiện trong camera,
+  giữ tối đa `max_chunks` chunk theo LRU và loại bỏ chunk ít dùng nhất.
+
+Với zoom != 1.0 (chế độ prescaled của RenderTargets), mỗi chunk được scale sẵn
+theo zoom khi bake và vẽ thẳng ở độ phân giải màn hình.
+"""
+from collections import OrderedDict
+
+import pygame
+import pytmx
+
+from game.map_bake import BakedTileLayer
+from game.config import LAYER_CACHE_CHUNK_SIZE, LAYER_CACHE_MAX_CHUNKS, LAYER_CACHE_EAGER
+
+
+class LayerCache:
+    def __init__(self, tmx_data, layer_name="nen",
+                 chunk_size=LAYER_CACHE_CHUNK_SIZE,
+                 max_chunks=LAYER_CACHE_MAX_CHUNKS,
+                 eager=LAYER_CACHE_EAGER,
+                 zoom=1.0):
+        self.layer_name = layer_name
+        self.zoom = float(zoom)
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_chunks = max(1, int(max_chunks))
+        self.eager = bool(eager)
+
+        # (cx, cy) -> [(tile_surface, local_x, local_y), ...] cho mọi chunk có tile
+        self._chunk_tiles = {}
+        # (cx, cy) -> surface đã bake, theo thứ tự LRU (cuối = mới dùng nhất)
+        self._chunks = OrderedDict()
+
+        # Bộ đếm để tinh chỉnh chunk_size theo RAM
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_used = 0
+
+        self._index_layer(tmx_data)
+
+        if self.eager:
+            # Không giới hạn LRU khi bake trước toàn bộ
+            self.max_chunks = max(self.max_chunks, len(self._chunk_tiles))
+            for key in self._chunk_tiles:
+                self._bake(key)
+
+        print(f"[LAYER_CACHE] '{layer_name}': {len(self._chunk_tiles)} chunks "
+              f"({self.chunk_size}px, {'eager' if self.eager else 'lazy'}, max {self.max_chunks})")
+
+    def _index_layer(self, tmx_data):
+        """Ghi lại tile nào rơi vào chunk nào (một tile lớn có thể trải qua nhiều chunk)."""
+        layer = None
+        for candidate in tmx_data.layers:
+            if isinstance(candidate, (pytmx.TiledTileLayer, BakedTileLayer)) and (
+                (getattr(candidate, 'name', '') or '') == self.layer_name
+            ):
+                layer = candidate
+                break
+        if layer is None:
+            print(f"[LAYER_CACHE] Layer '{self.layer_name}' not found")
+            return
+
+        tw, th = tmx_data.tilewidth, tmx_data.tileheight
+        size = self.chunk_size
+        images = {}  # gid -> surface (mỗi gid chỉ lấy ảnh một lần)
+        for x, y, gid in layer:
+            if not gid:
+                continue
+            img = images.get(gid)
+            if img is None:
+                img = tmx_data.get_tile_image_by_gid(gid)
+                if not img:
+                    continue
+                images[gid] = img
+            wx = x * tw
+            wy = y * th
+            iw, ih = img.get_width(), img.get_height()
+            for cy in range(wy // size, (wy + ih - 1) // size + 1):
+                for cx in range(wx // size, (wx + iw - 1) // size + 1):
+                    self._chunk_tiles.setdefault((cx, cy), []).append(
+                        (img, wx - cx * size, wy - cy * size)
+                    )
+
+    def _bake(self, key):
+        """Vẽ mọi tile của chunk vào một surface riêng và đưa vào cache."""
+        chunk = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA)
+        for img, lx, ly in self._chunk_tiles[key]:
+            chunk.blit(img, (lx, ly))
+        try:
+            chunk = chunk.convert_alpha()
+        except Exception:
+            pass
+        if self.zoom != 1.0:
+            # Biên chunk làm tròn theo toạ độ tuyệt đối để các chunk liền khít nhau
+            cx, cy = key
+            w = self._scaled(cx + 1) - self._scaled(cx)
+            h = self._scaled(cy + 1) - self._scaled(cy)
+            chunk = pygame.transform.smoothscale(chunk, (max(1, w), max(1, h)))
+        # RLE: bỏ qua nhanh các vùng trong suốt của chunk khi blit (lossless)
+        chunk.set_alpha(255, pygame.RLEACCEL)
+
+        self._chunks[key] = chunk
+        self.bytes_used += chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+
+        while len(self._chunks) > self.max_chunks:
+            _, old = self._chunks.popitem(last=False)
+            self.bytes_used -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+        return chunk
+
+    def _scaled(self, c):
+        """Toạ độ (đã zoom) của biên chunk thứ c."""
+        return int(round(c * self.chunk_size * self.zoom))
+
+    def get_chunk(self, cx, cy):
+        """Trả về surface của chunk (bake nếu chưa có), hoặc None nếu chunk trống."""
+        key = (cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            self.hits += 1
+            return chunk
+        if key not in self._chunk_tiles:
+            return None
+        self.misses += 1
+        return self._bake(key)
+
+    def draw(self, surface, camera_x, camera_y, view_w, view_h):
+        """Blit các chunk giao với vùng camera (toạ độ world). Trả về số lần blit."""
+        size = self.chunk_size
+        zoomed = self.zoom != 1.0
+        if zoomed:
+            origin_x = int(round(camera_x * self.zoom))
+            origin_y = int(round(camera_y * self.zoom))
+        cx0 = int(camera_x) // size
+        cy0 = int(camera_y) // size
+        cx1 = (int(camera_x) + int(view_w) - 1) // size
+        cy1 = (int(camera_y) + int(view_h) - 1) // size
+        blits = 0
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                chunk = self.get_chunk(cx, cy)
+                if chunk is None:
+                    continue
+                if zoomed:
+                    surface.blit(chunk, (self._scaled(cx) - origin_x, self._scaled(cy) - origin_y))
+                else:
+                    surface.blit(chunk, (cx * size - camera_x, cy * size - camera_y))
+                blits += 1
+        return blits
+
+    def stats(self):
+        """Các bộ đếm hit/miss/RAM để tinh chỉnh chunk_size."""
+        lookups = self.hits + self.misses
+        return {
+            'chunk_size': self.chunk_size,
+            'chunks_total': len(self._chunk_tiles),
+            'chunks_cached': len(self._chunks),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'memory_mb': self.bytes_used / (1024 * 1024),
+        }
+
+    def clear(self):
+        """Giải phóng mọi chunk đã bake (giữ nguyên chỉ mục tile)."""
+        self._chunks.clear()
+        self.bytes_used = 0
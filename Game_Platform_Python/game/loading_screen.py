@@ -0,0 +1,107 @@
+"""
+Màn hình loading với thanh tiến độ.
+
+Trước đây giữa character select và frame đầu tiên là một cửa sổ đứng hình trong
+lúc load map và preload enemy. `load_session_assets()` load map + sprite của
+character đã chọn và stage đầu, vẽ tiến độ theo số byte ghi trong AssetManifest
+(không phải số bước), nên thanh chạy đúng với lượng dữ liệu thật.
+"""
+import time
+
+import pygame
+
+from game.menu import load_font
+from game.asset_manifest import get_manifest, character_bundle, map_bundle
+from game.asset_streamer import AssetStreamer, PRIORITY_NOW
+
+BAR_WIDTH_RATIO = 0.6
+BAR_HEIGHT = 24
+REDRAW_INTERVAL = 1 / 30.0  # giây, tránh flip màn hình quá dày khi chờ worker
+
+
+class LoadingScreen:
+    def __init__(self, screen):
+        self.screen = screen
+        self.w, self.h = screen.get_width(), screen.get_height()
+        self.title_font = load_font("SVN-Determination.ttf", 56)
+        self.label_font = load_font("SVN-Determination.ttf", 28)
+        self.title = self.title_font.render("LOADING", True, (255, 230, 150))
+        self.title_rect = self.title.get_rect(center=(self.w // 2, self.h // 2 - 80))
+        bar_w = int(self.w * BAR_WIDTH_RATIO)
+        self.bar_rect = pygame.Rect((self.w - bar_w) // 2, self.h // 2, bar_w, BAR_HEIGHT)
+        self._last_draw = 0.0
+
+    def draw(self, progress, label="", force=False):
+        """Vẽ tiến độ (0..1). Bỏ qua nếu vừa vẽ (trừ khi force)."""
+        now = time.perf_counter()
+        if not force and now - self._last_draw < REDRAW_INTERVAL:
+            return
+        self._last_draw = now
+        # Giữ cửa sổ phản hồi (không bị OS báo "not responding")
+        pygame.event.pump()
+
+        progress = max(0.0, min(1.0, progress))
+        self.screen.fill((10, 30, 40))
+        self.screen.blit(self.title, self.title_rect)
+        pygame.draw.rect(self.screen, (40, 60, 70), self.bar_rect, border_radius=6)
+        if progress > 0:
+            fill = self.bar_rect.copy()
+            fill.width = max(1, int(self.bar_rect.width * progress))
+            pygame.draw.rect(self.screen, (255, 200, 90), fill, border_radius=6)
+        pygame.draw.rect(self.screen, (255, 230, 150), self.bar_rect, 2, border_radius=6)
+
+        text = f"{label}  {int(progress * 100)}%" if label else f"{int(progress * 100)}%"
+        label_surf = self.label_font.render(text, True, (220, 220, 220))
+        self.screen.blit(label_surf, label_surf.get_rect(center=(self.w // 2, self.bar_rect.bottom + 30)))
+        pygame.display.flip()
+
+
+def load_session_assets(screen, selected_char, stages, world=None, world_factory=None):
+    """
+    Load những gì session đầu cần trước khi vào game, kèm loading screen.
+
+    Gồm map (nếu `world` chưa có), sprite của `selected_char` và enemy + boss của
+    stage đầu trong `stages`. Các stage sau vẫn stream nền trong lúc chơi.
+    Trả về `world` (tạo bằng `world_factory()` nếu chưa có).
+    """
+    manifest = get_manifest()
+    streamer = AssetStreamer()
+    loading = LoadingScreen(screen)
+
+    first_stage = stages[0] if stages else {}
+    char_ids = [selected_char] + list(first_stage.get("enemy_types", []))
+    if first_stage.get("boss"):
+        char_ids.append(first_stage["boss"])
+    char_ids = list(dict.fromkeys(char_ids))
+
+    weights = {char_id: manifest.bytes_for([character_bundle(char_id)]) for char_id in char_ids}
+    map_bytes = 0
+    if world is None and world_factory is not None:
+        from game.world_assets import DEFAULT_MAP_PATH
+
+        map_bytes = manifest.bytes_for([map_bundle(DEFAULT_MAP_PATH)])
+    total = (sum(weights.values()) + map_bytes) or 1
+    print(
+        f"[LOADING] {total / (1024 * 1024):.1f}MB needed of "
+        f"{manifest.total_bytes('character') / (1024 * 1024):.1f}MB character frames"
+    )
+
+    # Worker decode sprite trong lúc main thread load map
+    tasks = [streamer.request_character(char_id, PRIORITY_NOW) for char_id in char_ids]
+
+    def progress(done_bytes):
+        for task in tasks:
+            done_bytes += weights.get(task.name, 0) * task.progress
+        return done_bytes / total
+
+    if world is None and world_factory is not None:
+        loading.draw(progress(0), "Loading map", force=True)
+        world = world_factory()
+    done = map_bytes
+
+    while not all(task.done for task in tasks):
+        streamer.pump(budget_ms=None)
+        loading.draw(progress(done), "Loading characters")
+        time.sleep(0.005)
+    loading.draw(1.0, "Ready", force=True)
+    return world
@@ -0,0 +1,482 @@
+"""
+Định dạng map "nướng sẵn" (baked) dạng nhị phân, đọc nhanh không cần pytmx.
+
+`load_map` trước đây parse XML TMX (~400KB) bằng pytmx mỗi lần vào game, kể cả
+khi "play_again". Bước bake (chạy offline hoặc tự động lần đầu) ghi ra một file
+gồm:
+
+    header  : magic (8 byte) + version (u32) + độ dài meta (u32)
+    meta    : JSON - kích thước map, nguồn TMX/TSX (mtime, size, sha1),
+              bảng atlas gid -> (ảnh nguồn, rect, flip), animation, object records
+    blob    : (căn 4 byte) mảng gid uint32 của từng tile layer và
+              rect va chạm int32 (gid, x, y, w, h) đã tính sẵn theo inset
+
+Loader mmap file, chỉ json.loads phần meta và đọc các mảng qua memoryview.
+File bị coi là cũ khi TMX/TSX đổi (mtime + size, nếu khác thì so sha1).
+
+Bake thủ công:
+    python -m game.map_bake assets/maps/Map_test.tmx
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from types import SimpleNamespace
+from xml.etree import ElementTree
+
+import pygame
+
+from game.config import (
+    MAP_BAKE_DIR,
+    HITBOX_INSET,
+    HITBOX_TOP_INSET,
+    HITBOX_BOTTOM_INSET,
+    HITBOX_LEFT_INSET,
+    HITBOX_RIGHT_INSET,
+)
+
+MAGIC = b"GPMAP\0\0\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Giống pytmx.AnimationFrame để code dùng `frame.gid`/`frame.duration` chạy như cũ
+AnimationFrame = namedtuple("AnimationFrame", "gid duration")
+
+
+def effective_insets(hitbox_inset=0, top_inset=0, bottom_inset=0, left_inset=0, right_inset=0):
+    """(left, top, right, bottom): inset theo từng cạnh, khác 0 thì ghi đè `hitbox_inset`."""
+    return (
+        int(left_inset or hitbox_inset),
+        int(top_inset or hitbox_inset),
+        int(right_inset or hitbox_inset),
+        int(bottom_inset or hitbox_inset),
+    )
+
+
+def tile_rect(x, y, tw, th, insets):
+    """Rect va chạm (x, y, w, h) của tile ở ô (x, y) sau khi trừ inset, tối thiểu 1x1."""
+    left, top, right, bottom = insets
+    return (
+        x * tw + left,
+        y * th + top,
+        max(1, tw - left - right),
+        max(1, th - top - bottom),
+    )
+
+
+def baked_path_for(tmx_path, bake_dir=MAP_BAKE_DIR):
+    stem = os.path.splitext(os.path.basename(tmx_path))[0]
+    return os.path.join(bake_dir, stem + ".gpmap")
+
+
+# ===============================
+# Theo dõi nguồn (TMX + TSX)
+# ===============================
+def _sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_record(path, base_dir):
+    st = os.stat(path)
+    return {
+        "path": os.path.relpath(path, base_dir),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": _sha1(path),
+    }
+
+
+def _external_tilesets(tmx_path):
+    """Đường dẫn các file TSX mà TMX tham chiếu (`<tileset source=...>`)."""
+    base = os.path.dirname(tmx_path)
+    root = ElementTree.parse(tmx_path).getroot()
+    return [
+        os.path.normpath(os.path.join(base, ts.get("source")))
+        for ts in root.iter("tileset")
+        if ts.get("source")
+    ]
+
+
+def _sources_fresh(sources, base_dir):
+    for src in sources:
+        path = os.path.join(base_dir, src["path"])
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_mtime_ns == src["mtime_ns"] and st.st_size == src["size"]:
+            continue
+        # mtime đổi (vd. git checkout) nhưng nội dung có thể vẫn y nguyên
+        if st.st_size != src["size"] or _sha1(path) != src["sha1"]:
+            return False
+    return True
+
+
+# ===============================
+# Bake (cần pytmx, không cần display)
+# ===============================
+def _atlas_entry(images, gid, source_index, base_dir):
+    """(index nguồn, x, y, w, h, flip_h, flip_v, flip_d) từ ảnh 'tham chiếu' của pytmx."""
+    entry = images[gid] if gid < len(images) else None
+    if not entry:
+        return None
+    path, rect, flags = entry
+    rel = os.path.relpath(path, base_dir)
+    index = source_index.setdefault(rel, len(source_index))
+    x = y = w = h = -1
+    if rect:
+        x, y, w, h = (int(v) for v in rect)
+    fh = fv = fd = 0
+    if flags:
+        fh, fv, fd = int(flags[0]), int(flags[1]), int(flags[2])
+    return [index, x, y, w, h, fh, fv, fd]
+
+
+def bake_map(tmx_path, out_path=None, insets=None):
+    """Parse TMX bằng pytmx (không load ảnh) và ghi file baked. Trả về đường dẫn file."""
+    import pytmx
+
+    tmx_path = os.path.abspath(tmx_path)
+    out_path = out_path or baked_path_for(tmx_path)
+    if insets is None:
+        insets = effective_insets(HITBOX_INSET, HITBOX_TOP_INSET, HITBOX_BOTTOM_INSET,
+                                  HITBOX_LEFT_INSET, HITBOX_RIGHT_INSET)
+    base_dir = os.path.dirname(tmx_path)
+
+    # Không truyền image_loader: pytmx trả về (file ảnh, rect, flags) thay vì Surface
+    tmx = pytmx.TiledMap(tmx_path)
+    tw, th = int(tmx.tilewidth), int(tmx.tileheight)
+
+    source_index = {}
+    atlas = {}
+    animations = {}
+
+    def register(gid):
+        if not gid or str(gid) in atlas:
+            return
+        entry = _atlas_entry(tmx.images, gid, source_index, base_dir)
+        if entry is None:
+            return
+        atlas[str(gid)] = entry
+        props = tmx.get_tile_properties_by_gid(gid) or {}
+        frames = props.get("frames")
+        if frames:
+            animations[str(gid)] = [[int(f.gid), int(f.duration)] for f in frames]
+            for f in frames:
+                register(int(f.gid))
+
+    blob = bytearray()
+    layers = []
+    rects = array("i")
+    for layer in tmx.layers:
+        name = getattr(layer, "name", "") or ""
+        if isinstance(layer, pytmx.TiledTileLayer):
+            gids = array("I")
+            for row in layer.data:
+                gids.extend(int(g) for g in row)
+            for i, gid in enumerate(gids):
+                if not gid:
+                    continue
+                register(gid)
+                if str(gid) not in atlas:
+                    continue
+                x, y = i % layer.width, i // layer.width
+                rects.append(gid)
+                rects.extend(tile_rect(x, y, tw, th, insets))
+            layers.append({
+                "kind": "tiles",
+                "name": name,
+                "width": int(layer.width),
+                "height": int(layer.height),
+                "offset": len(blob),
+                "count": len(gids),
+            })
+            blob.extend(_le_bytes(gids))
+        elif isinstance(layer, pytmx.TiledObjectGroup):
+            records = []
+            for obj in layer:
+                gid = getattr(obj, "gid", None) or 0
+                register(gid)
+                records.append({
+                    "id": getattr(obj, "id", None),
+                    "name": getattr(obj, "name", None),
+                    "type": getattr(obj, "type", None),
+                    "x": getattr(obj, "x", 0),
+                    "y": getattr(obj, "y", 0),
+                    "width": getattr(obj, "width", 0),
+                    "height": getattr(obj, "height", 0),
+                    "properties": dict(getattr(obj, "properties", {}) or {}),
+                    "gid": gid or None,
+                })
+            layers.append({"kind": "objects", "name": name, "objects": records})
+
+    rects_offset = len(blob)
+    blob.extend(_le_bytes(rects))
+
+    sources = [_source_record(tmx_path, base_dir)]
+    sources += [_source_record(p, base_dir) for p in _external_tilesets(tmx_path)]
+
+    meta = {
+        "width": int(tmx.width),
+        "height": int(tmx.height),
+        "tilewidth": tw,
+        "tileheight": th,
+        "sources": sources,
+        "images": [rel for rel, _ in sorted(source_index.items(), key=lambda kv: kv[1])],
+        "atlas": atlas,
+        "animations": animations,
+        "layers": layers,
+        "rects": {"offset": rects_offset, "count": len(rects) // 5, "insets": list(insets)},
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":"), default=str).encode("utf-8")
+    pad = (-(_HEADER.size + len(meta_bytes))) % 4
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(b"\0" * pad)
+        f.write(blob)
+    os.replace(tmp_path, out_path)
+    print(f"[MAP_BAKE] {os.path.basename(tmx_path)} -> {out_path} "
+          f"({len(atlas)} gids, {len(rects) // 5} rects)")
+    return out_path
+
+
+def _le_bytes(arr):
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+# ===============================
+# Load (mmap, không cần pytmx)
+# ===============================
+class BakedTileLayer:
+    """Tile layer đọc từ file baked; lặp ra (x, y, gid) như pytmx (bỏ qua ô trống)."""
+
+    def __init__(self, name, width, height, gids):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.gids = gids  # memoryview uint32, row-major
+
+    def __iter__(self):
+        width = self.width
+        for i, gid in enumerate(self.gids):
+            if gid:
+                yield i % width, i // width, gid
+
+
+class BakedObjectGroup:
+    """Object layer đọc từ file baked; mỗi object có thuộc tính như TiledObject."""
+
+    def __init__(self, name, objects):
+        self.name = name
+        self.objects = objects
+
+    def __iter__(self):
+        for record in self.objects:
+            yield SimpleNamespace(**record)
+
+
+class BakedMap:
+    """
+    Thay cho `tmx_data` của pytmx ở runtime: width/height/tilewidth/tileheight,
+    `layers` và `get_tile_image_by_gid` (ảnh load lười theo bảng atlas).
+    """
+
+    def __init__(self, path, tmx_dir):
+        self.path = path
+        self.tmx_dir = tmx_dir
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a baked map (v{VERSION}): {path}")
+        meta_end = _HEADER.size + meta_len
+        self.meta = json.loads(bytes(self._mm[_HEADER.size:meta_end]).decode("utf-8"))
+        self._blob_start = meta_end + (-meta_end) % 4
+
+        meta = self.meta
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.tilewidth = meta["tilewidth"]
+        self.tileheight = meta["tileheight"]
+        self._atlas = meta["atlas"]
+        self._animations = meta["animations"]
+
+        self.layers = []
+        for info in meta["layers"]:
+            if info["kind"] == "tiles":
+                gids = self._view(info["offset"], info["count"], "I")
+                self.layers.append(BakedTileLayer(info["name"], info["width"], info["height"], gids))
+            else:
+                self.layers.append(BakedObjectGroup(info["name"], info["objects"]))
+
+        self._sources = {}  # index -> surface ảnh nguồn đã convert
+        self._images = {}  # gid -> surface tile (đã cắt + flip)
+        self._source_sizes = {}  # index -> (w, h) đọc từ header PNG, None nếu không đọc được
+
+    def _view(self, offset, count, typecode):
+        start = self._blob_start + offset
+        raw = memoryview(self._mm)[start:start + count * 4]
+        if sys.byteorder == "little":
+            return raw.cast(typecode)
+        values = array(typecode, raw.tobytes())
+        values.byteswap()
+        return values
+
+    def is_fresh(self):
+        return _sources_fresh(self.meta["sources"], self.tmx_dir)
+
+    def platform_rects(self, insets):
+        """Duyệt (gid, x, y, w, h) va chạm; dùng rect bake sẵn nếu cùng inset."""
+        info = self.meta["rects"]
+        data = self._view(info["offset"], info["count"] * 5, "i")
+        if tuple(info["insets"]) == tuple(insets):
+            for i in range(0, len(data), 5):
+                yield data[i], data[i + 1], data[i + 2], data[i + 3], data[i + 4]
+            return
+        tw, th = self.tilewidth, self.tileheight
+        for i in range(0, len(data), 5):
+            gid = data[i]
+            # Suy lại ô tile từ rect đã bake
+            cx = (data[i + 1] - info["insets"][0]) // tw
+            cy = (data[i + 2] - info["insets"][1]) // th
+            yield (gid,) + tile_rect(cx, cy, tw, th, insets)
+
+    def _source_image(self, index, keep=True):
+        surf = self._sources.get(index)
+        if surf is None:
+            path = os.path.join(self.tmx_dir, self.meta["images"][index])
+            surf = pygame.image.load(path)
+            try:
+                surf = surf.convert_alpha()
+            except Exception:
+                pass
+            if keep:
+                self._sources[index] = surf
+        return surf
+
+    def _source_size(self, index):
+        if index not in self._source_sizes:
+            self._source_sizes[index] = _png_size(os.path.join(self.tmx_dir, self.meta["images"][index]))
+        return self._source_sizes[index]
+
+    def load_tile_image(self, gid, keep_source=True):
+        """
+        Cắt ảnh tile theo gid (áp flip như pytmx) mà không cache tile; None nếu không có.
+
+        `keep_source=False`: không giữ ảnh nguồn sau khi cắt (decor chỉ cần một lần để scale).
+        """
+        entry = self._atlas.get(str(gid))
+        if entry is None:
+            return None
+        index, x, y, w, h, fh, fv, fd = entry
+        try:
+            # Ảnh nguyên file: chính nó là tile, giữ nguồn chỉ để cắt tile khác là thừa
+            image = self._source_image(index, keep_source and w > 0 and h > 0)
+        except Exception:
+            return None
+        if w > 0 and h > 0:
+            image = image.subsurface(pygame.Rect(x, y, w, h)).copy()
+        if fd:
+            image = pygame.transform.flip(pygame.transform.rotate(image, 270), True, False)
+        if fh or fv:
+            image = pygame.transform.flip(image, bool(fh), bool(fv))
+        return image
+
+    def get_tile_image_by_gid(self, gid):
+        """Ảnh tile theo gid (cắt từ tileset, áp flip như pytmx), None nếu không có."""
+        image = self._images.get(gid)
+        if image is None:
+            image = self.load_tile_image(gid)
+            if image is not None:
+                self._images[gid] = image
+        return image
+
+    def get_tile_size_by_gid(self, gid):
+        """(w, h) của ảnh tile theo gid mà không decode ảnh (ảnh nguyên file: đọc header PNG)."""
+        image = self._images.get(gid)
+        if image is not None:
+            return image.get_size()
+        entry = self._atlas.get(str(gid))
+        if entry is None:
+            return None
+        index, x, y, w, h, fh, fv, fd = entry
+        if w <= 0 or h <= 0:
+            size = self._source_size(index)
+            if size is None:
+                image = self.get_tile_image_by_gid(gid)
+                return image.get_size() if image else None
+            w, h = size
+        # Xoay 270 độ (flip chéo) đổi chiều rộng / cao
+        return (h, w) if fd else (w, h)
+
+    def release_images(self, gids=None):
+        """Bỏ ảnh đã decode của các gid (và ảnh nguồn của chúng); cần lại thì load lại. None = tất cả."""
+        if gids is None:
+            self._images.clear()
+            self._sources.clear()
+            return
+        for gid in gids:
+            self._images.pop(gid, None)
+            entry = self._atlas.get(str(gid))
+            if entry is not None:
+                self._sources.pop(entry[0], None)
+
+    def get_tile_properties_by_gid(self, gid):
+        frames = self._animations.get(str(gid))
+        if not frames:
+            return None
+        return {"frames": [AnimationFrame(g, d) for g, d in frames]}
+
+
+def _png_size(path):
+    """(w, h) từ chunk IHDR của file PNG, None nếu không phải PNG / không đọc được."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(24)
+    except OSError:
+        return None
+    if len(head) < 24 or head[:8] != _PNG_SIGNATURE or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def load_baked_map(tmx_path, baked_path=None, check_sources=True):
+    """BakedMap cho `tmx_path`, hoặc None nếu chưa bake / file cũ / hỏng."""
+    tmx_path = os.path.abspath(tmx_path)
+    baked_path = baked_path or baked_path_for(tmx_path)
+    if not os.path.exists(baked_path):
+        return None
+    try:
+        baked = BakedMap(baked_path, os.path.dirname(tmx_path))
+    except Exception as e:
+        print(f"[MAP_BAKE] Bỏ qua file baked lỗi {baked_path}: {e}")
+        return None
+    if check_sources and not baked.is_fresh():
+        print(f"[MAP_BAKE] {os.path.basename(baked_path)} cũ hơn TMX/TSX, cần bake lại")
+        return None
+    return baked
+
+
+if __name__ == "__main__":
+    targets = sys.argv[1:] or [
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     "assets", "maps", "Map_test.tmx")
+    ]
+    for target in targets:
+        bake_map(target)
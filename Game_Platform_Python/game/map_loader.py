@@ -1,13 +1,143 @@
+import os
+
 import pytmx
 import pygame
 
+from game.config import MAP_BAKE_ENABLED, MAP_BAKE_AUTO
+from game.map_bake import (
+    BakedTileLayer,
+    BakedObjectGroup,
+    bake_map,
+    effective_insets,
+    load_baked_map,
+)
+
+
+class PlatformGrid:
+    """
+    Chỉ mục lưới đều (uniform grid) cho các platform tĩnh.
+
+    Mỗi ô lưới có kích thước bằng một tile của map, nên một tile platform
+    thường chỉ nằm trong đúng một ô. Mỗi ô lưu chỉ số (index) của platform
+    trong danh sách gốc để kết quả truy vấn giữ nguyên thứ tự ban đầu.
+    """
+
+    def __init__(self, cell_w, cell_h):
+        self.cell_w = max(1, int(cell_w))
+        self.cell_h = max(1, int(cell_h))
+        self.cells = {}  # (cx, cy) -> [index, ...]
+
+    def insert(self, index, rect):
+        """Đăng ký platform `index` vào mọi ô mà rect chạm tới."""
+        cx0 = rect.left // self.cell_w
+        cx1 = (rect.right - 1) // self.cell_w
+        cy0 = rect.top // self.cell_h
+        cy1 = (rect.bottom - 1) // self.cell_h
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self.cells.setdefault((cx, cy), []).append(index)
+
+    def indices_in_rect(self, rect):
+        """Trả về các index (đã sắp xếp, không trùng) trong các ô giao với rect."""
+        cx0 = rect.left // self.cell_w
+        cx1 = (rect.right - 1) // self.cell_w
+        cy0 = rect.top // self.cell_h
+        cy1 = (rect.bottom - 1) // self.cell_h
+        cells = self.cells
+        found = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        if len(found) > 1:
+            found = sorted(set(found))
+        return found
+
+
+class PlatformList(list):
+    """
+    Danh sách (tile_surface, rect) như cũ, kèm thêm `grid` để truy vấn theo vùng.
+
+    Vẫn là list nên mọi đoạn code lặp `for _, rect in platforms` tiếp tục chạy,
+    nhưng các đường va chạm nên dùng `platforms_in_rect()` để chi phí chỉ
+    phụ thuộc vào vùng lân cận thay vì kích thước map.
+    """
+
+    def __init__(self, items=(), cell_w=1, cell_h=1):
+        super().__init__(items)
+        self.grid = PlatformGrid(cell_w, cell_h)
+        for index, (_, rect) in enumerate(self):
+            self.grid.insert(index, rect)
+
+    def platforms_in_rect(self, rect):
+        """Các platform nằm trong những ô lưới giao với `rect` (ứng viên va chạm)."""
+        return [self[i] for i in self.grid.indices_in_rect(rect)]
+
+
+class PlatformView:
+    """
+    Gộp platform tĩnh (có grid) với platform động (moving platforms) mà không copy list.
+
+    Lặp qua view cho ra platform tĩnh rồi đến platform động, giống
+    `list(platforms) + moving` trước đây.
+    """
+
+    def __init__(self, static, dynamic=()):
+        self.static = static
+        self.dynamic = dynamic
+
+    def __iter__(self):
+        yield from self.static
+        yield from self.dynamic
+
+    def __len__(self):
+        return len(self.static) + len(self.dynamic)
+
+    def platforms_in_rect(self, rect):
+        result = platforms_near(self.static, rect)
+        if self.dynamic:
+            result = list(result)
+            result.extend(p for p in self.dynamic if p[1].colliderect(rect))
+        return result
+
+
+def platforms_near(platforms, rect, margin=0):
+    """
+    Lấy các platform lân cận `rect` (mở rộng thêm `margin` pixel mỗi phía).
+
+    Nếu `platforms` có chỉ mục lưới (PlatformList/PlatformView) thì truy vấn lưới,
+    còn list thường thì trả lại nguyên list (hành vi cũ).
+    """
+    query = getattr(platforms, 'platforms_in_rect', None)
+    if query is None:
+        return platforms
+    if margin:
+        rect = rect.inflate(margin * 2, margin * 2)
+    return query(rect)
+
+
+def _load_baked(filename, insets):
+    """BakedMap còn mới cho TMX (tự bake lại nếu MAP_BAKE_AUTO), None nếu không dùng được."""
+    baked = load_baked_map(filename)
+    if baked is not None or not MAP_BAKE_AUTO:
+        return baked
+    try:
+        bake_map(filename, insets=insets)
+    except Exception as e:
+        print(f"[MAP_BAKE] Không bake được {os.path.basename(filename)}: {e}")
+        return None
+    return load_baked_map(filename, check_sources=False)
+
 
 def load_map(filename,
              hitbox_inset: int = 0,
              top_inset: int = 0,
              bottom_inset: int = 0,
              left_inset: int = 0,
-             right_inset: int = 0):
+             right_inset: int = 0,
+             images: bool = True,
+             defer_images: bool = False):
     """
     Tải một bản đồ TMX và trả về danh sách (tile_surface, rect).
 
@@ -18,10 +148,28 @@ def load_map(filename,
     Các inset theo từng cạnh sẽ ghi đè `hitbox_inset` khi được cung cấp (khác 0).
     Kích thước Rect được giới hạn tối thiểu là 1x1.
     
+    `platforms` là một PlatformList: vẫn dùng được như list, nhưng có thêm
+    `platforms_in_rect(rect)` dựa trên lưới theo ô tile để truy vấn va chạm.
+
+    Nếu MAP_BAKE_ENABLED, map được đọc từ file baked (game/map_bake.py) thay vì
+    parse XML; khi đó `tmx_data` là một BakedMap có cùng các thuộc tính được dùng.
+
+    `images=False` (chạy headless): object trang trí không load ảnh (`tile` = None,
+    không có animation_frames); chỉ moving platform và portal vẫn có ảnh vì kích
+    thước rect của chúng lấy từ ảnh.
+
+    `defer_images=True` (chế độ prescaled, xem game/asset_pyramid.py): nếu map là
+    BakedMap, object trang trí và frame animation không decode ảnh gốc (`tile` /
+    `image` = None) mà chỉ có kích thước ảnh (`tile_size` / `size`); ảnh gốc được
+    load khi AssetPyramid cần scale. Map pytmx đã decode sẵn nên bỏ qua tuỳ chọn này.
+
     Returns:
         (platforms, tmx_data, objects, animated_objects, moving_platforms, portals)
     """
-    tmx_data = pytmx.load_pygame(filename)
+    insets = effective_insets(hitbox_inset, top_inset, bottom_inset, left_inset, right_inset)
+    baked = _load_baked(filename, insets) if MAP_BAKE_ENABLED else None
+    tmx_data = baked if baked is not None else pytmx.load_pygame(filename)
+    defer_images = defer_images and hasattr(tmx_data, "get_tile_size_by_gid")
     platforms = []
     objects = []
     animated_objects = []  # Separate list for animated decorations
@@ -32,9 +180,30 @@ def load_map(filename,
     # Keys are gid (int) and values are pygame.Surface already converted for fast blit.
     tile_cache = {}
 
+    # BakedMap: ảnh object decode mà không lưu trong tmx_data (tile_cache đã giữ bản
+    # convert), để mỗi ảnh decor chỉ có một bản trong RAM
+    object_image = getattr(tmx_data, "load_tile_image", tmx_data.get_tile_image_by_gid)
+
+    def converted_tile(gid):
+        """Ảnh object theo gid đã convert (cache theo gid), None nếu không có."""
+        cached = tile_cache.get(gid)
+        if cached is None:
+            raw = object_image(gid)
+            if not raw:
+                return None
+            try:
+                cached = raw.convert_alpha()
+            except Exception:
+                cached = raw.convert()
+            tile_cache[gid] = cached
+        return cached
+
     for layer in tmx_data.layers:
         # Tile layers -> platforms
-        if isinstance(layer, pytmx.TiledTileLayer):
+        if isinstance(layer, (pytmx.TiledTileLayer, BakedTileLayer)):
+            if baked is not None:
+                # Rect va chạm đã bake sẵn, thêm một lượt sau vòng lặp (cùng thứ tự layer)
+                continue
             for x, y, gid in layer:
                 tile = tmx_data.get_tile_image_by_gid(gid)
                 if tile:
@@ -59,10 +228,7 @@ def load_map(filename,
 
                     # Decide effective insets. If per-side values provided (non-zero)
                     # use them; otherwise fall back to legacy `hitbox_inset`.
-                    left = int(left_inset or hitbox_inset)
-                    right = int(right_inset or hitbox_inset)
-                    top = int(top_inset or hitbox_inset)
-                    bottom = int(bottom_inset or hitbox_inset)
+                    left, top, right, bottom = insets
 
                     new_x = screen_x + left
                     new_y = screen_y + top
@@ -72,31 +238,40 @@ def load_map(filename,
                     rect = pygame.Rect(new_x, new_y, new_w, new_h)
                     platforms.append((tile, rect))
         # Object layers -> collect objects
-        elif isinstance(layer, pytmx.TiledObjectGroup):
+        elif isinstance(layer, (pytmx.TiledObjectGroup, BakedObjectGroup)):
             layer_name = getattr(layer, 'name', '') or ''  # Đảm bảo không bao giờ là None
             is_animated_layer = 'animation' in layer_name.lower()
             is_moving_layer = 'moving' in layer_name.lower()  # Kiểm tra layer moving platform
             is_portal_layer = 'portal' in layer_name.lower()  # Kiểm tra layer portal
+            load_images = images or is_moving_layer or is_portal_layer
+            # Chỉ decor (không phải moving platform / portal) được hoãn decode ảnh
+            defer = defer_images and not (is_moving_layer or is_portal_layer)
             
             for obj in layer:
                 # obj may have properties; convert to a dict for convenience
                 gid = getattr(obj, 'gid', None)
                 tile_img = None
+                tile_size = None
                 animation_frames = []
                 
-                if gid:
+                if gid and load_images and defer:
+                    tile_size = tmx_data.get_tile_size_by_gid(gid)
+                    tile_props = tmx_data.get_tile_properties_by_gid(gid)
+                    if tile_props and 'frames' in tile_props:
+                        for frame in tile_props['frames']:
+                            frame_size = tmx_data.get_tile_size_by_gid(frame.gid)
+                            if frame_size:
+                                animation_frames.append({
+                                    'gid': frame.gid,
+                                    'image': None,
+                                    'size': frame_size,
+                                    'duration': frame.duration,
+                                })
+                elif gid and load_images:
                     try:
-                        raw = tmx_data.get_tile_image_by_gid(gid)
-                        if raw:
-                            # Convert and cache tile image for faster blits
-                            cached = tile_cache.get(gid)
-                            if cached is None:
-                                try:
-                                    tile_cache[gid] = raw.convert_alpha()
-                                except Exception:
-                                    tile_cache[gid] = raw.convert()
-                                cached = tile_cache[gid]
-                            tile_img = cached
+                        tile_img = converted_tile(gid)
+                        if tile_img:
+                            tile_size = tile_img.get_size()
 
                         # Check if this tile has animation data
                         tile_props = tmx_data.get_tile_properties_by_gid(gid)
@@ -105,18 +280,12 @@ def load_map(filename,
                             for frame in tile_props['frames']:
                                 frame_gid = frame.gid
                                 frame_duration = frame.duration  # in milliseconds
-                                frame_raw = tmx_data.get_tile_image_by_gid(frame_gid)
-                                if frame_raw:
-                                    # Convert frame image and cache by its gid too
-                                    fcached = tile_cache.get(frame_gid)
-                                    if fcached is None:
-                                        try:
-                                            tile_cache[frame_gid] = frame_raw.convert_alpha()
-                                        except Exception:
-                                            tile_cache[frame_gid] = frame_raw.convert()
-                                        fcached = tile_cache[frame_gid]
+                                fcached = converted_tile(frame_gid)
+                                if fcached:
                                     animation_frames.append({
+                                        'gid': frame_gid,
                                         'image': fcached,
+                                        'size': fcached.get_size(),
                                         'duration': frame_duration
                                     })
                     except Exception:
@@ -133,6 +302,7 @@ def load_map(filename,
                     'properties': obj.properties if hasattr(obj, 'properties') else {},
                     'gid': gid,
                     'tile': tile_img,
+                    'tile_size': tile_size,
                     'animation_frames': animation_frames,
                     'layer_name': layer_name,
                 }
@@ -151,4 +321,43 @@ def load_map(filename,
                     # Static objects
                     objects.append(obj_dict)
 
+    if baked is not None:
+        for gid, x, y, w, h in baked.platform_rects(insets):
+            tile = tile_cache.get(gid)
+            if tile is None:
+                tile = baked.get_tile_image_by_gid(gid)
+                if not tile:
+                    continue
+                try:
+                    tile = tile_cache[gid] = tile.convert_alpha()
+                except Exception:
+                    tile = tile_cache[gid] = tile.convert()
+            platforms.append((tile, pygame.Rect(x, y, w, h)))
+
+    # Xây chỉ mục lưới theo ô tile (map vốn đã là lưới đều)
+    platforms = PlatformList(platforms, tmx_data.tilewidth, tmx_data.tileheight)
+
     return platforms, tmx_data, objects, animated_objects, moving_platforms, portals
+
+
+def release_tile_images(tmx_data, gids):
+    """
+    Bỏ ảnh gốc mà `tmx_data` giữ cho các gid (object đã có bản convert / bản scale riêng).
+
+    BakedMap load lại được khi cần; với pytmx thì ảnh bị xoá hẳn nên gid còn dùng trong
+    tile layer (LayerCache đọc qua `get_tile_image_by_gid`) được giữ lại.
+    """
+    release = getattr(tmx_data, "release_images", None)
+    if release is not None:
+        release(gids)
+        return
+    images = getattr(tmx_data, "images", None)
+    if images is None:
+        return
+    keep = set()
+    for layer in tmx_data.layers:
+        if isinstance(layer, pytmx.TiledTileLayer):
+            keep.update(gid for _, _, gid in layer)
+    for gid in gids:
+        if gid not in keep and 0 < gid < len(images):
+            images[gid] = None
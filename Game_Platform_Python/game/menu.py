@@ -3,6 +3,8 @@ import sys
 import os
 import math
 
+from game.asset_streamer import AssetStreamer
+
 ASSETS_DIR = os.path.join("assets")
 FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")
 SFX_DIR = os.path.join(ASSETS_DIR, "sounds")
@@ -178,6 +180,8 @@ class Menu:
         while running:
             dt_ms = self.clock.tick(60)
             t = pygame.time.get_ticks() / 1000.0
+            # Sprite enemy đang load nền: hoàn tất phần đã decode xong
+            AssetStreamer().pump()
 
             # nền
             if self.background:
@@ -327,6 +331,7 @@ class SettingsMenu:
 
         while running:
             dt_ms = self.clock.tick(60)
+            AssetStreamer().pump()
             mouse_pos = pygame.mouse.get_pos()
             mouse_pressed = pygame.mouse.get_pressed()[0]
 
@@ -1,6 +1,8 @@
 import pygame
 import math
 
+from game.render_targets import mark_drawn
+
 
 class MovingPlatformWrapper:
     """
@@ -108,6 +110,20 @@ class MovingPlatform:
         self.last_x = self.x
         self.last_y = self.y
     
+    def reset(self):
+        """Đưa platform về vị trí gốc và timer về 0 (dùng lại giữa các session)."""
+        self.motion_timer = 0
+        self.animation_timer = 0
+        self.current_frame_index = 0
+        self.x = self.start_x
+        self.y = self.start_y
+        self.rect.x = int(self.x)
+        self.rect.y = int(self.y)
+        self.vel_x = 0
+        self.vel_y = 0
+        self.last_x = self.x
+        self.last_y = self.y
+    
     def update(self, dt):
         """
         Cập nhật vị trí và animation.
@@ -188,8 +204,9 @@ class MovingPlatform:
             camera_x: Camera X position
             camera_y: Camera Y position
         """
-        screen_x = int(self.x - camera_x)
-        screen_y = int(self.y - camera_y)
+        # Dùng rect (= int(x), int(y)) để vị trí vẽ được nội suy giữa các tick, xem game/sim_clock.py
+        screen_x = int(self.rect.x - camera_x)
+        screen_y = int(self.rect.y - camera_y)
         
         if self.animation_frames:
             # Vẽ frame hiện tại
@@ -202,7 +219,7 @@ class MovingPlatform:
         else:
             # Debug: vẽ hình chữ nhật nếu không có image
             debug_rect = pygame.Rect(screen_x, screen_y, self.rect.width, self.rect.height)
-            pygame.draw.rect(surface, (100, 100, 200), debug_rect)
+            mark_drawn(surface, pygame.draw.rect(surface, (100, 100, 200), debug_rect))
     
     def is_visible(self, camera_x, camera_y, camera_width, camera_height):
         """
@@ -235,6 +252,11 @@ class MovingPlatformManager:
             platform = MovingPlatform(obj_data, use_bottom_y, y_offset)
             self.platforms.append(platform)
     
+    def reset(self):
+        """Reset trạng thái chuyển động của tất cả platforms."""
+        for platform in self.platforms:
+            platform.reset()
+    
     def update(self, dt):
         """Cập nhật tất cả platforms."""
         for platform in self.platforms:
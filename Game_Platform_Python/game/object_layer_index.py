@@ -0,0 +1,183 @@
+"""
+Chỉ mục lưới (spatial grid) cho các object layer tĩnh của Tiled.
+
+Xem PERFORMANCE_OPTIMIZATION.md: map được chia thành các ô GRID_SIZE x GRID_SIZE,
+mỗi object (đã tính sẵn rect và vị trí blit khi load) được đăng ký vào mọi ô nó
+chiếm. Mỗi frame chỉ xét các object trong những ô giao với camera (+ margin),
+dùng set để loại trùng những object nằm ở nhiều ô.
+
+Với zoom != 1.0 (chế độ prescaled của RenderTargets), ảnh và vị trí blit được
+scale sẵn theo zoom (qua AssetPyramid nếu có) và index không giữ ảnh gốc; object
+có thể chỉ có `tile_size` (ảnh gốc chưa decode, xem `load_map(defer_images=True)`).
+Việc culling vẫn làm trên toạ độ world.
+"""
+from array import array
+
+import pygame
+
+from game.config import (
+    OBJECT_GRID_SIZE,
+    OBJECT_CULLING_MARGIN,
+    OBJECT_TILE_USE_BOTTOM_Y,
+    OBJECT_TILE_Y_OFFSET,
+)
+
+
+class ObjectLayerIndex:
+    def __init__(self, objects, name="objects",
+                 grid_size=OBJECT_GRID_SIZE,
+                 culling_margin=OBJECT_CULLING_MARGIN,
+                 use_bottom_y=OBJECT_TILE_USE_BOTTOM_Y,
+                 y_offset=OBJECT_TILE_Y_OFFSET,
+                 zoom=1.0,
+                 pyramid=None):
+        self.name = name
+        self.zoom = float(zoom)
+        self.pyramid = pyramid
+        self.grid_size = max(1, int(grid_size))
+        self.culling_margin = int(culling_margin)
+
+        # Mảng gọn (compact arrays) song song theo index object, giữ thứ tự vẽ của Tiled
+        self.tiles = []
+        self.gids = []
+        self.xs = array('i')
+        self.ys = array('i')
+        self.rights = array('i')
+        self.bottoms = array('i')
+        self.cells = {}  # (cx, cy) -> array('i') các index object
+        # Ảnh và vị trí blit đã zoom (chỉ dùng khi zoom != 1.0)
+        self.draw_tiles = self.tiles
+        self.draw_xs = self.xs
+        self.draw_ys = self.ys
+
+        y_offset = int(y_offset)
+        for obj in objects:
+            tile = obj.get("tile")
+            size = tile.get_size() if tile else obj.get("tile_size")
+            if not size:
+                continue
+            tw, th = size
+            ox = int(obj.get("x", 0))
+            oy = int(obj.get("y", 0))
+            # Căn theo cấu hình: nếu y là đáy ảnh thì trừ chiều cao, ngược lại giữ nguyên
+            if use_bottom_y:
+                oy -= th
+            oy += y_offset
+
+            index = len(self.tiles)
+            self.tiles.append(tile)
+            self.gids.append(obj.get("gid"))
+            self.xs.append(ox)
+            self.ys.append(oy)
+            self.rights.append(ox + tw)
+            self.bottoms.append(oy + th)
+
+            size = self.grid_size
+            for cy in range(oy // size, (oy + th - 1) // size + 1):
+                for cx in range(ox // size, (ox + tw - 1) // size + 1):
+                    bucket = self.cells.get((cx, cy))
+                    if bucket is None:
+                        bucket = self.cells[(cx, cy)] = array('i')
+                    bucket.append(index)
+
+        if self.zoom != 1.0:
+            self._prescale()
+
+        # Ứng viên của lần truy vấn trước: camera đứng trong cùng dải ô thì dùng lại
+        self._last_cell_range = None
+        self._last_candidates = []
+
+        print(f"[OPTIMIZATION] Cached {len(self.tiles)} {name} objects in {len(self.cells)} grid cells")
+        if len(self.cells) > 500:
+            print(f"[OPTIMIZATION] {name}: >500 grid cells, cân nhắc tăng OBJECT_GRID_SIZE")
+
+    def _prescale(self):
+        """Scale sẵn ảnh (dùng chung theo gid/surface gốc) và vị trí blit theo zoom."""
+        z = self.zoom
+        pyramid = self.pyramid
+        scaled = {}  # id(surface gốc), hoặc gid nếu chưa decode -> surface đã scale
+        self.draw_tiles = []
+        self.draw_xs = array('i')
+        self.draw_ys = array('i')
+        for i, tile in enumerate(self.tiles):
+            x0 = int(round(self.xs[i] * z))
+            y0 = int(round(self.ys[i] * z))
+            key = id(tile) if tile is not None else self.gids[i]
+            img = scaled.get(key)
+            if img is None and pyramid is not None:
+                size = (self.rights[i] - self.xs[i], self.bottoms[i] - self.ys[i])
+                img = scaled[key] = pyramid.get(self.gids[i], tile, z, size=size)
+            elif img is None:
+                size = (max(1, int(round(tile.get_width() * z))),
+                        max(1, int(round(tile.get_height() * z))))
+                img = scaled[key] = pygame.transform.smoothscale(tile, size)
+            self.draw_tiles.append(img)
+            self.draw_xs.append(x0)
+            self.draw_ys.append(y0)
+        # Chỉ vẽ bản đã scale: không giữ ảnh gốc (decor tới ~4000x4000px)
+        self.tiles = self.draw_tiles
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def rect(self, index):
+        """Rect (toạ độ world) của object `index`."""
+        x, y = self.xs[index], self.ys[index]
+        return pygame.Rect(x, y, self.rights[index] - x, self.bottoms[index] - y)
+
+    def _candidates(self, left, top, right, bottom):
+        """Index (đúng thứ tự vẽ, không trùng) của object trong các ô giao với vùng."""
+        size = self.grid_size
+        m = self.culling_margin
+        cell_range = (
+            (left - m) // size, (top - m) // size,
+            (right + m - 1) // size, (bottom + m - 1) // size,
+        )
+        if cell_range == self._last_cell_range:
+            return self._last_candidates
+
+        cx0, cy0, cx1, cy1 = cell_range
+        seen = set()
+        cells = self.cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    seen.update(bucket)
+        candidates = sorted(seen)
+
+        self._last_cell_range = cell_range
+        self._last_candidates = candidates
+        return candidates
+
+    def visible_indices(self, camera_rect):
+        """Các object thật sự giao với camera_rect."""
+        left, top = camera_rect.left, camera_rect.top
+        right, bottom = camera_rect.right, camera_rect.bottom
+        xs, ys, rights, bottoms = self.xs, self.ys, self.rights, self.bottoms
+        return [
+            i for i in self._candidates(left, top, right, bottom)
+            if rights[i] > left and xs[i] < right and bottoms[i] > top and ys[i] < bottom
+        ]
+
+    def draw(self, surface, camera_x, camera_y, view_w, view_h):
+        """Vẽ các object trong camera (toạ độ world). Trả về số object đã blit."""
+        camera_x = int(camera_x)
+        camera_y = int(camera_y)
+        right = camera_x + int(view_w)
+        bottom = camera_y + int(view_h)
+        xs, ys, rights, bottoms = self.xs, self.ys, self.rights, self.bottoms
+        tiles, dxs, dys = self.draw_tiles, self.draw_xs, self.draw_ys
+        if self.zoom != 1.0:
+            origin_x = int(round(camera_x * self.zoom))
+            origin_y = int(round(camera_y * self.zoom))
+        else:
+            origin_x, origin_y = camera_x, camera_y
+        batch = [
+            (tiles[i], (dxs[i] - origin_x, dys[i] - origin_y))
+            for i in self._candidates(camera_x, camera_y, right, bottom)
+            if rights[i] > camera_x and xs[i] < right and bottoms[i] > camera_y and ys[i] < bottom
+        ]
+        if batch:
+            surface.blits(batch, doreturn=False)
+        return len(batch)
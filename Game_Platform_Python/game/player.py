@@ -1,6 +1,10 @@
 import pygame
 import os
-from game.config import PLAYER_SCALE, GRAVITY, JUMP_POWER, SPEED
+from game.config import PLAYER_SCALE, GRAVITY, JUMP_POWER, SPEED, SIM_DT
+from game.map_loader import platforms_near
+from game.sprite_frames import frame_for, load_scaled_frames
+from game.sim_clock import game_time, tick_scale, fall
+from game.render_targets import mark_drawn
 
 # Cố gắng import SkillBase để hỗ trợ hệ thống skill mới (data-driven).
 try:
@@ -9,6 +13,58 @@ except Exception:
     SkillBase = None
 
 
+def default_skills(owner):
+    """
+    Bộ skill mặc định của Player: dash (legacy dict), charge và cloud.
+
+    Tách riêng để enemy dựng từ CharacterTemplate nhận đúng bộ skill như khi
+    còn tạo cả một Player làm "visual".
+    """
+    skills = {
+        "dash": {
+            "cooldown": 1.0,
+            "last_used": -999.0,
+            "duration": 0.8,
+            "active": False,
+            "speed_multiplier": 2.5,
+        }
+    }
+
+    # Attach a default ChargeSkill instance if available
+    try:
+        from game.characters.skills import ChargeSkill
+
+        # Attach a default ChargeSkill instance if available
+        try:
+            # Prefer the specific purple_skill folder and ensure large scale
+            skills["charge"] = ChargeSkill(
+                frames_path=os.path.join("assets", "skill-effect", "purple_skill"),
+                base_speed=1200,
+                base_damage=30,
+                max_charge=3.0,
+                scale=10.0,
+            )
+        except Exception:
+            # if instantiation fails, skip
+            pass
+
+        # Add cloud skill
+        try:
+            from game.characters.skills import CloudSkill
+
+            cloud_skill = CloudSkill()
+            cloud_skill.set_owner(
+                owner
+            )  # This will set the owner and scale the cloud properly
+            skills["cloud"] = cloud_skill
+        except Exception as e:
+            print(f"Error creating cloud skill: {e}")
+            pass
+    except Exception:
+        pass
+    return skills
+
+
 class Player:
     def __init__(
         self,
@@ -31,6 +87,10 @@ class Player:
 
         self.sound_manager = SoundManager()
 
+        # Nguồn trạng thái phím: None = pygame.key.get_pressed(); headless / replay
+        # gán một callable trả về đối tượng tra được theo mã phím như get_pressed()
+        self.input_source = None
+
         # Track previous key states
         self._prev_key_states = {
             pygame.K_j: False,
@@ -92,15 +152,7 @@ class Player:
         # Skills: có thể là legacy dict (như trước) hoặc các instance SkillBase
         # Nếu factory gắn skill (SkillBase) thì self.skills sẽ chứa các instance
         # Ví dụ dạng legacy: self.skills = {"dash": {"cooldown":..., ...}}
-        self.skills = {
-            "dash": {
-                "cooldown": 1.0,
-                "last_used": -999.0,
-                "duration": 0.8,
-                "active": False,
-                "speed_multiplier": 2.5,
-            }
-        }
+        self.skills = default_skills(self)
 
         # Track jump and dash state for cloud skill
         self.has_jumped = False
@@ -112,83 +164,18 @@ class Player:
         self._is_charging = False
         self._charge_start = 0.0
 
-        # Attach a default ChargeSkill instance if available
-        try:
-            from game.characters.skills import ChargeSkill
-
-            # Attach a default ChargeSkill instance if available
-            try:
-                # Prefer the specific purple_skill folder and ensure large scale
-                self.skills["charge"] = ChargeSkill(
-                    frames_path=os.path.join("assets", "skill-effect", "purple_skill"),
-                    base_speed=1200,
-                    base_damage=30,
-                    max_charge=3.0,
-                    scale=10.0,
-                )
-            except Exception:
-                # if instantiation fails, skip
-                pass
-
-            # Add cloud skill
-            try:
-                from game.characters.skills import CloudSkill
-
-                cloud_skill = CloudSkill()
-                cloud_skill.set_owner(
-                    self
-                )  # This will set the owner and scale the cloud properly
-                self.skills["cloud"] = cloud_skill
-            except Exception as e:
-                print(f"Error creating cloud skill: {e}")
-                pass
-        except Exception:
-            pass
-
     def load_frames(self, folder, size):
-        frames = []
-        # If folder doesn't exist, return empty list
-        if not os.path.isdir(folder):
-            return frames
-        for filename in sorted(os.listdir(folder)):
-            if filename.endswith(".png"):
-                img = pygame.image.load(os.path.join(folder, filename))
-                # Try convert_alpha, fallback to convert if display not set
-                try:
-                    img = img.convert_alpha()
-                except pygame.error:
-                    try:
-                        img = img.convert()
-                    except pygame.error:
-                        pass  # Use original if conversion fails
-
-                # Scale proportionally based on self.scale instead of fixed size
-                original_w, original_h = img.get_size()
-                new_w = int(original_w * self.scale)
-                new_h = int(original_h * self.scale)
-                img = pygame.transform.scale(img, (new_w, new_h))
-                # compute transparent rows at bottom so we can align visible pixels to hitbox
-                h = img.get_height()
-                bottom_trim = 0
-                for y in range(h - 1, -1, -1):
-                    row_has_pixel = False
-                    for x in range(img.get_width()):
-                        if img.get_at((x, y))[3] != 0:
-                            row_has_pixel = True
-                            break
-                    if row_has_pixel:
-                        bottom_trim = h - 1 - y
-                        break
-                frames.append((img, bottom_trim))
-        return frames
-
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
+        # Dùng chung giữa mọi instance cùng thư mục + scale (kèm frame lật sẵn)
+        return load_scaled_frames(folder, self.scale)
+
+    def handle_input(self, dt=SIM_DT):
+        source = getattr(self, "input_source", None)
+        keys = source() if source is not None else pygame.key.get_pressed()
         moving = False
 
         # Check if movement is locked (after teleport)
         if self.teleport_lock > 0:
-            self.teleport_lock -= 1.0 / 60  # Reduce lock timer
+            self.teleport_lock -= dt  # Reduce lock timer (giây của tick mô phỏng)
             if self.teleport_lock <= 0:
                 self.teleport_lock = 0
                 # Reset velocity to ensure clean state
@@ -252,7 +239,7 @@ class Player:
         k_key_just_released = not k_key_pressed and self._prev_key_states[pygame.K_k]
 
         if k_key_pressed:
-            now = pygame.time.get_ticks() / 1000.0
+            now = game_time()
 
             # Try buff skill first (Skeleton)
             buff = self.skills.get("buff")
@@ -304,7 +291,7 @@ class Player:
             and self.has_jumped
             and self.has_dashed
         ):
-            now = pygame.time.get_ticks() / 1000.0
+            now = game_time()
             cloud = self.skills.get("cloud")
             if (
                 SkillBase is not None
@@ -323,7 +310,7 @@ class Player:
         j_key_just_pressed = j_key_pressed and not self._prev_key_states[pygame.K_j]
 
         if j_key_pressed:  # Handle skill activation
-            now = pygame.time.get_ticks() / 1000.0
+            now = game_time()
 
             # Check for fire skill first (Fire Wizard)
             fire = self.skills.get("fire")
@@ -405,7 +392,7 @@ class Player:
         # Ultimate skill key (L) - Fire Wizard: Fire Explosion, Blue Wizard: Charge Skill
         if keys[pygame.K_l]:
             try:
-                now = pygame.time.get_ticks() / 1000.0
+                now = game_time()
                 if self.can_use_skills:  # Requires full mana
 
                     # Check for Skeleton's earth slam skill first
@@ -501,18 +488,30 @@ class Player:
             else:
                 self.state = "idle"
 
-    def move(self, platforms):
+    def move(self, platforms, dt=SIM_DT):
 
         # Update physics lock timer
         if self.physics_lock > 0:
-            self.physics_lock -= 1.0 / 60  # Assuming 60 FPS
+            self.physics_lock -= dt  # Một tick mô phỏng
             if self.physics_lock <= 0:
                 self.physics_lock = 0
             # Skip physics updates while locked to prevent teleport interference
             return
 
+        # vel_x / vel_y / GRAVITY tính theo tick tham chiếu (120/giây), nhân theo dt
+        ticks = tick_scale(dt)
+        dx = int(round(self.vel_x * ticks))
+        dy, vel_y = fall(self.vel_y, GRAVITY, ticks)
+        dy = int(round(dy))
+
+        # Chỉ lấy platform quanh quãng đường di chuyển tick này (truy vấn grid)
+        platforms = platforms_near(
+            platforms,
+            self.rect.inflate(abs(dx) * 2, abs(dy) * 2),
+        )
+
         if self.vel_x != 0:
-            self.rect.x += self.vel_x
+            self.rect.x += dx
             for _, plat in platforms:
                 if self.rect.colliderect(plat):
                     if self.vel_x > 0:
@@ -521,10 +520,10 @@ class Player:
                         self.rect.left = plat.right
         
         # Áp dụng gravity
-        self.vel_y += GRAVITY
+        self.vel_y = vel_y
         
         # Di chuyển dọc
-        self.rect.y += self.vel_y
+        self.rect.y += dy
         self.on_ground = False
         standing_platform = None
         
@@ -575,7 +574,7 @@ class Player:
             return True
         return False
 
-    def update_animation(self):
+    def update_animation(self, dt=SIM_DT):
         frames = self.animations.get(self.state, [])
         # If there are no frames for this state, keep current_frame at 0 and skip
         if not frames:
@@ -585,7 +584,7 @@ class Player:
         # Ensure current_frame is within bounds
         self.current_frame = max(0, min(self.current_frame, len(frames) - 1))
 
-        self.animation_timer += self.animation_speed
+        self.animation_timer += self.animation_speed * tick_scale(dt)
 
         # Handle attack animation (plays once then returns to idle)
         if self.state == "attack":
@@ -681,9 +680,7 @@ class Player:
         if self.current_frame >= len(frames) or self.current_frame < 0:
             self.current_frame = self.current_frame % len(frames)
 
-        frame_surf, bottom_trim = frames[self.current_frame]
-        if not self.facing_right:
-            frame_surf = pygame.transform.flip(frame_surf, True, False)
+        frame_surf, bottom_trim = frame_for(frames, self.current_frame, self.facing_right)
         sprite_rect = frame_surf.get_rect(
             midbottom=(
                 self.rect.centerx - camera_x,
@@ -691,7 +688,7 @@ class Player:
             )
         )
         surface.blit(frame_surf, sprite_rect)
-        pygame.draw.rect(
+        mark_drawn(surface, pygame.draw.rect(
             surface,
             (255, 0, 0),
             (
@@ -701,7 +698,7 @@ class Player:
                 self.rect.height,
             ),
             2,
-        )
+        ))
 
         # Draw any skill visuals (e.g. projectiles) if skill instances expose draw()
         for name, s in getattr(self, "skills", {}).items():
@@ -1,7 +1,9 @@
 import pygame
-import time
 import math
 
+from game.sim_clock import game_time
+from game.render_targets import mark_drawn
+
 """
 Hệ thống Portal hợp nhất.
 
@@ -57,7 +59,7 @@ class Portal:
         self.spawn_offset_x = spawn_offset_x
         self.spawn_offset_y = spawn_offset_y
         self.cooldown_ms = cooldown_ms
-        self.last_teleport_time = 0
+        self.last_teleport_time = float("-inf")  # ms thời gian game
         self.lockout_ms = lockout_ms
         self.require_interact = require_interact
         self.tile_img = tile_img
@@ -75,17 +77,27 @@ class Portal:
         self.player_near = False
         self.interaction_range = 100  # Khoảng cách để hiển thị prompt
 
+    def reset(self):
+        """Xoá cooldown và hiệu ứng (dùng lại portal giữa các session)."""
+        self.last_teleport_time = float("-inf")
+        self.animation_timer = 0.0
+        self.particles = []
+        self.glow_alpha = 0
+        self.glow_direction = 5
+        self.active = True
+        self.player_near = False
+
     # =============================
     # Teleport logic
     # =============================
     def can_teleport(self):
         if self.target_id is None:
             return False  # Không phải portal teleport
-        current_time = time.time() * 1000
+        current_time = game_time() * 1000
         return (current_time - self.last_teleport_time) >= self.cooldown_ms
 
     def activate_cooldown(self):
-        self.last_teleport_time = time.time() * 1000
+        self.last_teleport_time = game_time() * 1000
 
     def check_collision_rect(self, player_rect):
         return self.rect.colliderect(player_rect)
@@ -198,9 +210,9 @@ class Portal:
 
             # Frame
             frame_color = (100, 200, 255)
-            pygame.draw.rect(surface, frame_color, (screen_x, screen_y, self.width, self.height), 3)
+            mark_drawn(surface, pygame.draw.rect(surface, frame_color, (screen_x, screen_y, self.width, self.height), 3))
             inner_rect = pygame.Rect(screen_x + 5, screen_y + 5, self.width - 10, self.height - 10)
-            pygame.draw.rect(surface, (150, 220, 255), inner_rect, 2)
+            mark_drawn(surface, pygame.draw.rect(surface, (150, 220, 255), inner_rect, 2))
 
             # Interior swirl
             wave_offset = int(math.sin(self.animation_timer * 3) * 5)
@@ -229,7 +241,7 @@ class Portal:
                     prompt_rect = prompt_surf.get_rect(center=(screen_x + self.width // 2, screen_y + self.height + 20))
                     surface.blit(prompt_surf, prompt_rect)
         except Exception:
-            pygame.draw.rect(surface, (100, 200, 255), (screen_x, screen_y, self.width, self.height), 2)
+            mark_drawn(surface, pygame.draw.rect(surface, (100, 200, 255), (screen_x, screen_y, self.width, self.height), 2))
 
     def is_visible(self, camera_x, camera_y, camera_width, camera_height):
         return (
@@ -260,6 +272,13 @@ class PortalManager:
         if portal.destination:
             print(f"[PORTAL] Added arena portal: {portal.destination.get('name','Arena')} ({portal.id})")
 
+    def reset(self):
+        """Reset cooldown/lockout của mọi portal, giữ nguyên mạng portal đã load."""
+        self.player_lockout_until = 0
+        self.active_arena = None
+        for portal in self.portals.values():
+            portal.reset()
+
     def get_portal(self, portal_id):
         return self.portals.get(portal_id)
 
@@ -267,7 +286,7 @@ class PortalManager:
     # Teleport collision
     # -----------------
     def is_player_locked_out(self):
-        current_time = time.time() * 1000
+        current_time = game_time() * 1000
         return current_time < self.player_lockout_until
 
     def check_player_collision(self, player_rect):
@@ -300,7 +319,7 @@ class PortalManager:
         target_portal.activate_cooldown()
 
         if portal.lockout_ms > 0:
-            current_time = time.time() * 1000
+            current_time = game_time() * 1000
             self.player_lockout_until = current_time + portal.lockout_ms
             print(f"[Portal] Player bị khóa portal trong {portal.lockout_ms}ms")
 
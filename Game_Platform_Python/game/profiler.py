@@ -0,0 +1,236 @@
+"""
+Profiler theo frame cho cửa sổ game: ms của từng phần, overlay và xuất file.
+
+Dùng chung các `timer.section(tên)` đã có trong GameSession / SessionView (xem
+game/frame_timer.py), cộng thêm event, asset và flip trong vòng lặp của
+`run_game_session`. Mỗi frame các phần được cộng dồn (vd. 2 tick thì
+"update.enemies" là tổng của 2 lần), rồi đẩy vào cửa sổ trượt PROFILER_WINDOW frame.
+
+- F3: bật/tắt overlay (trung bình / max ms mỗi phần + thanh so với ngân sách 1000/FPS);
+- F4: bắt đầu / dừng capture; khi dừng ghi CSV (mỗi frame một dòng) và Chrome trace
+  (mở bằng chrome://tracing hoặc ui.perfetto.dev) vào PROFILER_EXPORT_DIR.
+
+Khi overlay tắt và không capture, `section()` trả về context rỗng nên gần như
+không tốn gì.
+"""
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import pygame
+
+from game.config import (
+    FPS,
+    PROFILER_WINDOW,
+    PROFILER_OVERLAY_REFRESH,
+    PROFILER_CAPTURE_MAX_FRAMES,
+    PROFILER_EXPORT_DIR,
+)
+from game.hud import get_font
+
+_NULL_CONTEXT = nullcontext()
+
+# Overlay
+OVERLAY_FONT_SIZE = 16
+OVERLAY_LINE_HEIGHT = 18
+OVERLAY_NAME_WIDTH = 190
+OVERLAY_BAR_WIDTH = 120
+OVERLAY_PADDING = 8
+
+
+class FrameProfiler:
+    def __init__(self, window=PROFILER_WINDOW, budget_ms=1000.0 / FPS):
+        self.window = max(1, int(window))
+        self.budget_ms = budget_ms
+        self.overlay_visible = False
+        self.capturing = False
+        self.frames = 0
+        self.history = {}  # tên -> deque ms mỗi frame (theo thứ tự gặp lần đầu)
+        self._current = {}
+        self._frame_start = 0.0
+        # Capture: (tên, bắt đầu, thời lượng) theo perf_counter, và tổng mỗi frame
+        self._events = []
+        self._rows = []
+        self._capture_start = 0.0
+
+    @property
+    def active(self):
+        return self.overlay_visible or self.capturing
+
+    # ------------------------------------------------------------------
+    # Đo
+    # ------------------------------------------------------------------
+    def section(self, name):
+        if not self.active:
+            return _NULL_CONTEXT
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._current[name] = self._current.get(name, 0.0) + (end - start) * 1000.0
+            if self.capturing:
+                self._events.append((name, start, end - start))
+
+    def begin_frame(self):
+        self._current = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.active:
+            return
+        end = time.perf_counter()
+        current = self._current
+        current["frame"] = (end - self._frame_start) * 1000.0
+        for name, ms in current.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+        # Phần không chạy trong frame này (vd. banner) tính 0 ms để trung bình đúng theo frame
+        for name, samples in self.history.items():
+            samples.append(current.get(name, 0.0))
+        self.frames += 1
+
+        if self.capturing:
+            self._events.append(("frame", self._frame_start, end - self._frame_start))
+            self._rows.append(current)
+            if len(self._rows) >= PROFILER_CAPTURE_MAX_FRAMES:
+                self.stop_capture()
+
+    def rolling(self):
+        """[(tên, trung bình ms, max ms)] trong cửa sổ trượt, "frame" đứng đầu."""
+        result = []
+        for name, samples in self.history.items():
+            if samples:
+                result.append((name, sum(samples) / len(samples), max(samples)))
+        result.sort(key=lambda row: row[0] != "frame")
+        return result
+
+    # ------------------------------------------------------------------
+    # Bật / tắt
+    # ------------------------------------------------------------------
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        if not self.active:
+            self.history = {}
+
+    def toggle_capture(self):
+        """Bắt đầu capture, hoặc dừng và xuất file; trả về (csv, trace) khi dừng."""
+        if self.capturing:
+            return self.stop_capture()
+        self.start_capture()
+        return None
+
+    def start_capture(self):
+        self._events = []
+        self._rows = []
+        self._capture_start = time.perf_counter()
+        self.capturing = True
+        print(f"[PROFILER] Capture started (max {PROFILER_CAPTURE_MAX_FRAMES} frames)")
+
+    def stop_capture(self, directory=PROFILER_EXPORT_DIR):
+        if not self.capturing:
+            return None
+        self.capturing = False
+        if not self._rows:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        csv_path = self.export_csv(os.path.join(directory, f"profile_{stamp}.csv"))
+        trace_path = self.export_chrome_trace(os.path.join(directory, f"profile_{stamp}.trace.json"))
+        print(f"[PROFILER] {len(self._rows)} frames -> {csv_path}, {trace_path}")
+        return csv_path, trace_path
+
+    # ------------------------------------------------------------------
+    # Xuất file
+    # ------------------------------------------------------------------
+    def export_csv(self, path):
+        """Mỗi frame một dòng: số frame + ms của từng phần (trống = không chạy)."""
+        names = list(dict.fromkeys(name for row in self._rows for name in row))
+        names.sort(key=lambda name: name != "frame")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_index"] + names)
+            for i, row in enumerate(self._rows):
+                writer.writerow([i] + [f"{row[name]:.4f}" if name in row else "" for name in names])
+        return path
+
+    def export_chrome_trace(self, path):
+        """Chrome trace event format: mỗi section một event "X" (µs từ lúc bắt đầu capture)."""
+        origin = self._capture_start
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "game loop"}},
+        ]
+        for name, start, duration in self._events:
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((start - origin) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": 1,
+                "tid": 1,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    # ------------------------------------------------------------------
+    # Overlay
+    # ------------------------------------------------------------------
+    def draw_overlay(self, hud, pos=(10, 140)):
+        """Bảng ms mỗi phần (dựng lại mỗi PROFILER_OVERLAY_REFRESH frame, còn lại chỉ blit)."""
+        if not self.overlay_visible or not self.history:
+            return
+        key = self.frames // PROFILER_OVERLAY_REFRESH
+        surf, _ = hud.widget("profiler", key, self._build_overlay)
+        hud.screen.blit(surf, pos)
+
+    def _build_overlay(self):
+        font = get_font(OVERLAY_FONT_SIZE)
+        rows = self.rolling()
+        budget = self.budget_ms
+        width = OVERLAY_PADDING * 2 + OVERLAY_NAME_WIDTH + OVERLAY_BAR_WIDTH + 130
+        height = OVERLAY_PADDING * 2 + OVERLAY_LINE_HEIGHT * (len(rows) + 1)
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+
+        title = f"PROFILER  avg/max ms ({len(next(iter(self.history.values())))} frames)"
+        if self.capturing:
+            title += "  [REC]"
+        panel.blit(font.render(title, True, (255, 255, 255)), (OVERLAY_PADDING, OVERLAY_PADDING))
+
+        bar_x = OVERLAY_PADDING + OVERLAY_NAME_WIDTH
+        for i, (name, avg, peak) in enumerate(rows):
+            y = OVERLAY_PADDING + OVERLAY_LINE_HEIGHT * (i + 1)
+            # Màu theo phần ngân sách frame đã dùng
+            share = avg / budget if budget > 0 else 0.0
+            if share > 0.5:
+                color = (255, 90, 90)
+            elif share > 0.15:
+                color = (255, 210, 80)
+            else:
+                color = (140, 230, 140)
+            panel.blit(font.render(name, True, (230, 230, 230)), (OVERLAY_PADDING, y))
+            bar_w = max(1, int(OVERLAY_BAR_WIDTH * min(1.0, share)))
+            pygame.draw.rect(panel, (70, 70, 70), (bar_x, y + 4, OVERLAY_BAR_WIDTH, OVERLAY_LINE_HEIGHT - 8))
+            pygame.draw.rect(panel, color, (bar_x, y + 4, bar_w, OVERLAY_LINE_HEIGHT - 8))
+            panel.blit(
+                font.render(f"{avg:6.2f} / {peak:6.2f}", True, color),
+                (bar_x + OVERLAY_BAR_WIDTH + 8, y),
+            )
+        return panel
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'sections': len(self.history),
+            'capturing': self.capturing,
+            'captured_frames': len(self._rows),
+        }
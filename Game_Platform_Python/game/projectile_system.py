@@ -0,0 +1,444 @@
+"""
+Hệ thống projectile dạng struct-of-arrays dùng chung cho player và enemy.
+
+Trước đây ProjectileSkill / ChargeSkill / SlowSkill / FireSkill mỗi skill giữ một
+list object `Projectile`, update từng viên, và `handle_collisions` lặp lồng
+projectile x enemy với `colliderect`. ProjectileSystem giữ mọi projectile trong
+các cột song song (vị trí, vận tốc, tuổi, damage, frame...):
+
+- `spawn()`: skill thêm một hàng, không tạo object mới;
+- `step(dt)`: tích phân vị trí + animation + loại viên hết hạn cho cả mảng một lần;
+- `resolve_hits(player, enemies)`: so hitbox mọi projectile với rect enemy / player
+  theo lô, chỉ các cặp chạm nhau mới chạy code Python (take_damage, hiệu ứng);
+- `draw()`: blit các viên trong camera (ở chế độ prescaled: frame scale sẵn theo zoom).
+
+Có NumPy thì các cột là mảng numpy (vector hoá); không có thì dùng list Python
+cùng API - chậm hơn với nhiều projectile nhưng game vẫn chạy bình thường.
+"""
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # NumPy không bắt buộc
+    np = None
+
+from game.config import PROJECTILE_INITIAL_CAPACITY, PROJECTILE_FRAME_TIME
+from game.render_targets import mark_drawn
+
+TEAM_PLAYER = 0  # bắn trúng enemy
+TEAM_ENEMY = 1   # bắn trúng player
+
+# Kích thước hitbox khi skill không có frame (chấm tròn tím)
+FALLBACK_SIZE = 8
+
+_FLOAT_COLUMNS = (
+    "x", "y", "vx", "vy", "age", "lifetime", "timer",
+    "half_w", "half_h", "damage",
+    "min_x", "max_x", "min_y", "max_y",
+)
+_INT_COLUMNS = ("frame", "nframes", "team", "pierce", "hits_enemies")
+
+_INF = float("inf")
+
+
+class ProjectileSystem:
+    _instance = None
+
+    def __new__(cls):
+        # Singleton - mọi skill spawn vào cùng một bộ mảng
+        if cls._instance is None:
+            cls._instance = super(ProjectileSystem, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.vectorized = np is not None
+        self.count = 0
+        self._capacity = 0
+        self._cols = {}
+        self._alloc(PROJECTILE_INITIAL_CAPACITY)
+        # Cột object (không vector hoá được): frames, skill nguồn, owner, metadata, target đã trúng
+        self._frames = []
+        self._source = []
+        self._owner = []
+        self._meta = []
+        self._hit = []
+        self._per_source = {}  # skill -> số projectile đang bay
+        self._zoomed = {}  # (id(frame gốc), zoom) -> (frame gốc, frame đã scale)
+        self.spawned = 0
+        self.hits = 0
+        self._initialized = True
+
+    # ------------------------------------------------------------------
+    # Lưu trữ
+    # ------------------------------------------------------------------
+    def _alloc(self, capacity):
+        if not self.vectorized:
+            for name in _FLOAT_COLUMNS + _INT_COLUMNS:
+                self._cols.setdefault(name, [])
+            return
+        for names, dtype in ((_FLOAT_COLUMNS, np.float64), (_INT_COLUMNS, np.int32)):
+            for name in names:
+                arr = np.zeros(capacity, dtype=dtype)
+                old = self._cols.get(name)
+                if old is not None:
+                    arr[: self.count] = old[: self.count]
+                self._cols[name] = arr
+        self._capacity = capacity
+
+    def _compact(self, keep):
+        """Giữ lại các hàng có `keep[i]` đúng, dồn về đầu mảng."""
+        if self.vectorized:
+            idx = np.flatnonzero(keep)
+            for arr in self._cols.values():
+                arr[: len(idx)] = arr[idx]
+            idx = idx.tolist()
+        else:
+            idx = [i for i, k in enumerate(keep) if k]
+            for name, col in self._cols.items():
+                self._cols[name] = [col[i] for i in idx]
+        kept = set(idx)
+        for i in range(self.count):
+            if i not in kept:
+                source = self._source[i]
+                left = self._per_source.get(source, 0) - 1
+                if left > 0:
+                    self._per_source[source] = left
+                else:
+                    self._per_source.pop(source, None)
+        self._frames = [self._frames[i] for i in idx]
+        self._source = [self._source[i] for i in idx]
+        self._owner = [self._owner[i] for i in idx]
+        self._meta = [self._meta[i] for i in idx]
+        self._hit = [self._hit[i] for i in idx]
+        self.count = len(idx)
+
+    # ------------------------------------------------------------------
+    # API cho skill
+    # ------------------------------------------------------------------
+    def spawn(
+        self,
+        source,
+        owner,
+        x,
+        y,
+        vx,
+        vy,
+        frames,
+        lifetime,
+        damage,
+        pierce=False,
+        hits_enemies=True,
+        meta=None,
+        bounds=None,
+    ):
+        """
+        Thêm projectile tâm (x, y), vận tốc (vx, vy) px/giây.
+
+        - frames: list (surface, trim) đã scale sẵn (scaled_frame_set)
+        - pierce: xuyên qua target, mỗi target chỉ trúng một lần
+        - hits_enemies: projectile của player có gây damage cho enemy không
+          (projectile của enemy luôn va chạm với player)
+        - meta: dict hiệu ứng kèm theo (vd. slow), truyền cho `on_projectile_hit`
+        - bounds: (min_x, max_x, min_y, max_y) ra ngoài thì bị huỷ
+        """
+        if frames:
+            w, h = frames[0][0].get_size()
+        else:
+            w = h = FALLBACK_SIZE
+        min_x, max_x, min_y, max_y = bounds if bounds else (-_INF, _INF, -_INF, _INF)
+        team = getattr(owner, "projectile_team", TEAM_PLAYER)
+        row = {
+            "x": x, "y": y, "vx": vx, "vy": vy,
+            "age": 0.0, "lifetime": lifetime, "timer": 0.0,
+            "half_w": w / 2.0, "half_h": h / 2.0, "damage": damage,
+            "min_x": min_x, "max_x": max_x, "min_y": min_y, "max_y": max_y,
+            "frame": 0, "nframes": max(1, len(frames or ())), "team": team,
+            "pierce": 1 if pierce else 0, "hits_enemies": 1 if hits_enemies else 0,
+        }
+        i = self.count
+        if self.vectorized:
+            if i >= self._capacity:
+                self._alloc(self._capacity * 2)
+            for name, value in row.items():
+                self._cols[name][i] = value
+        else:
+            for name, value in row.items():
+                self._cols[name].append(value)
+        self._frames.append(frames or [])
+        self._source.append(source)
+        self._owner.append(owner)
+        self._meta.append(meta)
+        self._hit.append(None)
+        self._per_source[source] = self._per_source.get(source, 0) + 1
+        self.count += 1
+        self.spawned += 1
+
+    def count_for(self, source):
+        """Số projectile của skill `source` còn đang bay."""
+        return self._per_source.get(source, 0)
+
+    def clear_source(self, source):
+        """Huỷ mọi projectile của một skill (skill reset khi enemy về pool)."""
+        if self._per_source.get(source):
+            self._compact([s is not source for s in self._source])
+
+    def clear(self):
+        """Huỷ toàn bộ (bắt đầu session mới)."""
+        self.count = 0
+        if not self.vectorized:
+            for col in self._cols.values():
+                col.clear()
+        self._frames.clear()
+        self._source.clear()
+        self._owner.clear()
+        self._meta.clear()
+        self._hit.clear()
+        self._per_source.clear()
+        self._zoomed.clear()
+
+    # ------------------------------------------------------------------
+    # Update / va chạm / vẽ
+    # ------------------------------------------------------------------
+    def step(self, dt):
+        """Tích phân + animation cho mọi projectile, huỷ viên hết tuổi hoặc ra khỏi bounds."""
+        n = self.count
+        if not n:
+            return
+        c = self._cols
+        if self.vectorized:
+            age = c["age"][:n]
+            age += dt
+            x = c["x"][:n]
+            y = c["y"][:n]
+            x += c["vx"][:n] * dt
+            y += c["vy"][:n] * dt
+            timer = c["timer"][:n]
+            timer += dt
+            tick = timer >= PROJECTILE_FRAME_TIME
+            if tick.any():
+                frame = c["frame"][:n]
+                frame[tick] = (frame[tick] + 1) % c["nframes"][:n][tick]
+                timer[tick] = 0.0
+            keep = (
+                (age <= c["lifetime"][:n])
+                & (x >= c["min_x"][:n]) & (x <= c["max_x"][:n])
+                & (y >= c["min_y"][:n]) & (y <= c["max_y"][:n])
+            )
+            if not keep.all():
+                self._compact(keep)
+            return
+
+        keep = [True] * n
+        expired = False
+        for i in range(n):
+            c["age"][i] += dt
+            c["x"][i] += c["vx"][i] * dt
+            c["y"][i] += c["vy"][i] * dt
+            c["timer"][i] += dt
+            if c["timer"][i] >= PROJECTILE_FRAME_TIME:
+                c["frame"][i] = (c["frame"][i] + 1) % c["nframes"][i]
+                c["timer"][i] = 0.0
+            if (
+                c["age"][i] > c["lifetime"][i]
+                or not c["min_x"][i] <= c["x"][i] <= c["max_x"][i]
+                or not c["min_y"][i] <= c["y"][i] <= c["max_y"][i]
+            ):
+                keep[i] = False
+                expired = True
+        if expired:
+            self._compact(keep)
+
+    def _extent(self, candidates):
+        """AABB (left, top, right, bottom) bao mọi hàng được chọn; None nếu không có."""
+        c = self._cols
+        n = self.count
+        if self.vectorized:
+            rows = np.flatnonzero(candidates)
+            if not len(rows):
+                return None
+            x = c["x"][:n][rows]
+            y = c["y"][:n][rows]
+            hw = c["half_w"][:n][rows]
+            hh = c["half_h"][:n][rows]
+            return (
+                float((x - hw).min()),
+                float((y - hh).min()),
+                float((x + hw).max()) + 1,
+                float((y + hh).max()) + 1,
+            )
+        rows = [i for i in range(n) if candidates[i]]
+        if not rows:
+            return None
+        return (
+            min(c["x"][i] - c["half_w"][i] for i in rows),
+            min(c["y"][i] - c["half_h"][i] for i in rows),
+            max(c["x"][i] + c["half_w"][i] for i in rows) + 1,
+            max(c["y"][i] + c["half_h"][i] for i in rows) + 1,
+        )
+
+    def _overlaps(self, candidates, rects):
+        """Các cặp (hàng projectile, chỉ số rect) chạm nhau, theo thứ tự projectile rồi rect."""
+        c = self._cols
+        n = self.count
+        if self.vectorized:
+            rows = np.flatnonzero(candidates)
+            if not len(rows) or not rects:
+                return []
+            r = np.array([(rc.left, rc.top, rc.right, rc.bottom) for rc in rects], dtype=np.float64)
+            x = c["x"][:n][rows, None]
+            y = c["y"][:n][rows, None]
+            hw = c["half_w"][:n][rows, None]
+            hh = c["half_h"][:n][rows, None]
+            hit = (
+                (x - hw < r[:, 2]) & (x + hw > r[:, 0])
+                & (y - hh < r[:, 3]) & (y + hh > r[:, 1])
+            )
+            p, e = np.nonzero(hit)
+            return list(zip(rows[p].tolist(), e.tolist()))
+
+        pairs = []
+        for i in range(n):
+            if not candidates[i]:
+                continue
+            left = c["x"][i] - c["half_w"][i]
+            right = c["x"][i] + c["half_w"][i]
+            top = c["y"][i] - c["half_h"][i]
+            bottom = c["y"][i] + c["half_h"][i]
+            for j, rc in enumerate(rects):
+                if left < rc.right and right > rc.left and top < rc.bottom and bottom > rc.top:
+                    pairs.append((i, j))
+        return pairs
+
+    def resolve_hits(self, player, enemies):
+        """
+        Va chạm theo lô: projectile của player với `enemies`, projectile của enemy với `player`.
+
+        `enemies` nên là EnemyGrid: chỉ enemy trong vùng bao các projectile của player
+        mới được đưa vào phép test (list thường thì xét toàn bộ).
+
+        Viên không xuyên bị huỷ ở target đầu tiên; viên xuyên trúng mỗi target một lần.
+        Owner có `on_projectile_hit(target, damage, meta)` thì tự xử lý hiệu ứng
+        (vd. ControllerEnemy làm chậm player), không thì gọi `target.take_damage`.
+        """
+        n = self.count
+        if not n:
+            return
+        c = self._cols
+        if self.vectorized:
+            team = c["team"][:n]
+            player_side = (team == TEAM_PLAYER) & (c["hits_enemies"][:n] != 0)
+            enemy_side = team == TEAM_ENEMY
+        else:
+            player_side = [t == TEAM_PLAYER and h for t, h in zip(c["team"], c["hits_enemies"])]
+            enemy_side = [t == TEAM_ENEMY for t in c["team"]]
+
+        targets = []
+        near_rect = getattr(enemies, "near_rect", None)
+        if near_rect is not None:
+            extent = self._extent(player_side)
+            if extent is not None:
+                targets = near_rect(*extent)
+        elif enemies:
+            targets = list(enemies)
+        pairs = self._overlaps(player_side, [e.rect for e in targets])
+        if player is not None and hasattr(player, "rect"):
+            pairs.extend((i, player) for i, _ in self._overlaps(enemy_side, [player.rect]))
+        else:
+            player = None
+        if not pairs:
+            return
+
+        removed = set()
+        for i, target in pairs:
+            if i in removed:
+                continue
+            if target is not player:
+                target = targets[target]
+            hit = self._hit[i]
+            if hit is not None and id(target) in hit:
+                continue
+            self._apply_hit(i, target)
+            if c["pierce"][i]:
+                if hit is None:
+                    hit = self._hit[i] = set()
+                hit.add(id(target))
+            else:
+                removed.add(i)
+        if removed:
+            self._compact([i not in removed for i in range(self.count)])
+
+    def _apply_hit(self, i, target):
+        damage = self._cols["damage"][i]
+        damage = int(damage) if float(damage).is_integer() else float(damage)
+        handler = getattr(self._owner[i], "on_projectile_hit", None)
+        try:
+            if handler is not None:
+                handler(target, damage, self._meta[i])
+            elif hasattr(target, "take_damage"):
+                target.take_damage(damage)
+        except Exception as e:
+            print(f"[PROJECTILE] Lỗi khi áp dụng hit: {e}")
+        self.hits += 1
+
+    def draw(self, surface, camera_x=0, camera_y=0, view_w=None, view_h=None, lag=0.0, zoom=1.0):
+        """
+        Vẽ mọi projectile; có view_w/view_h thì bỏ qua viên ngoài camera.
+
+        `lag` (giây): lùi vị trí vẽ theo vận tốc - dùng để nội suy giữa các tick
+        mô phỏng, xem game/sim_clock.py. `zoom` != 1: `surface` ở độ phân giải màn
+        hình (toạ độ world x zoom), frame được scale sẵn một lần theo zoom.
+        """
+        n = self.count
+        if not n:
+            return
+        c = self._cols
+        if self.vectorized:
+            xs = (c["x"][:n] - c["vx"][:n] * lag).tolist()
+            ys = (c["y"][:n] - c["vy"][:n] * lag).tolist()
+            hws = c["half_w"][:n].tolist()
+            hhs = c["half_h"][:n].tolist()
+            frame_idx = c["frame"][:n].tolist()
+        else:
+            xs = [x - vx * lag for x, vx in zip(c["x"], c["vx"])] if lag else c["x"]
+            ys = [y - vy * lag for y, vy in zip(c["y"], c["vy"])] if lag else c["y"]
+            hws, hhs, frame_idx = c["half_w"], c["half_h"], c["frame"]
+        cull = view_w is not None and view_h is not None
+        zoomed = zoom != 1.0
+        for i in range(n):
+            sx = xs[i] - camera_x
+            sy = ys[i] - camera_y
+            if cull and (
+                sx + hws[i] < 0 or sx - hws[i] > view_w or sy + hhs[i] < 0 or sy - hhs[i] > view_h
+            ):
+                continue
+            center = (int(round(sx * zoom)), int(round(sy * zoom))) if zoomed else (int(sx), int(sy))
+            frames = self._frames[i]
+            if not frames:
+                radius = max(1, int(round(6 * zoom)))
+                mark_drawn(surface, pygame.draw.circle(surface, (128, 0, 255), center, radius))
+                continue
+            surf = frames[frame_idx[i]][0]
+            if zoomed:
+                surf = self._zoomed_frame(surf, zoom)
+            surface.blit(surf, surf.get_rect(center=center))
+
+    def _zoomed_frame(self, surf, zoom):
+        """Frame đã scale theo zoom (nearest, như lớp actor), tạo một lần cho mỗi frame gốc."""
+        entry = self._zoomed.get((id(surf), zoom))
+        if entry is None or entry[0] is not surf:
+            w, h = surf.get_size()
+            size = (max(1, int(round(w * zoom))), max(1, int(round(h * zoom))))
+            entry = self._zoomed[(id(surf), zoom)] = (surf, pygame.transform.scale(surf, size))
+        return entry[1]
+
+    def stats(self):
+        return {
+            'active': self.count,
+            'capacity': self._capacity if self.vectorized else self.count,
+            'spawned': self.spawned,
+            'hits': self.hits,
+            'vectorized': self.vectorized,
+        }
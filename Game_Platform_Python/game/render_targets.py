@@ -0,0 +1,259 @@
+"""
+Quản lý các render target dùng lại qua nhiều frame.
+
+Trước đây mỗi frame tạo mới một Surface (WIDTH/ZOOM x HEIGHT/ZOOM) rồi
+`transform.scale` ra một Surface mới nữa. RenderTargets cấp phát các surface
+này một lần và chỉ xoá/vẽ lại nội dung.
+
+Hai chế độ:
+- Prescaled (prescaled=True, mặc định): các layer tĩnh (tile, decor, tint) đã được
+  scale sẵn theo ZOOM khi load và vẽ thẳng lên `output` ở độ phân giải màn hình.
+  Nhân vật/hiệu ứng vẽ trên lớp actor (`world`, toạ độ world, trong suốt); lớp này
+  ghi lại ô nào có vẽ (ActorLayer) nên mỗi frame chỉ xoá và scale những ô đó
+  thay vì cả khung nhìn 4000x2000. Projectile (frame tới ~1250x1080px) vẽ sau cùng
+  thẳng lên `output` ở độ phân giải màn hình, sau `flush_actors()`.
+- Thường (prescaled=False): mọi thứ vẽ lên `world` ở toạ độ world, cuối frame
+  scale cả khung nhìn vào `output` (cách cũ, giữ lại để so sánh).
+
+Vẽ lên lớp actor bằng `blit` / `blits` / `fill` được ghi tự động; vẽ bằng
+`pygame.draw` thì bọc trong `mark_drawn(surface, pygame.draw...(surface, ...))`.
+"""
+from fractions import Fraction
+
+import pygame
+
+from game.config import WIDTH, HEIGHT, ZOOM, RENDER_PRESCALED, ACTOR_DIRTY_CELL
+
+
+def mark_drawn(surface, rect):
+    """
+    Báo vùng vừa vẽ bằng pygame.draw lên `surface` (blit/fill được ghi tự động).
+
+    Chỉ có tác dụng với lớp actor (ActorLayer); surface khác bỏ qua. Trả lại `rect`.
+    """
+    mark = getattr(surface, "mark_dirty", None)
+    if mark is not None:
+        mark(rect)
+    return rect
+
+
+class ActorLayer(pygame.Surface):
+    """
+    Surface trong suốt của lớp actor, ghi lại các ô lưới `cell` x `cell` có vẽ.
+
+    `dirty` là bytearray cols x rows (1 = ô có vẽ trong frame này).
+    """
+
+    def __init__(self, size, cell, template=None):
+        if template is not None:
+            super().__init__(size, pygame.SRCALPHA, template)
+        else:
+            super().__init__(size, pygame.SRCALPHA)
+        self.cell = max(1, int(cell))
+        self.cols = -(-size[0] // self.cell)
+        self.rows = -(-size[1] // self.cell)
+        self.dirty = bytearray(self.cols * self.rows)
+
+    def mark_dirty(self, rect):
+        if rect is None:
+            return
+        rect = pygame.Rect(rect).clip(0, 0, self.get_width(), self.get_height())
+        if not rect.width or not rect.height:
+            return
+        cell, cols, dirty = self.cell, self.cols, self.dirty
+        cx0 = rect.left // cell
+        cx1 = (rect.right - 1) // cell
+        for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+            row = cy * cols
+            for i in range(row + cx0, row + cx1 + 1):
+                dirty[i] = 1
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = super().blit(source, dest, area, special_flags)
+        self.mark_dirty(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = super().blits(blit_sequence, doreturn=1)
+        for rect in rects:
+            self.mark_dirty(rect)
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        rect = super().fill(color, rect, special_flags)
+        self.mark_dirty(rect)
+        return rect
+
+    def dirty_runs(self):
+        """Các rect (toạ độ lớp) gồm những ô có vẽ liền nhau trên cùng một hàng."""
+        runs = []
+        cell, cols, dirty = self.cell, self.cols, self.dirty
+        w, h = self.get_width(), self.get_height()
+        for cy in range(self.rows):
+            row = cy * cols
+            cx = 0
+            while cx < cols:
+                if not dirty[row + cx]:
+                    cx += 1
+                    continue
+                start = cx
+                while cx < cols and dirty[row + cx]:
+                    cx += 1
+                left, top = start * cell, cy * cell
+                runs.append(pygame.Rect(left, top, min(cx * cell, w) - left, min(top + cell, h) - top))
+        return runs
+
+    def clear(self, rects):
+        """Xoá trong suốt các rect (không đánh dấu lại) và bỏ toàn bộ đánh dấu."""
+        fill = super().fill
+        for rect in rects:
+            fill((0, 0, 0, 0), rect)
+        self.dirty[:] = bytes(len(self.dirty))
+
+
+class RenderTargets:
+    def __init__(self, display_size=(WIDTH, HEIGHT), zoom=ZOOM, prescaled=RENDER_PRESCALED,
+                 dirty_cell=ACTOR_DIRTY_CELL):
+        self.display_size = (int(display_size[0]), int(display_size[1]))
+        self.zoom = float(zoom)
+        self.prescaled = bool(prescaled)
+        self.view_w = int(self.display_size[0] / self.zoom)
+        self.view_h = int(self.display_size[1] / self.zoom)
+
+        # Hệ số scale của các layer tĩnh: 1.0 (world) hoặc ZOOM (đã scale sẵn)
+        self.backdrop_zoom = self.zoom if self.prescaled else 1.0
+
+        # Ảnh cuối cùng của frame (kích thước màn hình), dùng cho pause menu
+        self.output = self._make_surface(self.display_size)
+        if self.prescaled:
+            # Lớp nhân vật/hiệu ứng ở toạ độ world, nền trong suốt. Ô lưới là bội của
+            # mẫu số của zoom (0.4 = 2/5 -> bội của 5px) để biên ô rơi đúng pixel
+            # màn hình, scale từng ô cho kết quả như scale cả khung nhìn
+            ratio = Fraction(self.zoom).limit_denominator(64)
+            step = ratio.denominator if float(ratio) == self.zoom else 1
+            cell = max(step, int(dirty_cell) // step * step)
+            self.world = ActorLayer((self.view_w, self.view_h), cell, self._alpha_template())
+            self.world.clear([self.world.get_rect()])
+            self._scaled_world = self._make_surface(self.display_size, alpha=True)
+        else:
+            self.world = self._make_surface((self.view_w, self.view_h))
+            self._scaled_world = None
+
+        # Overlay tint cỡ toàn khung nhìn (theo backdrop), tạo lại chỉ khi đổi màu
+        self._tint = None
+        self._tint_key = None
+
+        # Lớp actor đã ghép vào output trong frame này chưa (xem flush_actors)
+        self._flushed = False
+
+        # Bộ đếm để kiểm tra hiệu quả của vẽ theo ô (prescaled)
+        self.frames = 0
+        self.scaled_pixels = 0
+
+    @staticmethod
+    def _make_surface(size, alpha=False):
+        if alpha:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            try:
+                surf = surf.convert_alpha()
+            except Exception:
+                pass
+        else:
+            surf = pygame.Surface(size)
+            try:
+                surf = surf.convert()
+            except Exception:
+                pass
+        return surf
+
+    @staticmethod
+    def _alpha_template():
+        """Surface 1x1 mang định dạng convert_alpha (blit nhanh nhất) để ActorLayer dùng theo."""
+        try:
+            return pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+        except Exception:
+            return None
+
+    def begin_backdrop(self):
+        """Bắt đầu frame: trả về surface để vẽ các layer tĩnh (đã xoá đen)."""
+        if self.prescaled:
+            self.output.fill((0, 0, 0))
+            return self.output
+        self.world.fill((0, 0, 0))
+        return self.world
+
+    def backdrop_rect(self, x, y, w, h):
+        """Đổi một rect toạ độ màn-world (đã trừ camera) sang toạ độ của backdrop."""
+        z = self.backdrop_zoom
+        if z == 1.0:
+            return pygame.Rect(x, y, w, h)
+        left = int(round(x * z))
+        top = int(round(y * z))
+        return pygame.Rect(left, top, int(round((x + w) * z)) - left, int(round((y + h) * z)) - top)
+
+    def draw_tint(self, surface, rect, color, alpha):
+        """Phủ màu mờ lên `rect` (toạ độ backdrop) bằng overlay dựng sẵn."""
+        key = (tuple(int(c) for c in color), int(alpha))
+        if self._tint is None or self._tint_key != key:
+            size = surface.get_size()
+            self._tint = pygame.Surface(size, pygame.SRCALPHA)
+            self._tint.fill(key[0] + (key[1],))
+            self._tint_key = key
+        surface.blit(self._tint, rect.topleft, pygame.Rect(0, 0, rect.width, rect.height))
+
+    def begin_actors(self):
+        """Trả về surface (toạ độ world) để vẽ nhân vật, enemy, portal, hiệu ứng."""
+        self._flushed = False
+        if self.prescaled:
+            # Chỉ xoá những ô frame trước đã vẽ, phần còn lại vẫn trong suốt
+            self.world.clear(self.world.dirty_runs())
+        return self.world
+
+    def flush_actors(self):
+        """
+        Ghép ngay lớp actor đã vẽ vào `output`; trả về surface để vẽ tiếp ở trên.
+
+        Prescaled: trả về `output` (toạ độ world x `backdrop_zoom`), sau đó không vẽ
+        thêm lên lớp actor trong frame này. Chế độ thường: trả về chính `world`.
+        """
+        if not self.prescaled:
+            return self.world
+        if not self._flushed:
+            self._composite_actors()
+            self._flushed = True
+        return self.output
+
+    def _composite_actors(self):
+        """Scale các ô có vẽ của lớp actor và blit lên `output` (prescaled)."""
+        z = self.zoom
+        scaled_world = self._scaled_world
+        for rect in self.world.dirty_runs():
+            left, top = int(round(rect.left * z)), int(round(rect.top * z))
+            dst = pygame.Rect(left, top, int(round(rect.right * z)) - left, int(round(rect.bottom * z)) - top)
+            if not dst.width or not dst.height:
+                continue
+            pygame.transform.scale(self.world.subsurface(rect), dst.size, scaled_world.subsurface(dst))
+            self.output.blit(scaled_world, dst.topleft, dst)
+            self.scaled_pixels += rect.width * rect.height
+
+    def present(self, screen):
+        """Ghép frame vào `output` (không cấp phát mới) và blit ra màn hình."""
+        self.frames += 1
+        if self.prescaled:
+            if not self._flushed:
+                self._composite_actors()
+            self._flushed = False
+        else:
+            pygame.transform.scale(self.world, self.display_size, self.output)
+            self.scaled_pixels += self.view_w * self.view_h
+        screen.blit(self.output, (0, 0))
+        return self.output
+
+    def stats(self):
+        """Số pixel lớp world được scale trung bình mỗi frame (so với cả khung nhìn)."""
+        frames = max(1, self.frames)
+        return {
+            'frames': self.frames,
+            'scaled_px_per_frame': self.scaled_pixels // frames,
+            'view_px': self.view_w * self.view_h,
+        }
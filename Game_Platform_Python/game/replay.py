@@ -0,0 +1,286 @@
+"""
+Ghi lại và phát lại một lần chơi theo từng tick mô phỏng.
+
+Một session chạy y hệt nếu có cùng: nhân vật + stage bắt đầu, seed của RNG mô phỏng
+(GameClock, xem game/sim_clock.py), dt và trạng thái phím của từng tick, và các
+sự kiện ngoài tick (hồi sinh bằng phím R). InputRecorder đứng giữa nguồn phím thật
+(`pygame.key.get_pressed()` hoặc ScriptedInput) và `player.input_source`, lưu mỗi
+tick thành một bản ghi cố định rồi nén zlib:
+
+    MAGIC | version (u8) | độ dài meta (u32) | meta JSON | zlib(bản ghi tick...)
+    bản ghi tick: mask phím (u16) | cờ sự kiện (u8) | dt (f64)
+
+Meta giữ seed, danh sách mã phím ứng với từng bit, và checksum trạng thái mỗi
+REPLAY_CHECKPOINT_TICKS tick: replay so lại để báo tick đầu tiên bị lệch.
+Replay chạy không cửa sổ và đo thời gian từng tick, để so giữa các bản build:
+
+    python -m game.replay replays/bluewizard_20250101_120000.replay
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+# Chạy trực tiếp (python game/replay.py) cũng import được package game
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from game.config import REPLAY_DIR, REPLAY_CHECKPOINT_TICKS
+from game.frame_timer import percentiles
+from game.headless import KeyState, init_headless, load_headless_world
+from game.session import GameSession
+
+MAGIC = b"GPREPLAY"
+VERSION = 1
+HEADER = struct.Struct("<BI")
+RECORD = struct.Struct("<HBd")
+
+# Cờ sự kiện áp dụng ngay trước tick của bản ghi
+EVENT_RESPAWN = 1
+
+# Các phím Player.handle_input đọc, mỗi phím một bit trong mask
+RECORDED_KEYS = (
+    pygame.K_a,
+    pygame.K_d,
+    pygame.K_w,
+    pygame.K_s,
+    pygame.K_LEFT,
+    pygame.K_RIGHT,
+    pygame.K_SPACE,
+    pygame.K_j,
+    pygame.K_k,
+    pygame.K_i,
+    pygame.K_l,
+)
+
+
+def session_checksum(session):
+    """CRC32 của trạng thái gameplay (player, enemy, stage, projectile) - để so khi replay."""
+    player = session.player
+    parts = [
+        session.ticks,
+        session.current_stage,
+        session.boss_spawned,
+        session.game_won,
+        session.deaths,
+        tuple(player.rect),
+        getattr(player, "hp", None),
+        getattr(player, "mana", None),
+        session.projectile_system.count,
+    ]
+    for e in session.enemies:
+        parts.append((type(e).__name__, tuple(e.rect), getattr(e, "hp", None), getattr(e, "dead", False)))
+    return zlib.crc32(repr(parts).encode("utf-8")) & 0xFFFFFFFF
+
+
+class _MaskKeys:
+    """Đổi mask bit <-> KeyState theo danh sách mã phím (cache mỗi mask một KeyState)."""
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self._states = {}
+
+    def mask_of(self, live):
+        mask = 0
+        for bit, key in enumerate(self.keys):
+            if live[key]:
+                mask |= 1 << bit
+        return mask
+
+    def state(self, mask):
+        state = self._states.get(mask)
+        if state is None:
+            state = KeyState(key for bit, key in enumerate(self.keys) if mask & (1 << bit))
+            self._states[mask] = state
+        return state
+
+
+class InputRecorder:
+    """
+    Ghi input theo tick của một GameSession; gán làm `player.input_source`.
+
+    `source`: nguồn phím thật (None = `pygame.key.get_pressed()`). Player chỉ thấy
+    các phím trong RECORDED_KEYS, đúng như lúc replay. Gọi `tick(dt)` thay cho
+    `session.tick(dt)` và `mark_event(EVENT_RESPAWN)` khi hồi sinh player ngoài tick.
+    """
+
+    def __init__(self, session, source=None, keys=RECORDED_KEYS, checkpoint_every=REPLAY_CHECKPOINT_TICKS):
+        self.session = session
+        self.source = source
+        self.checkpoint_every = max(0, int(checkpoint_every))
+        self._keys = _MaskKeys(keys)
+        self._current = KeyState()
+        self._pending_events = 0
+        self.records = bytearray()
+        self.ticks = 0
+        self.checkpoints = []  # [tick, checksum]
+        session.player.input_source = self
+
+    def __call__(self):
+        return self._current
+
+    def mark_event(self, flag):
+        self._pending_events |= flag
+
+    def tick(self, dt):
+        """Đọc phím thật, ghi bản ghi rồi chạy một tick của session."""
+        live = self.source() if self.source is not None else pygame.key.get_pressed()
+        mask = self._keys.mask_of(live)
+        self._current = self._keys.state(mask)
+        self.records += RECORD.pack(mask, self._pending_events, dt)
+        self._pending_events = 0
+        self.ticks += 1
+
+        session = self.session
+        session.tick(dt)
+        if self.checkpoint_every and session.ticks % self.checkpoint_every == 0:
+            self.checkpoints.append([session.ticks, session_checksum(session)])
+
+    def save(self, path=None):
+        """Ghi file replay; `path` None thì đặt tên theo nhân vật + thời gian trong REPLAY_DIR."""
+        session = self.session
+        if path is None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(REPLAY_DIR, f"{session.selected_char}_{stamp}.replay")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        meta = {
+            'character': session.selected_char,
+            'start_stage': session.start_stage,
+            'seed': session.seed,
+            'ticks': self.ticks,
+            'keys': list(self._keys.keys),
+            'checkpoints': self.checkpoints,
+            'final_checksum': session_checksum(session),
+            'recorded_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER.pack(VERSION, len(meta_bytes)))
+            f.write(meta_bytes)
+            f.write(zlib.compress(bytes(self.records), 9))
+        print(f"[REPLAY] Saved {self.ticks} ticks (seed={session.seed}) -> {path}")
+        return path
+
+
+def load_replay(path):
+    """Đọc file replay; trả về (meta, list các bản ghi (mask, cờ sự kiện, dt))."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path}: không phải file replay")
+    offset = len(MAGIC)
+    version, meta_len = HEADER.unpack_from(data, offset)
+    if version != VERSION:
+        raise ValueError(f"{path}: phiên bản replay {version} không hỗ trợ (cần {VERSION})")
+    offset += HEADER.size
+    meta = json.loads(data[offset:offset + meta_len].decode("utf-8"))
+    records = list(RECORD.iter_unpack(zlib.decompress(data[offset + meta_len:])))
+    return meta, records
+
+
+class ReplayInput:
+    """Nguồn phím phát lại: trả về trạng thái phím của tick hiện tại."""
+
+    def __init__(self, keys):
+        self._keys = _MaskKeys(keys)
+        self._current = KeyState()
+
+    def __call__(self):
+        return self._current
+
+    def set_mask(self, mask):
+        self._current = self._keys.state(mask)
+
+
+def replay(path, world=None, report_every=0):
+    """
+    Phát lại file replay không cửa sổ; trả về dict báo cáo (thời gian tick, có khớp không).
+
+    `deterministic` False khi checksum của một checkpoint hoặc trạng thái cuối khác
+    lúc ghi; `first_divergence_tick` là checkpoint đầu tiên bị lệch.
+    """
+    meta, records = load_replay(path)
+    character = meta['character']
+    start_stage = meta.get('start_stage', 0)
+
+    init_headless()
+    world = load_headless_world(character, start_stage, world)
+    session = GameSession(character, world, start_stage=start_stage, seed=meta['seed'])
+    replay_input = ReplayInput(meta['keys'])
+    session.player.input_source = replay_input
+    checkpoints = {tick: checksum for tick, checksum in meta.get('checkpoints', [])}
+
+    first_divergence = None
+    tick_ms = []
+    perf = time.perf_counter
+    start = perf()
+    for mask, events, dt in records:
+        session.pump_assets()
+        if events & EVENT_RESPAWN:
+            session.respawn_player()
+        replay_input.set_mask(mask)
+        t0 = perf()
+        session.tick(dt)
+        tick_ms.append((perf() - t0) * 1000.0)
+
+        expected = checkpoints.get(session.ticks)
+        if expected is not None and first_divergence is None and session_checksum(session) != expected:
+            first_divergence = session.ticks
+            print(f"[REPLAY] Diverged at tick {session.ticks}")
+        if report_every and session.ticks % report_every == 0:
+            print(f"[REPLAY] tick {session.ticks}/{len(records)}")
+    elapsed = perf() - start
+
+    final_ok = session_checksum(session) == meta.get('final_checksum')
+    return {
+        'file': path,
+        'character': character,
+        'seed': meta['seed'],
+        'ticks': session.ticks,
+        'sim_seconds': sum(r[2] for r in records),
+        'wall_seconds': elapsed,
+        'tick_ms': percentiles(tick_ms),
+        'deterministic': final_ok and first_divergence is None,
+        'first_divergence_tick': first_divergence,
+        'session': session.stats(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phát lại file replay không cửa sổ và đo thời gian tick")
+    parser.add_argument("path", help="file .replay (ghi khi REPLAY_RECORD_ENABLED hoặc headless --record)")
+    parser.add_argument("--report-every", type=int, default=0, help="in tiến độ mỗi N tick")
+    parser.add_argument("--json", action="store_true", help="in báo cáo dạng JSON")
+    args = parser.parse_args(argv)
+
+    report = replay(args.path, report_every=args.report_every)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        ms = report['tick_ms']
+        print(
+            f"[REPLAY] {report['ticks']} ticks ({report['sim_seconds']:.1f}s game) in "
+            f"{report['wall_seconds']:.2f}s: tick mean={ms['mean']:.3f}ms p50={ms['p50']:.3f}ms "
+            f"p95={ms['p95']:.3f}ms p99={ms['p99']:.3f}ms max={ms['max']:.3f}ms"
+        )
+        if report['deterministic']:
+            status = "OK"
+        elif report['first_divergence_tick'] is not None:
+            status = f"DIVERGED (tick {report['first_divergence_tick']})"
+        else:
+            status = "DIVERGED (final state)"
+        print(f"[REPLAY] determinism: {status}")
+    pygame.quit()
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,681 @@
+"""
+Trạng thái + logic của một lần chơi, tách khỏi cửa sổ và phần vẽ.
+
+Trước đây toàn bộ logic (tạo player, spawn stage, update enemy, projectile, skill,
+portal, boss, chuyển stage) nằm chung vòng lặp với `pygame.display` trong
+`run_game_session`. GameSession giữ các trạng thái đó và chạy một tick mô phỏng
+qua `tick(dt)`, không đọc event và không vẽ gì:
+
+- `run_game_session` (game/app.py) dùng nó cho cửa sổ game: event, nội suy, vẽ, HUD;
+- `game/headless.py` chạy nó với input kịch bản, không có display.
+"""
+import math
+
+import pygame
+
+from game.config import PLAYER_SCALE, ENEMY_UPDATES_PER_TICK
+from game.map_loader import PlatformView
+from game.player import Player
+from game.asset_streamer import AssetStreamer, PRIORITY_NOW, PRIORITY_NEXT, PRIORITY_BACKGROUND
+from game.projectile_system import ProjectileSystem
+from game.enemy_grid import EnemyGrid
+from game.enemy import PatrolEnemy
+from game.sim_clock import GameClock, game_time, sim_random
+from game.frame_timer import NULL_TIMER
+
+# Nếu package characters được cài, dùng factory để tạo nhân vật từ metadata
+try:
+    from game.characters.factory import create_player
+except Exception:
+    create_player = None
+
+# Try to import enemy registry helpers (optional)
+try:
+    from game.enemy_registry import create_enemy
+    from game.enemy_pool import EnemyPool
+    # Import enemy module to trigger registration
+    import game.enemy
+except Exception:
+    create_enemy = None
+    EnemyPool = None
+
+# Chỉ cập nhật enemies nằm trong vùng hoạt động (gần camera) để tránh update
+# nhiều đối tượng ở xa gây lag
+ACTIVITY_MARGIN = 800  # pixels mở rộng quanh camera để 'kích hoạt' enemy
+
+
+def build_stages():
+    """Cấu hình các giai đoạn (enemy, boss, vị trí spawn)."""
+    return [
+        {
+            'name': 'Stage 1',
+            'enemy_count': 5,
+            'spawn_center': (2649, 9200),
+            'enemy_types': ['Golem_02', 'Golem_03', 'minotaur_01', 'Wraith_01'],
+            'boss': 'Troll1'
+        },
+        {
+            'name': 'Stage 2',
+            'enemy_count': 7,
+            'spawn_center': (2649, 9200),  # Spawn gần player để test
+            'enemy_types': ['minotaur_01', 'minotaur_02', 'Wraith_01', 'Wraith_03'],
+            'boss': 'Troll1'
+        },
+        {
+            'name': 'Stage 3',
+            'enemy_count': 10,
+            'spawn_center': (2649, 9200),  # Spawn theo vị trí player
+            'enemy_types': ['Golem_02', 'Golem_03', 'minotaur_01', 'minotaur_02', 'Wraith_01', 'Wraith_03'],
+            'boss': 'Troll1'
+        }
+    ]
+
+
+def stream_stage_assets(stages, current_stage=0):
+    """
+    Xếp hàng stream sprite enemy của các stage từ `current_stage` trở đi.
+
+    Stage hiện tại được ưu tiên nhất, rồi tới stage kế tiếp, các stage sau load nền.
+    Trả về list StreamTask (dùng cho progress / wait).
+    """
+    streamer = AssetStreamer()
+    tasks = []
+    for index in range(current_stage, len(stages)):
+        stage = stages[index]
+        if index == current_stage:
+            priority = PRIORITY_NOW
+        elif index == current_stage + 1:
+            priority = PRIORITY_NEXT
+        else:
+            priority = PRIORITY_BACKGROUND
+        enemy_types = list(stage.get('enemy_types', []))
+        if stage.get('boss'):
+            enemy_types.append(stage['boss'])
+        tasks.extend(streamer.request_characters(enemy_types, priority))
+    return tasks
+
+
+def is_boss(enemy):
+    # Boss luôn được update và vẽ (không bị giới hạn bởi active_rect)
+    return hasattr(enemy, "__class__") and "Boss" in enemy.__class__.__name__
+
+
+def create_session_player(selected_char, spawn):
+    """
+    Tạo player cho nhân vật được chọn tại object spawn của map (None = vị trí mặc định).
+
+    Trả về (player, spawn_pos); spawn_pos là toạ độ chân (midbottom) của player.
+    """
+    if spawn:
+        sx = int(spawn.get("x", 20))
+        sy = int(spawn.get("y", 20))
+        spawn_pos = (sx, sy)
+        # Tạo player dựa trên nhân vật được chọn
+        try:
+            print(f"Creating player with selected character: {selected_char}")
+
+            # Ưu tiên sử dụng factory để tạo player từ metadata
+            if create_player:
+                player = create_player(selected_char, sx, sy)
+                player.character_type = (
+                    selected_char  # Set character type for reference
+                )
+                print(f"Created {selected_char} player using factory: {type(player)}")
+
+                # Debug thông tin về các frames đã load
+                print(f"Loaded animations for {selected_char}:")
+                for state, frames in player.animations.items():
+                    print(f"  {state}: {len(frames)} frames")
+            else:
+                # Fallback: tạo player cơ bản nếu factory không khả dụng
+                player = Player(sx, sy)
+                player.character_type = selected_char
+                print(f"Created basic player (factory not available)")
+
+            # Áp dụng scale cho player
+            if hasattr(player, "image") and player.image:
+                current_rect = player.image.get_rect()
+                new_width = int(current_rect.width * PLAYER_SCALE)
+                new_height = int(current_rect.height * PLAYER_SCALE)
+                player.image = pygame.transform.scale(
+                    player.image, (new_width, new_height)
+                )
+
+        except Exception as e:
+            print(f"Error creating player: {e}")
+            import traceback
+
+            traceback.print_exc()
+            # fallback an toàn nếu có lỗi
+            print(f"FALLBACK: Creating basic Player because of error")
+            player = Player(sx, sy)
+            player.character_type = "fallback"
+    else:
+        print("WARNING: No spawn point found in map, using default position")
+        spawn_pos = (1200, 9200)
+        # Vẫn sử dụng nhân vật được chọn ngay cả khi không có spawn point
+        if create_player:
+            try:
+                print(
+                    f"Creating selected character {selected_char} at default position"
+                )
+                player = create_player(selected_char, *spawn_pos)
+                player.character_type = selected_char
+            except Exception:
+                print("FALLBACK: Creating basic Player because factory failed")
+                player = Player(*spawn_pos)
+                player.character_type = "basic_fallback"
+        else:
+            print("FALLBACK: Creating basic Player because no factory or characters")
+            player = Player(*spawn_pos)
+            player.character_type = "no_factory_fallback"
+
+    # Căn toạ độ spawn theo chân (midbottom) để khớp cách Tiled hiển thị point/rect
+    try:
+        player.rect.midbottom = spawn_pos
+    except Exception:
+        pass
+    return player, spawn_pos
+
+
+class GameSession:
+    def __init__(self, selected_char, world, start_stage=0, sound_manager=None, seed=None):
+        """
+        `world` là WorldAssets đã load (hoặc vừa reset); `start_stage` cho phép vào
+        thẳng một stage (soak test / benchmark).
+
+        `seed`: seed cho RNG mô phỏng (spawn enemy, boss); None = ngẫu nhiên. Đồng hồ
+        game về 0 ở đây nên cùng seed + cùng input cho ra cùng một session (xem game/replay.py).
+        """
+        self.selected_char = selected_char
+        self.start_stage = start_stage
+        self.seed = GameClock().reset(seed)
+        # Đo thời gian từng bước update (bench / profiler gán SectionTimer, xem game/frame_timer.py)
+        self.timer = NULL_TIMER
+        self.world = world
+        self.platforms = world.platforms
+        self.moving_platform_manager = world.moving_platform_manager
+        self.portal_manager = world.portal_manager
+        self.map_w, self.map_h = world.map_w, world.map_h
+        self.view_w = world.view_w
+        self.view_h = world.view_h
+        self.sound_manager = sound_manager
+
+        # Tạo nhân vật: object spawn trong map (tìm theo name hoặc type, xem WorldAssets)
+        self.player, self.spawn_pos = create_session_player(selected_char, world.player_spawn)
+
+        # ============================================
+        # HỆ THỐNG GIAI ĐOẠN (STAGES)
+        # ============================================
+        # Cấu hình các giai đoạn (tạo mới mỗi session vì spawn_center bị ghi đè khi chơi)
+        self.stages = build_stages()
+        self.current_stage = max(0, min(int(start_stage), len(self.stages) - 1))
+
+        # Enemy chết được trả về pool và tái sử dụng ở stage sau (không cấp phát lại)
+        self.enemy_pool = EnemyPool() if create_enemy else None
+
+        # Projectile của player và enemy (mảng dùng chung), bỏ viên còn sót từ session trước
+        self.projectile_system = ProjectileSystem()
+        self.projectile_system.clear()
+        # Spatial hash của enemy, dựng lại mỗi tick cho skill / projectile tra va chạm
+        self.enemy_grid = EnemyGrid()
+
+        self._preload_stage_enemies()
+
+        # Spawn stage đầu
+        self.enemies, self.initial_enemies_ids = self.spawn_stage_enemies(self.current_stage)
+        self.initial_enemy_count = self.stages[self.current_stage]['enemy_count']  # Lấy số lượng từ config
+
+        print(f"[SPAWN] Boss will appear after defeating all {self.initial_enemy_count} enemies")
+
+        # Verify we have enough enemies
+        if len(self.enemies) != self.initial_enemy_count:
+            print(f"[WARNING] Expected {self.initial_enemy_count} enemies but got {len(self.enemies)}")
+        else:
+            print(f"[SUCCESS] All {self.initial_enemy_count} enemies spawned successfully!")
+
+        # Boss tracking variables
+        self.boss_spawned = False
+        self.boss_instance = None
+        self.initial_enemies_killed = 0
+        self.boss_spawn_message_timer = 0.0  # Timer cho thông báo boss spawn
+        self.boss_spawn_message_duration = 5.0  # Hiển thị 5 giây
+
+        # Stage transition notification (phần vẽ tự trừ timer theo thời gian thực)
+        self.stage_notification = ""
+        self.stage_notification_type = "normal"  # "cleared", "new_stage", "victory"
+        self.stage_notification_timer = 0.0
+        self.game_won = False  # Track if player has won the game
+
+        self.ticks = 0
+        self.deaths = 0
+
+    # ------------------------------------------------------------------
+    # Spawn / preload
+    # ------------------------------------------------------------------
+    def _preload_stage_enemies(self):
+        """Load sẵn enemy + boss của stage hiện tại, các stage sau stream nền và tạo sẵn trong pool."""
+        stages = self.stages
+        # Số instance tạo sẵn trong pool cho từng enemy type:
+        # phần chia đều của stage đông nhất (+1 dự phòng)
+        prewarm_counts = {}
+        for stage in stages:
+            stage_types = stage.get('enemy_types', [])
+            if stage_types:
+                share = math.ceil(stage['enemy_count'] / len(stage_types)) + 1
+                for enemy_type in stage_types:
+                    prewarm_counts[enemy_type] = max(prewarm_counts.get(enemy_type, 0), share)
+            if stage.get('boss'):
+                prewarm_counts[stage['boss']] = max(prewarm_counts.get(stage['boss'], 0), 1)
+        self.prewarm_counts = prewarm_counts
+
+        # Chỉ chờ enemy + boss của stage hiện tại (đã load sẵn ở loading screen);
+        # các stage sau stream nền theo thứ tự ưu tiên, xem stream_stage_assets
+        self.asset_streamer = AssetStreamer()
+        stage_tasks = stream_stage_assets(stages, self.current_stage)
+        first_stage_types = list(stages[self.current_stage].get('enemy_types', []))
+        if stages[self.current_stage].get('boss'):
+            first_stage_types.append(stages[self.current_stage]['boss'])
+        if create_enemy:
+            from game.characters.factory import preload_enemies
+            preload_enemies(
+                first_stage_types,
+                prewarm={enemy_type: prewarm_counts[enemy_type] for enemy_type in first_stage_types},
+            )
+
+        # Enemy của các stage sau: stream xong loại nào thì tạo sẵn trong pool, mỗi frame một instance
+        self.pending_prewarm = []
+        if self.enemy_pool is not None:
+            for task in stage_tasks:
+                if task.name not in first_stage_types and all(t.name != task.name for t in self.pending_prewarm):
+                    self.pending_prewarm.append(task)
+
+    def pump_assets(self):
+        """Hoàn tất asset load nền (convert_alpha) trong giới hạn ms; gọi mỗi frame."""
+        self.asset_streamer.pump()
+        pending = self.pending_prewarm
+        if pending and pending[0].done:
+            task = pending[0]
+            if self.enemy_pool.prewarm(task.name, self.prewarm_counts.get(task.name, 0), limit=1) == 0:
+                pending.pop(0)
+
+    def spawn_stage_enemies(self, stage_index):
+        """Spawn enemies cho giai đoạn cụ thể"""
+        stages = self.stages
+        if stage_index >= len(stages):
+            print(f"[STAGE] No more stages!")
+            return [], []
+
+        stage = stages[stage_index]
+        # Compact log để spawn nhanh hơn
+        print(f"[STAGE] {stage['name']}: Spawning {stage['enemy_count']} enemies at {stage['spawn_center']}")
+
+        rng = sim_random()
+        stage_enemies = []
+        stage_enemy_ids = []
+        enemy_count = stage['enemy_count']
+        spawn_center = stage['spawn_center']
+        enemy_types = stage.get('enemy_types', ['Golem_02', 'Golem_03'])
+
+        if create_enemy:
+            # Batch spawn để tăng tốc độ
+            for i in range(enemy_count):
+                angle = rng.uniform(0, 2 * math.pi)
+                distance = rng.uniform(50, 150)
+                ex = int(spawn_center[0] + math.cos(angle) * distance)
+                ey = int(spawn_center[1] + math.sin(angle) * distance)
+
+                eid = rng.choice(enemy_types)
+                inst = None
+                try:
+                    inst = self.enemy_pool.acquire(eid, ex, ey)
+                    # Tắt log chi tiết để spawn nhanh hơn
+                except Exception as e:
+                    # Silent fallback
+                    try:
+                        inst = PatrolEnemy(ex, ey)
+                    except Exception:
+                        pass
+
+                if inst:
+                    stage_enemies.append(inst)
+                    stage_enemy_ids.append(id(inst))
+        else:
+            # Fallback
+            for i in range(enemy_count):
+                angle = rng.uniform(0, 2 * math.pi)
+                distance = rng.uniform(50, 150)
+                ex = int(spawn_center[0] + math.cos(angle) * distance)
+                ey = int(spawn_center[1] + math.sin(angle) * distance)
+                inst = PatrolEnemy(ex, ey)
+                stage_enemies.append(inst)
+                stage_enemy_ids.append(id(inst))
+
+        # Ensure enough enemies (fallback spawn if needed)
+        while len(stage_enemies) < enemy_count:
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(50, 150)
+            ex = int(spawn_center[0] + math.cos(angle) * distance)
+            ey = int(spawn_center[1] + math.sin(angle) * distance)
+            try:
+                inst = PatrolEnemy(ex, ey)
+                stage_enemies.append(inst)
+                stage_enemy_ids.append(id(inst))
+            except Exception:
+                break
+
+        print(f"[STAGE] ✓ Spawned {len(stage_enemies)}/{enemy_count} enemies")
+        return stage_enemies, stage_enemy_ids
+
+    # ------------------------------------------------------------------
+    # Camera / vùng hoạt động (dùng chung cho mô phỏng và phần vẽ)
+    # ------------------------------------------------------------------
+    def camera_for(self, rect):
+        """Góc camera căn giữa `rect`, kẹp trong map (map nhỏ hơn vùng nhìn thì camera = 0)."""
+        max_camera_x = max(0, self.map_w - self.view_w)
+        max_camera_y = max(0, self.map_h - self.view_h)
+        return (
+            max(0, min(rect.centerx - self.view_w // 2, max_camera_x)),
+            max(0, min(rect.centery - self.view_h // 2, max_camera_y)),
+        )
+
+    def activity_rect(self, camera_x, camera_y):
+        """Vùng quanh camera mà enemy trong đó được update và vẽ."""
+        return pygame.Rect(
+            camera_x - ACTIVITY_MARGIN,
+            camera_y - ACTIVITY_MARGIN,
+            self.view_w + ACTIVITY_MARGIN * 2,
+            self.view_h + ACTIVITY_MARGIN * 2,
+        )
+
+    def alive_initial(self):
+        """Số enemy ban đầu của stage còn sống."""
+        current_ids = {id(e) for e in self.enemies if not getattr(e, "dead", False)}
+        return sum(1 for eid in self.initial_enemies_ids if eid in current_ids)
+
+    def respawn_player(self):
+        """Respawn: hồi HP và đưa player về vị trí spawn."""
+        player = self.player
+        try:
+            player.hp = getattr(player, "max_hp", 100)
+            player.alive = True
+            player.rect.midbottom = self.spawn_pos
+            player.state = "idle"
+            player.current_frame = 0
+            player.vel_x = 0
+            player.vel_y = 0
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Một tick mô phỏng
+    # ------------------------------------------------------------------
+    def tick(self, dt):
+        """Chạy logic một tick dài `dt` giây: player, platform, portal, enemy, projectile, skill, stage."""
+        player = self.player
+        player_alive = getattr(player, "alive", True)
+        was_alive = player_alive
+
+        # Logic game - only run updates when player is alive. When dead,
+        # the caller still draws the last frame and handles respawn or quit.
+        if player_alive:
+            self._update_player(dt)
+        else:
+            # freeze velocities to avoid physics progressing while dead
+            try:
+                player.vel_x = 0
+                player.vel_y = 0
+            except Exception:
+                pass
+
+        if player_alive:
+            with self.timer.section("update.enemies"):
+                self._update_enemies(dt)
+            self._update_combat(dt)
+
+        with self.timer.section("update.stage"):
+            self._update_stage()
+
+        if was_alive and not getattr(player, "alive", True):
+            self.deaths += 1
+        self.ticks += 1
+        GameClock().advance(dt)
+
+    def _update_player(self, dt):
+        player = self.player
+        timer = self.timer
+        # Update mana regeneration
+        player.update_mana(dt)
+
+        with timer.section("update.input"):
+            player.handle_input(dt)
+        # update skills with delta seconds (e.g. dash)
+        if hasattr(player, "update_skills"):
+            with timer.section("update.skills"):
+                player.update_skills(dt)
+
+        # Update moving platforms TRƯỚC để player collision với vị trí mới
+        with timer.section("update.moving_platforms"):
+            self.moving_platform_manager.update(dt)
+
+        with timer.section("update.player_physics"):
+            self._move_player(dt)
+
+    def _move_player(self, dt):
+        player = self.player
+        # Kết hợp static platforms (có grid) với moving platforms cho collision,
+        # không copy list tĩnh mỗi frame; player tự truy vấn vùng lân cận.
+        moving_platform_rects = self.moving_platform_manager.get_platforms_for_collision()
+        all_platforms = PlatformView(self.platforms, moving_platform_rects)
+
+        # Use consolidated move() which applies gravity and resolves collisions
+        player.move(all_platforms, dt)
+
+        # Check portal collision và teleport
+        portal = self.portal_manager.check_player_collision(player.rect)
+        if portal:
+            self.portal_manager.teleport_player(player, portal)
+
+        # Check and restore speed after slow effect expires
+        if hasattr(player, "is_slowed") and player.is_slowed:
+            if (
+                hasattr(player, "slowed_until")
+                and game_time() >= player.slowed_until
+            ):
+                # Restore original speed
+                if hasattr(player, "_original_speed"):
+                    player.speed = player._original_speed
+                player.is_slowed = False
+
+        player.update_animation(dt)
+
+    def _update_enemies(self, dt):
+        # Enemies tự truy vấn grid quanh vị trí của mình (platforms_in_rect),
+        # nên chỉ cần truyền thẳng danh sách platforms có chỉ mục.
+        player = self.player
+        platforms = self.platforms
+        active_rect = self.activity_rect(*self.camera_for(player.rect))
+        for e in self.enemies:
+            # Nếu enemy nằm trong vùng hoạt động HOẶC là Boss thì cập nhật;
+            # ở xa thì bỏ qua hoàn toàn để tiết kiệm CPU
+            if is_boss(e) or e.rect.colliderect(active_rect):
+                # Cố ý update nhiều lần mỗi tick để giữ tốc độ enemy như vòng lặp gốc
+                # (xem ENEMY_UPDATES_PER_TICK), không phải vì Boss ở xa player
+                for _ in range(ENEMY_UPDATES_PER_TICK):
+                    e.update(dt, platforms, player)
+
+    def _update_combat(self, dt):
+        # Projectile: tích phân + va chạm (player -> enemy, enemy -> player) cho cả lô
+        player = self.player
+        with self.timer.section("update.projectiles"):
+            self.enemy_grid.rebuild(self.enemies)
+            self.projectile_system.step(dt)
+            self.projectile_system.resolve_hits(player, self.enemy_grid)
+
+        # Va chạm của các skill còn lại (explosion, melee...),
+        # bỏ qua hẳn skill đang không hoạt động
+        with self.timer.section("update.skill_hits"):
+            for name, s in getattr(player, "skills", {}).items():
+                if (
+                    not isinstance(s, dict)
+                    and getattr(s, "active", False)
+                    and hasattr(s, "handle_collisions")
+                ):
+                    try:
+                        s.handle_collisions(self.enemy_grid)
+                    except Exception:
+                        pass
+
+    def _update_stage(self):
+        stages = self.stages
+        player = self.player
+
+        # Track initial enemies killed and spawn boss when all are defeated
+        if not self.boss_spawned and len(self.initial_enemies_ids) > 0:
+            # Count how many initial enemies are still alive
+            alive_initial = self.alive_initial()
+            self.initial_enemies_killed = self.initial_enemy_count - alive_initial
+
+            # If all initial enemies are dead, spawn boss
+            if alive_initial == 0:
+                print(f"\n{'='*50}")
+                print(f"[BOSS] All {self.initial_enemy_count} enemies defeated!")
+
+                # Show stage cleared notification IMMEDIATELY
+                self.stage_notification = f"{stages[self.current_stage]['name'].upper()} CLEARED!"
+                self.stage_notification_type = "cleared"
+                # Stage 1: 6s, Stage 2: 8s, Stage 3: 8s
+                if self.current_stage == 0:
+                    self.stage_notification_timer = 6.0
+                else:
+                    self.stage_notification_timer = 8.0
+
+                print(f"[BOSS] Spawning BOSS near player...")
+                print(f"[BOSS] Current player position: X={player.rect.centerx}, Y={player.rect.centery}")
+                print(f"{'='*50}\n")
+
+                if create_enemy:
+                    self._spawn_boss()
+
+        # Remove dead enemies from the list to avoid further processing
+        if self.enemy_pool is not None:
+            # Trả enemy đã chết về pool để stage sau dùng lại
+            self.enemies = self.enemy_pool.release_dead(self.enemies)
+        else:
+            self.enemies = [en for en in self.enemies if not getattr(en, "dead", False)]
+
+        # Check if boss is dead and spawn next stage
+        if self.boss_instance and getattr(self.boss_instance, "dead", False) and self.current_stage < len(stages):
+            print(f"Boss defeated! Stage {self.current_stage + 1} completed!")
+            self.current_stage += 1
+            if self.current_stage < len(stages):
+                stage = stages[self.current_stage]
+                print(f"Spawning {stage['name']}...")
+                # Show NEW stage notification - VERY LONG
+                self.stage_notification = f"{stage['name'].upper()} - {stage['enemy_count']} ENEMIES!"
+                self.stage_notification_type = "new_stage"
+                self.stage_notification_timer = 10.0  # 10 giây
+
+                # Override spawn center to player's current position for easier testing
+                stage['spawn_center'] = (player.rect.centerx, player.rect.centery)
+                print(f"[STAGE] Player position: ({player.rect.centerx}, {player.rect.centery})")
+                # Stage kế tiếp của stage mới lên ưu tiên NEXT
+                stream_stage_assets(stages, self.current_stage)
+                # Replace enemies with new stage enemies, reset to only new stage enemies
+                self.enemies, self.initial_enemies_ids = self.spawn_stage_enemies(self.current_stage)
+                self.initial_enemy_count = stage['enemy_count']
+                self.boss_spawned = False
+                self.boss_instance = None
+            else:
+                print("All stages completed! You win!")
+                # Show VICTORY notification
+                self.stage_notification = "VICTORY! ALL STAGES COMPLETED!"
+                self.stage_notification_type = "victory"
+                self.stage_notification_timer = 15.0  # 15 giây để tận hưởng chiến thắng
+                self.game_won = True  # Mark game as won
+
+    def _spawn_boss(self):
+        player = self.player
+        platforms = self.platforms
+        try:
+            # Tìm platform gần player để spawn boss
+            offset = sim_random().choice([250, 300, 350])
+            boss_x = int(player.rect.centerx + offset)
+
+            # Tìm platform phía dưới player (hoặc gần player)
+            nearest_platform_y = None
+            search_radius = 2000  # Tìm trong bán kính 2000px
+
+            print(f"[BOSS] Searching for platform near player...")
+            for _, platform_rect in platforms:
+                # Tìm platform gần vị trí boss_x
+                if abs(platform_rect.centerx - boss_x) < 1000:
+                    # Platform phải ở dưới player hoặc gần player (trong range ±2000)
+                    if abs(platform_rect.top - player.rect.centery) < search_radius:
+                        if nearest_platform_y is None or abs(platform_rect.top - player.rect.centery) < abs(nearest_platform_y - player.rect.centery):
+                            nearest_platform_y = platform_rect.top
+
+            # Nếu tìm thấy platform, spawn trên đó
+            if nearest_platform_y is not None:
+                boss_y = nearest_platform_y
+                print(f"[BOSS] Found platform at Y={boss_y} (distance from player: {abs(boss_y - player.rect.centery)}px)")
+            else:
+                # Không tìm thấy - tìm platform gần nhất bất kỳ
+                print(f"[BOSS WARNING] No platform near player, searching globally...")
+                for _, platform_rect in platforms:
+                    if nearest_platform_y is None or abs(platform_rect.top - player.rect.centery) < abs(nearest_platform_y - player.rect.centery):
+                        nearest_platform_y = platform_rect.top
+
+                if nearest_platform_y:
+                    boss_y = nearest_platform_y
+                    print(f"[BOSS] Found global platform at Y={boss_y}")
+                else:
+                    boss_y = player.rect.centery
+                    print(f"[BOSS ERROR] No platform found at all! Using player Y={boss_y}")
+
+            print(f"[BOSS] Calculating spawn position...")
+            print(f"[BOSS] Player X: {player.rect.centerx}, Boss offset: +{offset}")
+            print(f"[BOSS] Boss will spawn at: ({boss_x}, {boss_y})")
+
+            self.boss_instance = self.enemy_pool.acquire(self.stages[self.current_stage]['boss'], boss_x, boss_y)
+            self.enemies.append(self.boss_instance)
+            self.boss_spawned = True
+            self.boss_spawn_message_timer = self.boss_spawn_message_duration  # Bật thông báo
+
+            distance_x = boss_x - player.rect.centerx
+            distance_y = abs(boss_y - player.rect.centery)
+            print(f"[BOSS] ✅ TROLL BOSS spawned successfully!")
+            print(f"[BOSS] Boss position: ({boss_x}, {boss_y})")
+            print(f"[BOSS] Player position: ({player.rect.centerx}, {player.rect.centery})")
+            print(f"[BOSS] Distance X: {distance_x} pixels, Distance Y: {distance_y} pixels")
+            if distance_y < 500:
+                print(f"[BOSS] Boss is on same level as player!")
+            else:
+                print(f"[BOSS] Boss is on different level - navigate to Y={boss_y}")
+            print(f"{'='*50}\n")
+
+            # Play boss spawn sound if available
+            if self.sound_manager is not None:
+                try:
+                    self.sound_manager.play_sound("boss_spawn")
+                except Exception:
+                    pass
+
+        except Exception as e:
+            print(f"[ERROR] Failed to spawn Boss: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def stats(self):
+        return {
+            'ticks': self.ticks,
+            'seed': self.seed,
+            'stage': self.current_stage,
+            'enemies': len(self.enemies),
+            'alive_initial': self.alive_initial(),
+            'boss_spawned': self.boss_spawned,
+            'game_won': self.game_won,
+            'player_hp': getattr(self.player, "hp", None),
+            'deaths': self.deaths,
+            'projectiles': self.projectile_system.count,
+        }
@@ -0,0 +1,452 @@
+"""
+Phần vẽ của một GameSession: các layer của map, nhân vật, projectile, HUD, banner.
+
+Trước đây toàn bộ code vẽ nằm trong vòng lặp của `run_game_session`. SessionView
+gom lại để cửa sổ game (game/app.py) và bench (bench/run.py) vẽ cùng một đường
+code; mỗi layer được bọc trong `timer.section("draw.<tên>")` (xem game/frame_timer.py)
+nên bench đo được từng phần mà không phải chép lại vòng lặp vẽ.
+
+Thứ tự mỗi frame: `update(frame_dt)`, `draw_world(...)` (trong `Interpolator.apply`
+nếu có nội suy), `present()`, `draw_hud(fps)`, rồi `pygame.display.flip()`.
+"""
+import math
+import random
+
+import pygame
+
+from game.config import WIDTH, HEIGHT, BG_TINT_ENABLED, BG_TINT_COLOR, BG_TINT_ALPHA
+from game.hud import HudRenderer, OUTLINE_4_WIDE, OUTLINE_8
+from game.banner import BannerRenderer
+from game.sim_clock import game_time
+from game.frame_timer import NULL_TIMER
+from game.render_targets import mark_drawn
+from game.session import is_boss
+
+
+class SessionView:
+    def __init__(self, screen, world, session):
+        self.screen = screen
+        self.world = world
+        self.session = session
+        self.timer = NULL_TIMER
+        # HUD: font + chữ cache, widget chỉ render lại khi giá trị đổi
+        self.hud = HudRenderer(screen)
+        # Banner stage / VICTORY dựng sẵn (viền + glow + shadow trong một surface)
+        self.banners = BannerRenderer(screen)
+        self.banners.prewarm_victory()
+
+    def update(self, frame_dt):
+        """Phần chạy theo thời gian thực của frame: animated decor, timer thông báo stage."""
+        # Update animated decorations (always update, even when player is dead)
+        self.world.animated_decor_manager.update(frame_dt)
+        session = self.session
+        if session.stage_notification_timer > 0:
+            session.stage_notification_timer -= frame_dt
+
+    # ------------------------------------------------------------------
+    # World
+    # ------------------------------------------------------------------
+    def draw_world(self, lag=0.0, show_hitboxes=False):
+        """
+        Vẽ map + nhân vật + projectile vào render target.
+
+        `lag` (giây): projectile lùi về vị trí nội suy, xem ProjectileSystem.draw.
+        """
+        world = self.world
+        session = self.session
+        player = session.player
+        render_targets = world.render_targets
+        map_w, map_h = world.map_w, world.map_h
+        timer = self.timer
+
+        # Kích thước vùng nhìn theo zoom (surface được RenderTargets cấp phát sẵn)
+        render_w = render_targets.view_w
+        render_h = render_targets.view_h
+
+        # Camera bám theo vị trí vẽ (đã nội suy) của player
+        camera_x, camera_y = session.camera_for(player.rect)
+
+        with timer.section("draw.backdrop"):
+            # Backdrop (layer tĩnh): world surface, hoặc thẳng ảnh output ở chế độ prescaled.
+            # Đã được xoá đen (area outside map will remain black)
+            backdrop_surface = render_targets.begin_backdrop()
+
+            # Draw sky inside the map area only (so outside map stays black).
+            # The map is at world coords starting at (0,0); relative to camera its
+            # top-left is (-camera_x, -camera_y).
+            try:
+                sky_rect = render_targets.backdrop_rect(-camera_x, -camera_y, map_w, map_h)
+                pygame.draw.rect(backdrop_surface, (135, 206, 235), sky_rect)
+            except Exception:
+                # If drawing sky fails for any reason, we silently continue with black background
+                pass
+
+        # === VẼ THEO THỨ TỰ LAYER (từ dưới lên trên) ===
+
+        # Create a camera rect once and reuse to avoid per-object allocations
+        camera_rect = pygame.Rect(camera_x, camera_y, render_w, render_h)
+
+        # 1. Vẽ Object_Decor2_Tinh (dưới cùng)
+        with timer.section("draw.decor2"):
+            world.decor2_index.draw(backdrop_surface, camera_x, camera_y, render_w, render_h)
+
+        # 2. Vẽ Object_Decor1_animation (animated decorations)
+        with timer.section("draw.animated_decor"):
+            world.animated_decor_manager.draw(backdrop_surface, camera_x, camera_y, render_w, render_h)
+
+        # 3. Phủ nền màu mờ (BG tint) TRƯỚC Object Layer 1 để nằm sau nó và trên Decor layers
+        if BG_TINT_ENABLED:
+            with timer.section("draw.tint"):
+                try:
+                    map_rect = pygame.Rect(0, 0, map_w, map_h)
+                    visible = map_rect.clip(camera_rect)
+                    if visible.width > 0 and visible.height > 0:
+                        # Overlay dựng sẵn trong RenderTargets, không tạo Surface mới mỗi frame
+                        tint_rect = render_targets.backdrop_rect(
+                            visible.x - camera_x, visible.y - camera_y, visible.width, visible.height
+                        )
+                        render_targets.draw_tint(backdrop_surface, tint_rect, BG_TINT_COLOR, BG_TINT_ALPHA)
+                except Exception:
+                    pass
+
+        # 4. Vẽ Object Layer 1 (static decorative objects)
+        with timer.section("draw.layer1"):
+            world.layer1_index.draw(backdrop_surface, camera_x, camera_y, render_w, render_h)
+
+        # 5. Vẽ tile layer "nen" (trên cùng) từ các chunk đã bake sẵn.
+        # Tile được bake theo toạ độ gốc của Tiled (không dùng inset),
+        # inset chỉ dùng cho va chạm.
+        with timer.section("draw.nen"):
+            world.nen_layer_cache.draw(backdrop_surface, camera_x, camera_y, render_w, render_h)
+
+        # Lớp nhân vật/hiệu ứng (toạ độ world). Ở chế độ thường đây chính là backdrop.
+        render_surface = render_targets.begin_actors()
+
+        # Draw portals (vẽ trước moving platforms)
+        with timer.section("draw.portals"):
+            world.portal_manager.draw(render_surface, camera_x, camera_y, render_w, render_h)
+
+        # Draw moving platforms (vẽ sau portals)
+        with timer.section("draw.moving_platforms"):
+            world.moving_platform_manager.draw(render_surface, camera_x, camera_y, render_w, render_h)
+
+        # Nếu bật debug, vẽ hitbox của từng bức tường (chỉ phần đang trong camera)
+        if show_hitboxes:
+            for _, rect in world.platforms.platforms_in_rect(camera_rect):
+                if (
+                    rect.right > camera_x
+                    and rect.left < camera_x + render_w
+                    and rect.bottom > camera_y
+                    and rect.top < camera_y + render_h
+                ):
+                    draw_rect = pygame.Rect(
+                        rect.x - camera_x, rect.y - camera_y, rect.width, rect.height
+                    )
+                    # Vẽ outline đỏ dày 2px
+                    mark_drawn(render_surface, pygame.draw.rect(render_surface, (255, 0, 0), draw_rect, 2))
+
+        # Vẽ nhân vật
+        with timer.section("draw.player"):
+            player.draw(render_surface, camera_x, camera_y)
+
+        with timer.section("draw.enemies"):
+            active_rect = session.activity_rect(camera_x, camera_y)
+            for e in session.enemies:
+                if is_boss(e) or e.rect.colliderect(active_rect):
+                    e.draw(render_surface, camera_x, camera_y, show_hitboxes)
+
+        # Projectile vẽ trên cùng, lùi về vị trí nội suy. Ở chế độ prescaled ghép lớp
+        # actor trước rồi vẽ thẳng lên output với frame đã scale sẵn theo zoom
+        with timer.section("draw.projectiles"):
+            session.projectile_system.draw(
+                render_targets.flush_actors(), camera_x, camera_y, render_w, render_h, lag=lag,
+                zoom=render_targets.backdrop_zoom,
+            )
+
+    def present(self):
+        """Scale ra màn hình (vào surface output dùng lại, không cấp phát mới)."""
+        with self.timer.section("draw.present"):
+            self.world.render_targets.present(self.screen)
+
+    # ------------------------------------------------------------------
+    # HUD
+    # ------------------------------------------------------------------
+    def draw_hud(self, fps=0.0, show_hitboxes=False):
+        """HUD trên màn hình: trạng thái, thông báo stage / VICTORY, thanh HP/energy, màn chết."""
+        timer = self.timer
+        with timer.section("draw.hud"):
+            self._draw_status(fps, show_hitboxes)
+        if self.session.stage_notification_timer > 0:
+            with timer.section("draw.banners"):
+                self._draw_stage_notification()
+        with timer.section("draw.hud_player"):
+            self._draw_player_bars()
+            self._draw_death_overlay()
+
+    def _draw_status(self, fps, show_hitboxes):
+        hud = self.hud
+        session = self.session
+        player = session.player
+
+        # Visual feedback khi bị slow
+        if hasattr(player, "is_slowed") and player.is_slowed:
+            # Overlay màu tím trong suốt
+            hud.overlay((128, 0, 255), 30)
+
+            # Hiển thị text SLOWED!
+            if hasattr(player, "slowed_until"):
+                remaining = max(0, player.slowed_until - game_time())
+                hud.text(
+                    "slowed",
+                    f"SLOWED! ({remaining:.1f}s)",
+                    24,
+                    (255, 0, 255),
+                    center=(WIDTH // 2, 100),
+                )
+
+        # Hiển thị FPS
+        hud.text("fps", f"FPS: {int(fps)}", 24, (0, 0, 0), pos=(10, 10))
+        # Hint nhỏ cho toggle hitbox
+        hud.text(
+            "hitbox_hint",
+            f"H: Toggle wall hitboxes ({'ON' if show_hitboxes else 'OFF'})",
+            24,
+            (0, 0, 0),
+            pos=(10, 40),
+        )
+
+        # Hiển thị thông tin về enemies và boss
+        if not session.boss_spawned:
+            # Count alive initial enemies
+            enemies_remaining = session.alive_initial()
+
+            # Chữ có viền đen (bake sẵn, chỉ render lại khi số enemy đổi)
+            hud.text(
+                "enemy_info",
+                f"Enemies: {enemies_remaining}/{len(session.initial_enemies_ids)}",
+                28,
+                (255, 0, 0) if enemies_remaining > 0 else (0, 255, 0),
+                center=(WIDTH // 2, 50),
+                bold=True,
+                outline=(0, 0, 0),
+                offsets=OUTLINE_8,
+            )
+        else:
+            # Boss spawned - show boss warning
+            # Flashing effect (nhấp nháy theo thời gian thực, kể cả lúc pause logic)
+            if int(pygame.time.get_ticks() / 500) % 2 == 0:
+                hud.text(
+                    "boss_warning",
+                    "⚠ BOSS BATTLE ⚠",
+                    32,
+                    (255, 100, 0),
+                    center=(WIDTH // 2, 50),
+                    bold=True,
+                    outline=(0, 0, 0),
+                    offsets=OUTLINE_4_WIDE,
+                )
+
+    def _draw_stage_notification(self):
+        """Thông báo chuyển stage - ĐẸP VÀ RÕ RÀNG (timer được trừ trong update)."""
+        hud = self.hud
+        banners = self.banners
+        session = self.session
+        screen = self.screen
+
+        # VICTORY SCREEN - HOÀNH TRÁNG!
+        if session.stage_notification_type == "victory":
+            # Full screen overlay (xanh đen tối)
+            hud.overlay((20, 20, 40), 200)
+
+            # Hiệu ứng phóng to/thu nhỏ
+            time_elapsed = 15.0 - session.stage_notification_timer
+            pulse = 1.0 + 0.15 * math.sin(time_elapsed * 3)  # Nhịp đập
+
+            # Rainbow color effect (màu chuyển động)
+            hue_shift = (time_elapsed * 50) % 360
+            if hue_shift < 120:
+                victory_color = (255, 215, 0)  # Gold
+            elif hue_shift < 240:
+                victory_color = (255, 140, 0)  # Orange
+            else:
+                victory_color = (255, 215, 0)  # Gold
+
+            # VICTORY text - CỰC LỚN (glow + shadow + viền đã ghép sẵn, chỉ scale theo nhịp)
+            title, title_scale = banners.victory_title(victory_color)
+            banners.draw(title, (WIDTH // 2, HEIGHT // 2 - 80), pulse / title_scale)
+
+            # Subtitle với animation
+            subtitle_pulse = 1.0 + 0.1 * math.sin(time_elapsed * 4)
+            subtitle, subtitle_scale = banners.victory_subtitle()
+            banners.draw(subtitle, (WIDTH // 2, HEIGHT // 2 + 20), subtitle_pulse / subtitle_scale)
+
+            # Hướng dẫn chơi lại - nhấp nháy để thu hút sự chú ý
+            blink = int(time_elapsed * 2) % 2 == 0
+            if blink:
+                banners.draw(banners.victory_hint(), (WIDTH // 2, HEIGHT // 2 + 100))
+
+            # Vẽ các ngôi sao rơi (particles)
+            for i in range(20):
+                star_x = (WIDTH // 2) + random.randint(-400, 400)
+                star_y = int((HEIGHT // 2 - 200) + (time_elapsed * 100 + i * 50) % HEIGHT)
+                star_size = random.randint(3, 8)
+                star_color = random.choice([(255, 215, 0), (255, 255, 100), (255, 200, 50)])
+                pygame.draw.circle(screen, star_color, (star_x, star_y), star_size)
+
+        else:
+            # Normal stage notifications (cleared, new_stage)
+            # Chọn màu theo loại thông báo
+            if session.stage_notification_type == "cleared":
+                # CLEARED: cam nâu viền đen
+                main_color = (204, 85, 0)  # Saddle brown - cam nâu
+                outline_color = (0, 0, 0)  # Đen
+                subtitle_msg = "BOSS IS COMING CAREFULLY!"
+                subtitle_color = (220, 20, 60)  # Crimson - đỏ
+            else:  # new_stage
+                # NEW STAGE: cam đất
+                main_color = (204, 85, 0)  # Burnt orange
+                outline_color = (0, 0, 0)  # Đen
+                subtitle_msg = "GET READY!"
+                subtitle_color = (255, 255, 255)  # Trắng
+
+            # Chữ lớn + shadow + viền đen, dựng một lần cho mỗi thông báo
+            title = banners.stage_title(session.stage_notification, main_color, outline_color)
+            stage_rect = pygame.Rect((0, 0), title.text_size)
+            stage_rect.center = (WIDTH // 2, HEIGHT // 2 - 50)
+
+            # Vẽ background xanh trắng rất mờ nhạt
+            bg_padding = 30
+            bg_rect = pygame.Rect(
+                stage_rect.x - bg_padding,
+                stage_rect.y - bg_padding - 20,
+                stage_rect.width + bg_padding * 2,
+                stage_rect.height + bg_padding * 2 + 80  # Thêm chỗ cho subtitle
+            )
+            banners.panel(bg_rect, (176, 224, 230), 80)  # Powder blue - xanh trắng nhạt
+
+            banners.draw(title, stage_rect.center)
+
+            # Thêm dòng subtitle
+            banners.draw(
+                banners.stage_subtitle(subtitle_msg, subtitle_color),
+                (WIDTH // 2, HEIGHT // 2 + 40),
+            )
+
+    def _draw_player_bars(self):
+        """Thanh HP / energy đồ họa và tọa độ người chơi (world coordinates)."""
+        hud = self.hud
+        screen = self.screen
+        player = self.session.player
+        try:
+            # Player HP bar: fixed position at bottom center
+            if (
+                hasattr(player, "hp")
+                and hasattr(player, "max_hp")
+                and player.max_hp > 0
+            ):
+                # Larger bars with fixed position at bottom
+                bar_w = 400  # Wider bar
+                bar_h = 25  # Taller bar
+                bar_x = WIDTH // 2 - bar_w // 2  # Center horizontally
+                bar_y = HEIGHT - 100  # Fixed distance from bottom
+
+                # HP bar background + fill + số HP (widget chỉ vẽ lại khi HP đổi)
+                pct = max(0.0, min(1.0, float(player.hp) / float(player.max_hp)))
+
+                # color lerp: red -> yellow -> green
+                if pct > 0.6:
+                    col = (50, 205, 50)
+                elif pct > 0.3:
+                    col = (255, 200, 0)
+                else:
+                    col = (220, 30, 30)
+
+                hud.bar(
+                    "hp_bar",
+                    bar_x,
+                    bar_y,
+                    bar_w,
+                    bar_h,
+                    pct,
+                    col,
+                    (80, 80, 80),
+                    f"{int(player.hp)}/{int(player.max_hp)}",
+                    20,
+                )
+
+                # Always draw mana bar
+                try:
+                    # Calculate mana percentage based on current mana or charging state
+                    if getattr(player, "_is_charging", False):
+                        # When charging, show decreasing energy
+                        now = game_time()
+                        held = now - getattr(player, "_charge_start", now)
+                        charge_skill = getattr(player, "skills", {}).get("charge")
+                        max_charge = (
+                            getattr(charge_skill, "max_charge", 3.0)
+                            if charge_skill is not None
+                            else 3.0
+                        )
+                        pct = 1.0 - max(0.0, min(1.0, held / float(max_charge)))
+                    else:
+                        # When not charging, show current mana
+                        pct = float(player.mana) / float(player.max_mana)
+
+                    # Energy/Mana bar with same width but smaller height
+                    cbar_w = bar_w
+                    cbar_h = 20  # Slightly smaller than HP bar
+                    cbar_x = bar_x
+                    cbar_y = bar_y + bar_h + 4  # Closer to HP bar
+
+                    if getattr(player, "_is_charging", False):
+                        mana_text = f"ENERGY {int(pct * 100)}%"
+                        # Add charging indicator
+                        pygame.draw.circle(
+                            screen,
+                            (0, 128, 255),
+                            (cbar_x + cbar_w + 20, cbar_y + cbar_h // 2),
+                            6,
+                        )
+                    else:
+                        mana_text = f"ENERGY {int(player.mana)}/{int(player.max_mana)}"
+
+                    hud.bar(
+                        "energy_bar",
+                        cbar_x,
+                        cbar_y,
+                        cbar_w,
+                        cbar_h,
+                        pct,
+                        (0, 128, 255),  # Bright blue for energy
+                        (40, 40, 40),
+                        mana_text,
+                        18,
+                    )
+                except Exception:
+                    pass
+
+            px = int(player.rect.centerx)
+            py = int(player.rect.centery)
+            hud.text("player_pos", f"Pos: x={px} y={py}", 24, (0, 0, 0), pos=(10, 100))
+        except Exception:
+            # Nếu player chưa có rect hoặc lỗi, im lặng
+            pass
+
+    def _draw_death_overlay(self):
+        """Người chơi đã chết: overlay thông báo, vòng lặp ngoài chờ phím R/Q (respawn/quit)."""
+        hud = self.hud
+        player = self.session.player
+        try:
+            if hasattr(player, "alive") and not player.alive:
+                # semi-transparent dark overlay
+                hud.overlay((0, 0, 0), 160)
+                hud.text("death_title", "YOU DIED", 64, (255, 50, 50), center=(WIDTH // 2, HEIGHT // 2 - 40))
+                hud.text(
+                    "death_hint",
+                    "Press R to respawn or Q to quit",
+                    28,
+                    (220, 220, 220),
+                    center=(WIDTH // 2, HEIGHT // 2 + 30),
+                )
+        except Exception:
+            pass
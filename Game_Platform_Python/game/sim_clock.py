@@ -0,0 +1,166 @@
+"""
+Vòng lặp mô phỏng bước cố định (fixed timestep) tách khỏi tốc độ vẽ.
+
+Trước đây `run_game_session` chạy logic đúng một lần mỗi frame vẽ: `Player.move`
+cộng GRAVITY / vel_x theo frame, `physics_lock` / `teleport_lock` trừ 1/60 mỗi frame
+còn enemy trộn gravity theo frame với di chuyển nhân dt. Game vì thế nhanh/chậm
+theo FPS thực tế.
+
+- FixedStepClock dồn thời gian thực của mỗi frame vào accumulator và trả về số
+  tick mô phỏng (mỗi tick dài đúng `step_dt`) cần chạy; giới hạn số tick mỗi frame
+  để máy chậm không rơi vào vòng xoáy bù tick.
+- Interpolator ghi vị trí rect trước tick cuối cùng; lúc vẽ nội suy giữa vị trí
+  đó và vị trí hiện tại theo `alpha` (phần dư của accumulator), rồi trả lại
+  vị trí thật sau khi vẽ.
+- GameClock là thời gian game (chỉ tăng theo tick) và RNG của mô phỏng: logic
+  dùng `game_time()` / `sim_random()` thay cho `time.time()`,
+  `pygame.time.get_ticks()` và `random`, nên cùng seed + cùng input theo tick thì
+  session chạy lại y hệt (xem game/replay.py). Hiệu ứng chỉ để vẽ vẫn dùng
+  `random` thường.
+- `tick_scale(dt)` / `fall(...)`: GRAVITY, SPEED, JUMP_POWER tính theo tick tham chiếu
+  (PHYSICS_TICK_RATE); player / enemy nhân theo số tick tham chiếu của mỗi tick nên
+  nhảy, rơi, chạy đi cùng quãng đường trong cùng thời gian ở mọi tần số mô phỏng
+  (kiểm tra: `python -m game.headless --check-tick-rates`).
+"""
+import random
+from contextlib import contextmanager
+
+from game.config import PHYSICS_TICK_RATE, SIM_TICK_RATE, SIM_MAX_STEPS_PER_FRAME, SIM_SNAP_DISTANCE
+
+
+class FixedStepClock:
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_steps=SIM_MAX_STEPS_PER_FRAME):
+        self.max_steps = max(1, int(max_steps))
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped = 0.0  # thời gian (giây) bị bỏ vì vượt max_steps
+        # Vật lý tính theo dt của tick (xem `tick_scale`), tick_rate chỉ đổi độ mịn
+        self.tick_rate = max(1.0, float(tick_rate))
+        self.step_dt = 1.0 / self.tick_rate
+
+    def reset(self):
+        """Bỏ thời gian đang dồn (vd. sau khi đóng pause menu)."""
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        """Cộng thời gian thực của frame; trả về số tick mô phỏng cần chạy."""
+        self.accumulator += max(0.0, frame_dt)
+        steps = int(self.accumulator / self.step_dt)
+        if steps > self.max_steps:
+            dropped = (steps - self.max_steps) * self.step_dt
+            self.dropped += dropped
+            self.accumulator -= dropped
+            steps = self.max_steps
+        self.accumulator -= steps * self.step_dt
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """Tỉ lệ [0, 1) của tick kế tiếp đã trôi qua - dùng để nội suy khi vẽ."""
+        return min(1.0, self.accumulator / self.step_dt)
+
+    def stats(self):
+        return {
+            'tick_rate': self.tick_rate,
+            'ticks': self.ticks,
+            'dropped_s': self.dropped,
+        }
+
+
+def tick_scale(dt):
+    """Số tick tham chiếu (PHYSICS_TICK_RATE/giây) trong `dt` giây: 1.0 ở 120 tick/giây."""
+    return dt * PHYSICS_TICK_RATE
+
+
+def fall(vel_y, gravity, ticks):
+    """
+    (quãng đường dọc, vận tốc mới) sau `ticks` tick tham chiếu với gia tốc `gravity`/tick.
+
+    Bằng đúng `ticks` lần `vel_y += gravity; y += vel_y` như vòng lặp 120 tick/giây cũ,
+    và một bước a + b cho cùng kết quả với hai bước a rồi b, nên quỹ đạo nhảy / rơi
+    không phụ thuộc độ dài tick.
+    """
+    return ticks * vel_y + gravity * ticks * (ticks + 1) / 2, vel_y + gravity * ticks
+
+
+class Interpolator:
+    def __init__(self, snap_distance=SIM_SNAP_DISTANCE):
+        self.snap_distance = snap_distance
+        self._previous = {}  # id(obj) -> (obj, x, y) trước tick cuối cùng
+
+    def snapshot(self, *groups):
+        """Ghi vị trí rect của các đối tượng (gọi ngay trước mỗi tick)."""
+        previous = {}
+        for group in groups:
+            for obj in group:
+                rect = getattr(obj, "rect", None)
+                if rect is not None:
+                    previous[id(obj)] = (obj, rect.x, rect.y)
+        self._previous = previous
+
+    @contextmanager
+    def apply(self, alpha):
+        """
+        Trong khối `with`, rect của các đối tượng đã snapshot nằm ở vị trí nội suy.
+
+        Đối tượng nhảy xa hơn `snap_distance` trong một tick (teleport, respawn)
+        được vẽ thẳng ở vị trí mới thay vì trượt qua.
+        """
+        moved = []
+        snap = self.snap_distance
+        for obj, px, py in self._previous.values():
+            rect = obj.rect
+            cx, cy = rect.x, rect.y
+            if (cx == px and cy == py) or abs(cx - px) > snap or abs(cy - py) > snap:
+                continue
+            rect.x = int(round(px + (cx - px) * alpha))
+            rect.y = int(round(py + (cy - py) * alpha))
+            moved.append((rect, cx, cy))
+        try:
+            yield
+        finally:
+            for rect, cx, cy in moved:
+                rect.x = cx
+                rect.y = cy
+
+
+class GameClock:
+    _instance = None
+
+    def __new__(cls):
+        # Singleton - player, skill, enemy, portal đọc chung một đồng hồ
+        if cls._instance is None:
+            cls._instance = super(GameClock, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.now = 0.0  # giây game từ đầu session
+        self.seed = None
+        self.random = random.Random()
+
+    def reset(self, seed=None):
+        """Về 0 và seed lại RNG của mô phỏng (None = seed ngẫu nhiên, vẫn lưu lại để replay)."""
+        if seed is None:
+            seed = random.SystemRandom().randrange(1 << 32)
+        self.now = 0.0
+        self.seed = int(seed)
+        self.random.seed(self.seed)
+        return self.seed
+
+    def advance(self, dt):
+        self.now += dt
+
+
+def game_time():
+    """Thời gian game (giây) - chỉ tăng theo tick mô phỏng."""
+    return GameClock().now
+
+
+def sim_random():
+    """RNG của mô phỏng (seed theo session) - dùng cho quyết định ảnh hưởng gameplay."""
+    return GameClock().random
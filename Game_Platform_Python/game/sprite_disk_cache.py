@@ -0,0 +1,134 @@
+"""
+Cache trên đĩa cho các dãy frame sprite đã xử lý (scale + bottom_trim).
+
+SpriteFrameStore chỉ cache trong RAM, nên mỗi lần mở game vẫn phải decode hàng
+trăm PNG lớn, scale lại và tính trim. SpriteDiskCache ghi mỗi dãy frame (một thư
+mục animation + một biến thể scale/size) thành một file bundle:
+
+    header : magic (8 byte) + độ dài meta (u32)
+    meta   : JSON - [[w, h, trim, offset], ...] cho từng frame
+    data   : (căn 4 byte) pixel RGBA thô của các frame nối liền
+
+Tên file là sha1 của (thư mục, biến thể, danh sách PNG kèm mtime + size), nên
+sửa/thêm/xoá PNG hoặc đổi scale sẽ tự dùng bundle mới. Khi load, file được mmap
+và mỗi frame dựng bằng `pygame.image.frombuffer` (không decode PNG, không scale).
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from game.config import SPRITE_DISK_CACHE_DIR
+
+MAGIC = b"GPSPR1\0\0"
+_HEADER = struct.Struct("<8sI")
+
+# pygame >= 2.1.3 đổi tên tostring -> tobytes
+_to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+
+
+class SpriteDiskCache:
+    def __init__(self, cache_dir=SPRITE_DISK_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            self.cache_dir = None
+
+    def _bundle_path(self, folder, variant):
+        """Đường dẫn bundle cho thư mục + biến thể, None nếu thư mục không có PNG."""
+        try:
+            names = sorted(f for f in os.listdir(folder) if f.lower().endswith(".png"))
+        except OSError:
+            return None
+        if not names:
+            return None
+        h = hashlib.sha1()
+        h.update(os.path.abspath(folder).encode("utf-8"))
+        h.update(repr(variant).encode("utf-8"))
+        for name in names:
+            st = os.stat(os.path.join(folder, name))
+            h.update(f"|{name}:{st.st_mtime_ns}:{st.st_size}".encode("utf-8"))
+        return os.path.join(self.cache_dir, h.hexdigest() + ".sprc")
+
+    def has_bundle(self, folder, variant):
+        """True nếu đã có bundle còn mới cho thư mục + biến thể (chỉ stat file, an toàn từ thread khác)."""
+        if not self.cache_dir:
+            return False
+        path = self._bundle_path(folder, variant)
+        return path is not None and os.path.exists(path)
+
+    def load_or_build(self, folder, variant, loader):
+        """Frame (surface, trim) của `folder` từ bundle; chưa có thì gọi `loader()` rồi ghi bundle."""
+        if not self.cache_dir:
+            return loader()
+        path = self._bundle_path(folder, variant)
+        if path is None:
+            return loader()
+        if os.path.exists(path):
+            try:
+                frames = self._read(path)
+                self.hits += 1
+                return frames
+            except Exception as e:
+                print(f"[SPRITE_CACHE] Bỏ qua bundle lỗi {os.path.basename(path)}: {e}")
+        self.misses += 1
+        frames = loader()
+        try:
+            self._write(path, frames)
+        except Exception as e:
+            print(f"[SPRITE_CACHE] Không ghi được bundle cho {folder}: {e}")
+        return frames
+
+    @staticmethod
+    def _read(path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("bad magic")
+        meta_end = _HEADER.size + meta_len
+        meta = json.loads(bytes(mm[_HEADER.size:meta_end]).decode("utf-8"))
+        data_start = meta_end + (-meta_end) % 4
+        view = memoryview(mm)
+
+        frames = []
+        for w, h, trim, offset in meta["frames"]:
+            start = data_start + offset
+            surf = pygame.image.frombuffer(view[start:start + w * h * 4], (w, h), "RGBA")
+            try:
+                # Copy sang định dạng của display để blit nhanh; mmap không còn bị giữ
+                surf = surf.convert_alpha()
+            except pygame.error:
+                pass
+            frames.append((surf, trim))
+        return frames
+
+    @staticmethod
+    def _write(path, frames):
+        records = []
+        chunks = []
+        offset = 0
+        for entry in frames:
+            surf, trim = (entry[0], entry[1]) if isinstance(entry, tuple) else (entry, 0)
+            raw = _to_bytes(surf, "RGBA")
+            w, h = surf.get_size()
+            records.append([w, h, int(trim), offset])
+            chunks.append(raw)
+            offset += len(raw)
+        meta = json.dumps({"frames": records}, separators=(",", ":")).encode("utf-8")
+        pad = (-(_HEADER.size + len(meta))) % 4
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(meta)))
+            f.write(meta)
+            f.write(b"\0" * pad)
+            for raw in chunks:
+                f.write(raw)
+        os.replace(tmp_path, path)
@@ -0,0 +1,195 @@
+"""
+Kho frame sprite dùng chung cho mọi entity (player, enemy, boss).
+
+Trước đây mỗi lần vẽ entity quay trái, code gọi `pygame.transform.flip` lên frame
+hiện tại, tức là cấp phát một surface mới cho mỗi entity mỗi frame.
+SpriteFrameStore load mỗi dãy frame một lần theo khoá (thư mục + kích thước),
+lật sẵn cả hai hướng, và trả cùng một FrameSequence cho mọi instance.
+
+FrameSequence vẫn là list các (surface, bottom_trim) nên code cũ duyệt/unpack
+không phải sửa; hướng trái lấy qua `frame_for()` hoặc `sequence.flipped[i]`.
+
+Nếu SPRITE_DISK_CACHE_ENABLED, dãy frame load từ một thư mục còn được lưu ra đĩa
+(xem game/sprite_disk_cache.py) để lần chạy sau không phải decode PNG.
+"""
+import os
+
+import pygame
+
+from game.config import SPRITE_DISK_CACHE_ENABLED
+from game.sprite_disk_cache import SpriteDiskCache
+
+# (đường dẫn, mtime, kích thước sau scale) -> bottom_trim
+_trim_cache = {}
+
+
+def bottom_trim(img, path=None):
+    """
+    Số hàng trong suốt hoàn toàn ở đáy ảnh (để căn phần có pixel vào đáy hitbox).
+
+    Dùng `get_bounding_rect()` (quét alpha trong C) thay cho vòng `get_at` từng
+    pixel. Nếu có `path`, kết quả được cache theo file + mtime + kích thước.
+    """
+    key = None
+    if path is not None:
+        try:
+            key = (path, os.path.getmtime(path), img.get_size())
+        except OSError:
+            key = None
+        if key is not None:
+            cached = _trim_cache.get(key)
+            if cached is not None:
+                return cached
+    bounds = img.get_bounding_rect(min_alpha=1)
+    # Ảnh trong suốt hoàn toàn: giữ hành vi cũ (trim = 0)
+    trim = img.get_height() - bounds.bottom if bounds.height > 0 else 0
+    if key is not None:
+        _trim_cache[key] = trim
+    return trim
+
+
+class FrameSequence(list):
+    """List (surface, bottom_trim) như cũ, kèm `flipped[i]` là surface lật ngang của frame i."""
+
+    def __init__(self, frames=()):
+        super().__init__(frames)
+        self.flipped = [
+            pygame.transform.flip(_surface_of(entry), True, False) for entry in self
+        ]
+
+
+def _surface_of(entry):
+    return entry[0] if isinstance(entry, tuple) else entry
+
+
+def frame_for(frames, index, facing_right=True):
+    """
+    (surface, bottom_trim) của frame `index` theo hướng nhìn.
+
+    Chấp nhận phần tử là (surf) hoặc (surf, trim). Với FrameSequence, hướng trái
+    dùng surface lật sẵn; list thường thì lật tại chỗ như trước (fallback).
+    """
+    entry = frames[index]
+    if isinstance(entry, tuple):
+        surface = entry[0]
+        trim = entry[1] if len(entry) > 1 else 0
+    else:
+        surface = entry
+        trim = 0
+    if facing_right:
+        return surface, trim
+    flipped = getattr(frames, 'flipped', None)
+    if flipped is not None:
+        return flipped[index], trim
+    return pygame.transform.flip(surface, True, False), trim
+
+
+class SpriteFrameStore:
+    _instance = None
+
+    def __new__(cls):
+        # Singleton - mọi entity dùng chung một kho frame
+        if cls._instance is None:
+            cls._instance = super(SpriteFrameStore, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._sequences = {}  # key -> FrameSequence
+        self.disk_cache = SpriteDiskCache() if SPRITE_DISK_CACHE_ENABLED else None
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    def get(self, key, loader, folder=None):
+        """
+        FrameSequence cho `key`; lần đầu gọi `loader()` (trả về list frame) rồi lật sẵn.
+
+        Có `folder` (thư mục PNG nguồn) thì thử bundle trên đĩa trước `loader()`.
+        Dãy rỗng (thư mục không tồn tại) cũng được cache để không quét lại ổ đĩa.
+        """
+        sequence = self._sequences.get(key)
+        if sequence is not None:
+            self.hits += 1
+            return sequence
+        self.misses += 1
+        if folder is not None and self.disk_cache is not None:
+            frames = self.disk_cache.load_or_build(folder, key, loader)
+        else:
+            frames = loader()
+        sequence = FrameSequence(frames)
+        self._sequences[key] = sequence
+        return sequence
+
+    def __contains__(self, key):
+        return key in self._sequences
+
+    def __len__(self):
+        return len(self._sequences)
+
+    def clear(self):
+        self._sequences.clear()
+
+    def stats(self):
+        """Số dãy frame, số surface (kể cả bản lật) và RAM ước tính."""
+        surfaces = 0
+        total_bytes = 0
+        for sequence in self._sequences.values():
+            for entry in sequence:
+                surf = _surface_of(entry)
+                total_bytes += surf.get_width() * surf.get_height() * 4
+            surfaces += len(sequence)
+        return {
+            'sequences': len(self._sequences),
+            'surfaces': surfaces * 2,
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_mb': total_bytes * 2 / (1024 * 1024),
+        }
+
+
+def load_scaled_frames(folder, scale):
+    """
+    Frame (surface, bottom_trim) của thư mục PNG, scale theo tỉ lệ `scale` (cách Player load).
+
+    Dùng chung qua SpriteFrameStore, nên Player và enemy dựng từ CharacterTemplate
+    cùng thư mục + scale nhận đúng một FrameSequence.
+    """
+    return SpriteFrameStore().get(
+        scaled_frames_key(folder, scale),
+        lambda: _load_scaled_from_disk(folder, scale),
+        folder=folder,
+    )
+
+
+def scaled_frames_key(folder, scale):
+    """Khoá SpriteFrameStore của `load_scaled_frames(folder, scale)`."""
+    return ("player", os.path.normpath(folder), scale)
+
+
+def _load_scaled_from_disk(folder, scale):
+    frames = []
+    # If folder doesn't exist, return empty list
+    if not os.path.isdir(folder):
+        return frames
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".png"):
+            path = os.path.join(folder, filename)
+            img = pygame.image.load(path)
+            # Try convert_alpha, fallback to convert if display not set
+            try:
+                img = img.convert_alpha()
+            except pygame.error:
+                try:
+                    img = img.convert()
+                except pygame.error:
+                    pass  # Use original if conversion fails
+
+            # Scale proportionally based on scale instead of fixed size
+            original_w, original_h = img.get_size()
+            img = pygame.transform.scale(img, (int(original_w * scale), int(original_h * scale)))
+            # compute transparent rows at bottom so we can align visible pixels to hitbox
+            frames.append((img, bottom_trim(img, path)))
+    return frames
@@ -0,0 +1,248 @@
+"""
+Dữ liệu map dùng chung giữa các session chơi.
+
+Trước đây mỗi lần "play_again" hay quay lại từ main menu, `run_game_session`
+load lại map, dựng lại LayerCache/ObjectLayerIndex và các manager. WorldAssets
+giữ phần bất biến (platform + grid, surface đã convert/scale, index, render
+target) và chỉ `reset()` trạng thái thay đổi trong lúc chơi: timer của moving
+platform, cooldown/lockout của portal, frame của animated decor. Enemy và
+player vẫn do từng session tạo mới.
+"""
+import os
+
+from game.config import (
+    WIDTH,
+    HEIGHT,
+    ZOOM,
+    HITBOX_INSET,
+    HITBOX_TOP_INSET,
+    HITBOX_BOTTOM_INSET,
+    HITBOX_LEFT_INSET,
+    HITBOX_RIGHT_INSET,
+    OBJECT_TILE_USE_BOTTOM_Y,
+    OBJECT_TILE_Y_OFFSET,
+    ASSET_PYRAMID_DISK_CACHE,
+    ASSET_PYRAMID_DIR,
+    RENDER_PRESCALED,
+)
+from game.map_loader import load_map, release_tile_images
+from game.layer_cache import LayerCache
+from game.object_layer_index import ObjectLayerIndex
+from game.render_targets import RenderTargets
+from game.asset_pyramid import AssetPyramid
+from game.animated_decor import AnimatedDecorManager
+from game.moving_platform import MovingPlatformManager
+from game.portal import PortalManager, Portal
+
+# Build map path relative to the project root to avoid absolute paths
+DEFAULT_MAP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "maps", "Map_test.tmx"
+)
+
+
+class WorldAssets:
+    def __init__(self, map_path=DEFAULT_MAP_PATH, render=True):
+        """
+        `render=False` (chạy headless, xem game/headless.py): chỉ load phần mô phỏng cần
+        (platform, moving platform, portal, spawn), bỏ render target, cache layer,
+        index object và animated decor - các thuộc tính đó là None.
+        """
+        self.map_path = map_path
+        self.render = render
+
+        # Load map (pass per-side hitbox inset from config)
+        (self.platforms, self.tmx_data, self.map_objects, animated_objects,
+         moving_platform_objects, portal_objects) = load_map(
+            map_path,
+            hitbox_inset=HITBOX_INSET,
+            top_inset=HITBOX_TOP_INSET,
+            bottom_inset=HITBOX_BOTTOM_INSET,
+            left_inset=HITBOX_LEFT_INSET,
+            right_inset=HITBOX_RIGHT_INSET,
+            images=render,
+            # Prescaled: decor chỉ cần bản đã scale, ảnh gốc decode khi AssetPyramid cần
+            defer_images=render and RENDER_PRESCALED,
+        )
+        self.map_w, self.map_h = self._map_size()
+
+        if render:
+            self._build_render_assets(map_path, animated_objects)
+            self._release_decor_originals(animated_objects)
+        else:
+            self.render_targets = None
+            self.asset_pyramid = None
+            self.nen_layer_cache = None
+            self.decor2_index = None
+            self.layer1_index = None
+            self.animated_decor_manager = None
+            # Vùng nhìn (world px) như RenderTargets, dùng cho vùng hoạt động của enemy
+            self.view_w = int(WIDTH / ZOOM)
+            self.view_h = int(HEIGHT / ZOOM)
+
+        # Tạo moving platforms manager
+        self.moving_platform_manager = MovingPlatformManager(
+            moving_platform_objects,
+            use_bottom_y=OBJECT_TILE_USE_BOTTOM_Y,
+            y_offset=OBJECT_TILE_Y_OFFSET
+        )
+
+        self.portal_manager = self._build_portals(portal_objects)
+
+        # Điểm spawn của player (theo name hoặc type), None nếu map không có
+        self.player_spawn = next(
+            (
+                o
+                for o in self.map_objects
+                if o.get("name") == "player_spawn" or o.get("type") == "player"
+            ),
+            None,
+        )
+
+    def _build_render_assets(self, map_path, animated_objects):
+        # Render target dùng lại qua các frame (world surface + ảnh đã scale)
+        self.render_targets = RenderTargets((WIDTH, HEIGHT), ZOOM)
+        self.view_w = self.render_targets.view_w
+        self.view_h = self.render_targets.view_h
+        backdrop_zoom = self.render_targets.backdrop_zoom
+
+        # Ảnh decor thu nhỏ sẵn theo zoom, dùng chung giữa các layer (chỉ ở chế độ prescaled)
+        self.asset_pyramid = None
+        if backdrop_zoom != 1.0:
+            load = getattr(self.tmx_data, "load_tile_image", None)
+            self.asset_pyramid = AssetPyramid(
+                cache_dir=ASSET_PYRAMID_DIR if ASSET_PYRAMID_DISK_CACHE else None,
+                source_key=AssetPyramid.source_key_for(map_path),
+                # Ảnh gốc chỉ decode để scale rồi bỏ (BakedMap không giữ lại ảnh nguồn)
+                loader=(lambda gid: load(gid, keep_source=False)) if load else self.tmx_data.get_tile_image_by_gid,
+            )
+
+        # Cache pre-render cho tile layer "nen" (vẽ theo chunk thay vì từng tile)
+        self.nen_layer_cache = LayerCache(self.tmx_data, "nen", zoom=backdrop_zoom)
+
+        # Tách map_objects theo layer để vẽ đúng thứ tự
+        decor2_tinh_objects = [obj for obj in self.map_objects if obj.get('layer_name', '').lower() == 'object_decor2_tinh']
+        object_layer1_objects = [obj for obj in self.map_objects if obj.get('layer_name', '').lower() == 'object layer 1']
+
+        # Index lưới cho các object tĩnh: rect/vị trí blit tính sẵn, chỉ vẽ phần trong camera
+        print("[OPTIMIZATION] Pre-processing objects...")
+        self.decor2_index = ObjectLayerIndex(
+            decor2_tinh_objects,
+            name="Decor2",
+            use_bottom_y=OBJECT_TILE_USE_BOTTOM_Y,
+            y_offset=OBJECT_TILE_Y_OFFSET,
+            zoom=backdrop_zoom,
+            pyramid=self.asset_pyramid,
+        )
+        self.layer1_index = ObjectLayerIndex(
+            object_layer1_objects,
+            name="Layer1",
+            use_bottom_y=OBJECT_TILE_USE_BOTTOM_Y,
+            y_offset=OBJECT_TILE_Y_OFFSET,
+            zoom=backdrop_zoom,
+            pyramid=self.asset_pyramid,
+        )
+
+        # Tạo animated decorations manager
+        self.animated_decor_manager = AnimatedDecorManager(
+            animated_objects,
+            use_bottom_y=OBJECT_TILE_USE_BOTTOM_Y,
+            y_offset=OBJECT_TILE_Y_OFFSET,
+            zoom=backdrop_zoom,
+            pyramid=self.asset_pyramid,
+        )
+
+        if self.asset_pyramid is not None:
+            pyramid_stats = self.asset_pyramid.stats()
+            print(
+                f"[ASSET_PYRAMID] {pyramid_stats['scaled']} scaled images, "
+                f"disk hits={pyramid_stats['disk_hits']}, decoded={pyramid_stats['decoded']}, "
+                f"mem={pyramid_stats['memory_mb']:.1f}MB"
+            )
+
+    def _release_decor_originals(self, animated_objects):
+        """
+        Bỏ ảnh gốc của decor mà tmx_data còn giữ (object đã có bản convert riêng,
+        hoặc ở chế độ prescaled chỉ cần bản đã scale trong AssetPyramid).
+        """
+        gids = set()
+        for obj in self.map_objects:
+            if obj.get('gid'):
+                gids.add(obj['gid'])
+            if self.asset_pyramid is not None:
+                obj['tile'] = None
+        for obj in animated_objects:
+            if obj.get('gid'):
+                gids.add(obj['gid'])
+            gids.update(frame['gid'] for frame in obj.get('animation_frames', ()) if frame.get('gid'))
+        release_tile_images(self.tmx_data, gids)
+
+    def _map_size(self):
+        """
+        Kích thước map (px). Prefer tmx_data (if available). Fallback to
+        bounding box of platforms if tmx_data isn't present.
+        """
+        try:
+            return (int(self.tmx_data.width * self.tmx_data.tilewidth),
+                    int(self.tmx_data.height * self.tmx_data.tileheight))
+        except Exception:
+            pass
+        try:
+            min_x = min((r.left for _, r in self.platforms))
+            min_y = min((r.top for _, r in self.platforms))
+            max_x = max((r.right for _, r in self.platforms))
+            max_y = max((r.bottom for _, r in self.platforms))
+            return max_x - min_x, max_y - min_y
+        except Exception:
+            # Ultimate fallback: treat map as large so clamping is a no-op
+            return int(WIDTH / ZOOM) * 10, int(HEIGHT / ZOOM) * 10
+
+    @staticmethod
+    def _build_portals(portal_objects):
+        portal_manager = PortalManager()
+        for portal_obj in portal_objects:
+            props = portal_obj.get('properties', {})
+
+            # Parse properties từ Tiled
+            target_id = props.get('target')
+            if target_id:
+                # Convert target to int if it's string
+                try:
+                    target_id = int(target_id)
+                except (ValueError, TypeError):
+                    print(f"[Portal] Invalid target ID: {target_id}")
+                    continue
+            else:
+                print(f"[Portal] Portal {portal_obj.get('id')} không có target, bỏ qua")
+                continue
+
+            cooldown_ms = int(props.get('cooldown_ms', 1000))
+            lockout_ms = int(props.get('lockout_ms', 0))  # Lockout cho player
+            spawn_offset_x = int(props.get('spawn_offset_x', 0))
+            spawn_offset_y = int(props.get('spawn_offset_y', 0))
+            require_interact = 'interact' in props  # Nếu có property interact thì cần nhấn phím
+
+            portal = Portal(
+                obj_id=portal_obj.get('id'),
+                x=portal_obj.get('x'),
+                y=portal_obj.get('y'),
+                width=portal_obj.get('width', 512),
+                height=portal_obj.get('height', 512),
+                target_id=target_id,
+                tile_img=portal_obj.get('tile'),
+                cooldown_ms=cooldown_ms,
+                lockout_ms=lockout_ms,
+                spawn_offset_x=spawn_offset_x,
+                spawn_offset_y=spawn_offset_y,
+                require_interact=require_interact
+            )
+            portal_manager.add_portal(portal)
+
+        print(f"[Portal] Đã load {len(portal_manager.portals)} portals")
+        return portal_manager
+
+    def reset(self):
+        """Reset trạng thái thay đổi khi chơi để bắt đầu session mới (không load lại gì)."""
+        self.moving_platform_manager.reset()
+        self.portal_manager.reset()
+        if self.animated_decor_manager is not None:
+            self.animated_decor_manager.reset()
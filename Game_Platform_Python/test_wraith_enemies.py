@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(__file__))
 from game.enemy_registry import create_enemy
 from game.player import Player
 from game.config import WIDTH, HEIGHT, FPS
+from game.projectile_system import ProjectileSystem
 
 # Use config values
 SCREEN_WIDTH = WIDTH
@@ -73,6 +74,11 @@ def main():
                 alive_enemies.append(enemy)
         enemies = alive_enemies
         
+        # Update projectiles (player + enemy) và va chạm
+        projectiles = ProjectileSystem()
+        projectiles.step(dt)
+        projectiles.resolve_hits(player, enemies)
+        
         # Simple camera follow
         camera_x = player.rect.centerx - SCREEN_WIDTH // 2
         camera_y = player.rect.centery - SCREEN_HEIGHT // 2
@@ -93,12 +99,15 @@ def main():
         for enemy in enemies:
             enemy.draw(screen, camera_x, camera_y, show_hitbox=True)
             
-            # Draw projectiles if any
+            # Draw skill effects if any
             if hasattr(enemy, 'skills'):
                 for skill in enemy.skills.values():
                     if hasattr(skill, 'draw'):
                         skill.draw(screen, camera_x, camera_y)
         
+        # Draw projectiles
+        projectiles.draw(screen, camera_x, camera_y)
+        
         # Draw UI
         font = pygame.font.Font(None, 36)
         texts = [